@@ -40,6 +40,9 @@ export interface EffectiveFormationThickness {
     thickness: number;
 }
 
+// rows per request of the paginated lists, the server's maximum
+const PAGE_SIZE = 10000;
+
 export class EntitiesServiceAPI {
     private instance = axios.create({
         baseURL: import.meta.env.VITE_CORE_API + '/api/v1/files/entities',
@@ -54,27 +57,35 @@ export class EntitiesServiceAPI {
 
     /* list welltracks */
     async getListWelltracks(): Promise<WellTracks[]> {
-        const response = await this.instance.get<WellTracks[]>(`/welltracks`);
-        return response.data;
+        return this.getAllPages<WellTracks>(`/welltracks`);
     }
 
     /* list curves */
     async getListCurves(): Promise<Curves[]> {
-        const response = await this.instance.get<Curves[]>(`/curves`);
-        return response.data;
+        return this.getAllPages<Curves>(`/curves`);
     }
 
     /* list formation thickness */
     async getFormationThickness(): Promise<FormationThickness[]> {
-        const response = await this.instance.get<FormationThickness[]>(`/formation-thickness`);
-        return response.data;
+        return this.getAllPages<FormationThickness>(`/formation-thickness`);
     }
 
     /* list  effective formation thickness */
     async getEffectiveFormationThickness(): Promise<EffectiveFormationThickness[]> {
-        const response = await this.instance.get<EffectiveFormationThickness[]>(
-            `/effective-formation-thickness`,
-        );
-        return response.data;
+        return this.getAllPages<EffectiveFormationThickness>(`/effective-formation-thickness`);
+    }
+
+    /* keyset-paginated list: follows X-Next-After-Id until the last page */
+    private async getAllPages<T>(url: string): Promise<T[]> {
+        const items: T[] = [];
+        let afterId: string | undefined;
+        do {
+            const response = await this.instance.get<T[]>(url, {
+                params: { limit: PAGE_SIZE, after_id: afterId },
+            });
+            items.push(...response.data);
+            afterId = response.headers['x-next-after-id'] as string | undefined;
+        } while (afterId);
+        return items;
     }
 }
@@ -1,72 +1,90 @@
 import axios from 'axios';
 
+export type IngestJobKind =
+    | 'curve'
+    | 'welltrack'
+    | 'formation-thickness'
+    | 'effective-formation-thickness'
+    | 'archive';
+
+export interface IngestJob {
+    id: number;
+    kind: string;
+    status: 'queued' | 'running' | 'succeeded' | 'failed' | 'cancelled';
+    file_name: string | null;
+    cancel_requested: boolean;
+    attempts: number;
+    result: Record<string, unknown> | null;
+    error: string | null;
+    created_at: string;
+    started_at: string | null;
+    finished_at: string | null;
+}
+
+// how often a queued/running job is polled
+const JOB_POLL_INTERVAL_MS = 1000;
+const UPLOAD_ATTEMPTS = 3;
+
 export class FileServiceAPI {
     private instance = axios.create({
-        baseURL: import.meta.env.VITE_CORE_API + '/api/v1/files/convert',
+        baseURL: import.meta.env.VITE_CORE_API + '/api/v1/jobs',
         timeout: 5000,
     });
 
-    async fileUploading(file: File): Promise<string> {
-        const formData = new FormData();
-        formData.append('file', file);
-
-        const response = await this.instance.post<string>('', formData, {
-            headers: {
-                'Content-Type': 'multipart/form-data',
-            },
-        });
-        return response.data;
+    async fileUploading(file: File): Promise<IngestJob> {
+        return this.ingest('curve', file);
     }
 
-    async predictedFileUploading(file: File): Promise<string> {
-        const formData = new FormData();
-        formData.append('file', file);
+    async predictedFileUploading(file: File): Promise<IngestJob> {
+        return this.ingest('curve', file);
+    }
 
-        const response = await this.instance.post<string>('', formData, {
-            headers: {
-                'Content-Type': 'multipart/form-data',
-            },
-        });
-        return response.data;
+    async wellTracksUploading(file: File): Promise<IngestJob> {
+        return this.ingest('welltrack', file);
     }
 
-    async wellTracksUploading(file: File): Promise<string> {
-        const formData = new FormData();
-        formData.append('file', file);
+    async formationThicknessUploading(file: File): Promise<IngestJob> {
+        return this.ingest('formation-thickness', file);
+    }
 
-        const response = await this.instance.post<string>('/welltrack', formData, {
-            headers: {
-                'Content-Type': 'multipart/form-data',
-            },
-        });
-        return response.data;
+    async effectiveFormationThicknessUploading(file: File): Promise<IngestJob> {
+        return this.ingest('effective-formation-thickness', file);
     }
 
-    async formationThicknessUploading(file: File): Promise<string> {
+    /* queue the file as an ingest job and wait until it is finished */
+    private async ingest(kind: IngestJobKind, file: File): Promise<IngestJob> {
         const formData = new FormData();
         formData.append('file', file);
 
-        const response = await this.instance.post<string>('/formation-thickness', formData, {
-            headers: {
-                'Content-Type': 'multipart/form-data',
-            },
-        });
-        return response.data;
+        // a POST retried with the same key returns the first job instead of queuing the file again
+        const idempotencyKey = crypto.randomUUID();
+        for (let attempt = 1; ; attempt++) {
+            try {
+                const response = await this.instance.post<IngestJob>(`/${kind}`, formData, {
+                    headers: {
+                        'Content-Type': 'multipart/form-data',
+                        'Idempotency-Key': idempotencyKey,
+                    },
+                });
+                return await this.waitForJob(response.data);
+            } catch (err) {
+                // only retry when no response came back (network error, timeout)
+                if (attempt >= UPLOAD_ATTEMPTS || !axios.isAxiosError(err) || err.response) {
+                    throw err;
+                }
+            }
+        }
     }
 
-    async effectiveFormationThicknessUploading(file: File): Promise<string> {
-        const formData = new FormData();
-        formData.append('file', file);
-
-        const response = await this.instance.post<string>(
-            '/effective-formation-thickness',
-            formData,
-            {
-                headers: {
-                    'Content-Type': 'multipart/form-data',
-                },
-            },
-        );
-        return response.data;
+    private async waitForJob(job: IngestJob): Promise<IngestJob> {
+        while (job.status === 'queued' || job.status === 'running') {
+            await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+            const response = await this.instance.get<IngestJob>(`/${job.id}`);
+            job = response.data;
+        }
+        if (job.status !== 'succeeded') {
+            throw new Error(job.error ?? `Задача ${job.id}: ${job.status}`);
+        }
+        return job;
     }
 }
@@ -10,6 +10,7 @@ from app.db.base import Base
 from app.models.curve import Curve
 from app.models.effective_formation_thickness import EffectiveFormationThickness
 from app.models.formation_thickness import FormationThickness
+from app.models.ingest_job import IngestJob
 from app.models.well import Well
 from app.models.welltrack import WellTrack
 from alembic import context
@@ -0,0 +1,30 @@
+"""Well data versions for incremental interpolation
+
+Revision ID: 5c1e7d93a2f4
+Revises: 0a402ad36e49
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e7d93a2f4'
+down_revision: Union[str, Sequence[str], None] = '0a402ad36e49'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('well', sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('well', sa.Column('interpolated_version', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('well', 'interpolated_version')
+    op.drop_column('well', 'data_version')
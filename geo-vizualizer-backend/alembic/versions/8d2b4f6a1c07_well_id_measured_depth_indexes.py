@@ -0,0 +1,58 @@
+"""Composite indexes for per-well access by measured_depth
+
+Revision ID: 8d2b4f6a1c07
+Revises: 5c1e7d93a2f4
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2b4f6a1c07'
+down_revision: Union[str, Sequence[str], None] = '5c1e7d93a2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, definition); the same indexes are declared on the models
+INDEXES = [
+    (
+        'ix_curve_well_id_measured_depth',
+        'curve',
+        '(well_id, measured_depth) INCLUDE (id, type)',
+    ),
+    (
+        'ix_welltrack_well_id_measured_depth',
+        'welltrack',
+        '(well_id, measured_depth) INCLUDE (lat, lon, absolute_depth)',
+    ),
+    ('ix_interpolated_curve_curve_point_id', 'interpolated_curve', '(curve_point_id)'),
+    ('ix_formation_thickness_well_id', 'formation_thickness', '(well_id)'),
+    ('ix_effective_formation_thickness_well_id', 'effective_formation_thickness', '(well_id)'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # interpolated_curve is created by the app on startup, not by a migration
+    if op.get_context().as_sql:
+        existing_tables = {table for _, table, _ in INDEXES}
+    else:
+        existing_tables = set(sa.inspect(op.get_bind()).get_table_names())
+    # CONCURRENTLY keeps the tables writable while indexes build, but cannot
+    # run inside a transaction; IF NOT EXISTS makes a rerun after a failed build
+    # (which leaves an INVALID index behind, drop it first) or create_all a no-op
+    with op.get_context().autocommit_block():
+        for name, table, definition in INDEXES:
+            if table in existing_tables:
+                op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} {definition}')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
@@ -0,0 +1,56 @@
+"""Dataset versions and PostGIS point indexes
+
+Revision ID: b7e3d5a9f210
+Revises: 8d2b4f6a1c07
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3d5a9f210'
+down_revision: Union[str, Sequence[str], None] = '8d2b4f6a1c07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# GiST indexes on the point expression of app.db.spatial.point_geometry,
+# only when PostGIS is installed (the app falls back to an in-process index)
+SPATIAL_TABLES = ['welltrack', 'formation_thickness', 'effective_formation_thickness']
+
+
+def _postgis_installed() -> bool:
+    if op.get_context().as_sql:
+        return False
+    return op.get_bind().scalar(sa.text("SELECT 1 FROM pg_extension WHERE extname = 'postgis'")) is not None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'dataset_version',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    if not _postgis_installed():
+        return
+    existing_tables = set(sa.inspect(op.get_bind()).get_table_names())
+    with op.get_context().autocommit_block():
+        for table in SPATIAL_TABLES:
+            if table in existing_tables:
+                op.execute(
+                    f'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_geom ON {table} '
+                    'USING gist (ST_SetSRID(ST_MakePoint(lon, lat), 4326))'
+                )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in reversed(SPATIAL_TABLES):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_geom')
+    op.drop_table('dataset_version')
@@ -0,0 +1,30 @@
+"""Content hashes of the ingested well and welltrack files
+
+Revision ID: f1c8a3d6e925
+Revises: e4a9c2f7b318
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c8a3d6e925'
+down_revision: Union[str, Sequence[str], None] = 'e4a9c2f7b318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('well', sa.Column('curve_hash', sa.String(length=64), nullable=True))
+    op.add_column('well', sa.Column('welltrack_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('well', 'welltrack_hash')
+    op.drop_column('well', 'curve_hash')
@@ -0,0 +1,95 @@
+"""
+Responses served through app.core.payload_cache, with ETag / If-None-Match.
+"""
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable, Iterable
+from typing import Optional
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+
+from app.core import payload_cache
+
+
+async def cached_response(
+    key: Hashable,
+    build: Callable[[], Awaitable[tuple[bytes, str]]],
+    *,
+    if_none_match: Optional[str],
+    tags: Iterable[Hashable],
+    vary: Optional[str] = None,
+) -> Response:
+    """
+    Cached payload for `key`, built with build() -> (body, media_type) on a miss.
+    304 without a body when If-None-Match has the payload's ETag.
+    vary: request header(s) the body depends on, sent as Vary (e.g. "Accept"
+    for a negotiated format) so HTTP caches keep one copy per value.
+    """
+    payload = payload_cache.get(key)
+    if payload is None:
+        since = payload_cache.generation()
+        body, media_type = await build()
+        payload = payload_cache.put(key, body, media_type, tags=tags, since=since)
+    return _respond(payload, if_none_match, vary)
+
+
+def cached_stream(
+    key: Hashable,
+    chunks: Callable[[], AsyncIterator[str]],
+    *,
+    media_type: str,
+    if_none_match: Optional[str],
+    tags: Iterable[Hashable],
+    vary: Optional[str] = None,
+) -> Response:
+    """
+    Like cached_response for bodies too big to build before sending: a miss
+    streams chunks() to the client and stores the body once it is complete
+    (without an ETag on that first response, it is only known at the end).
+    Bodies over the cache size are streamed and not kept.
+    """
+    payload = payload_cache.get(key)
+    if payload is not None:
+        return _respond(payload, if_none_match, vary)
+
+    async def body() -> AsyncIterator[bytes]:
+        since = payload_cache.generation()
+        parts: list[bytes] | None = []
+        size = 0
+        async for chunk in chunks():
+            data = chunk.encode()
+            if parts is not None:
+                size += len(data)
+                if size <= payload_cache.max_bytes():
+                    parts.append(data)
+                else:
+                    parts = None
+            yield data
+        if parts is not None:
+            payload_cache.put(key, b"".join(parts), media_type, tags=tags, since=since)
+
+    return StreamingResponse(body(), media_type=media_type, headers={"Vary": vary} if vary else None)
+
+
+def etag_response(body: bytes, media_type: str, *, if_none_match: Optional[str]) -> Response:
+    """
+    `body` with its content ETag, for payloads kept elsewhere (map tiles live on disk).
+    """
+    payload = payload_cache.Payload(body=body, media_type=media_type, etag=payload_cache.make_etag(body))
+    return _respond(payload, if_none_match)
+
+
+def _respond(
+    payload: payload_cache.Payload, if_none_match: Optional[str], vary: Optional[str] = None
+) -> Response:
+    headers = {"ETag": payload.etag}
+    if vary:
+        headers["Vary"] = vary
+    if if_none_match and _etag_matches(payload.etag, if_none_match):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload.body, media_type=payload.media_type, headers=headers)
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    # weak comparison, as RFC 9110 asks for If-None-Match
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
@@ -0,0 +1,153 @@
+"""
+Columnar binary responses, selected with the Accept header.
+
+application/vnd.geo-viz.columns (always available), all values little-endian:
+
+    offset  size        field
+    0       4           magic b"GEOC"
+    4       2   uint16  format version, 1
+    6       2   uint16  column count C
+    8       4   uint32  row count N
+    12      4           reserved, 0
+    16      32 * C      column descriptors:
+                          28 bytes  name, ASCII, NUL-padded
+                           4 bytes  NumPy dtype string, NUL-padded: "<f8", "<i4", "|i1"
+    ...                 column data in descriptor order, N values each;
+                        every column starts at a multiple of 8 bytes
+                        (zero padding), so it can be viewed in place as a
+                        Float64Array / Int32Array / Int8Array
+
+application/vnd.apache.arrow.stream: one Arrow IPC stream with a single
+record batch, NaN floats as nulls. Needs pyarrow, without it the request
+gets 406 unless JSON or the packed format is also acceptable.
+
+NULL floats are NaN in the packed format; curve type is an int8 code:
+0 / 1, -1 for anything else.
+"""
+import struct
+from collections.abc import Mapping
+
+import numpy as np
+from fastapi import HTTPException, Response
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional, only for Arrow IPC responses
+    pa = None
+
+JSON_MEDIA_TYPE = "application/json"
+PACKED_MEDIA_TYPE = "application/vnd.geo-viz.columns"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+PACKED_MAGIC = b"GEOC"
+PACKED_VERSION = 1
+PACKED_HEADER = struct.Struct("<4sHHII")
+PACKED_DESCRIPTOR = struct.Struct("<28s4s")
+PACKED_ALIGNMENT = 8
+
+# curve type codes for JSON
+TYPE_NAMES = {0: "0", 1: "1"}
+
+
+def negotiate(accept: str | None) -> str | None:
+    """
+    Columnar media type to answer with, None for JSON.
+    The acceptable type with the highest q-value wins, a type's q-value coming
+    from its most specific media range; on a tie the one the client lists
+    first, JSON when both come from the same range (*/*, application/*).
+    """
+    if not accept:
+        return None
+    ranges = _media_ranges(accept)
+    offers = [JSON_MEDIA_TYPE, PACKED_MEDIA_TYPE] + ([ARROW_MEDIA_TYPE] if pa is not None else [])
+    best, best_rank = None, None
+    for offer in offers:
+        q, position = _quality(ranges, offer)
+        # strictly greater: a full tie keeps the earlier offer
+        if q > 0 and (best_rank is None or (q, -position) > best_rank):
+            best, best_rank = offer, (q, -position)
+    if best is None and pa is None and _quality(ranges, ARROW_MEDIA_TYPE)[0] > 0:
+        raise HTTPException(
+            status_code=406,
+            detail=f"Arrow IPC needs pyarrow on the server, accept {PACKED_MEDIA_TYPE} instead",
+        )
+    return None if best in (None, JSON_MEDIA_TYPE) else best
+
+
+def _media_ranges(accept: str) -> dict[str, tuple[float, int]]:
+    """
+    {media range: (q, position in the header)}, the first one listed wins for repeats.
+    """
+    ranges: dict[str, tuple[float, int]] = {}
+    for position, media_range in enumerate(accept.split(",")):
+        media_type, *params = (part.strip().lower() for part in media_range.split(";"))
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    pass
+        # a malformed q-value (or nan) counts as the default
+        ranges.setdefault(media_type, (q if 0 <= q <= 1 else 1.0, position))
+    return ranges
+
+
+def _quality(ranges: dict[str, tuple[float, int]], media_type: str) -> tuple[float, int]:
+    for media_range in (media_type, media_type.split("/", 1)[0] + "/*", "*/*"):
+        if media_range in ranges:
+            return ranges[media_range]
+    return 0.0, len(ranges)
+
+
+def response(columns: Mapping[str, np.ndarray], media_type: str) -> Response:
+    return Response(content=encode(columns, media_type), media_type=media_type)
+
+
+def encode(columns: Mapping[str, np.ndarray], media_type: str) -> bytes:
+    if media_type == ARROW_MEDIA_TYPE:
+        return encode_arrow(columns)
+    return encode_packed(columns)
+
+
+def records(columns: Mapping[str, np.ndarray], **constants: object) -> list[dict[str, object]]:
+    """
+    Columns back to JSON rows, plus `constants` in every row:
+    NaN becomes None, the curve type code "0" / "1" (None for -1).
+    """
+    lists: dict[str, list] = {}
+    for name, values in columns.items():
+        if name == "type":
+            lists[name] = [TYPE_NAMES.get(code) for code in values.tolist()]
+        elif values.dtype.kind == "f":
+            lists[name] = np.where(np.isnan(values), None, values).tolist()
+        else:
+            lists[name] = values.tolist()
+    return [{**constants, **dict(zip(lists, row))} for row in zip(*lists.values())]
+
+
+def encode_packed(columns: Mapping[str, np.ndarray]) -> bytes:
+    rows = len(next(iter(columns.values()))) if columns else 0
+    parts = [PACKED_HEADER.pack(PACKED_MAGIC, PACKED_VERSION, len(columns), rows, 0)]
+    for name, values in columns.items():
+        if len(name) > 28:
+            raise ValueError(f"Column name too long for the packed format: {name}")
+        parts.append(PACKED_DESCRIPTOR.pack(name.encode("ascii"), values.dtype.str.encode("ascii")))
+
+    # header and descriptors are multiples of 8 bytes, so the first column is aligned too
+    for values in columns.values():
+        data = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<")).tobytes()
+        parts.append(data + b"\0" * (-len(data) % PACKED_ALIGNMENT))
+    return b"".join(parts)
+
+
+def encode_arrow(columns: Mapping[str, np.ndarray]) -> bytes:
+    batch = pa.record_batch(
+        [pa.array(values, from_pandas=True) for values in columns.values()],
+        names=list(columns),
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
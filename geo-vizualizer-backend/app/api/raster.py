@@ -0,0 +1,56 @@
+"""
+Binary raster tiles, application/vnd.geo-viz.surface, all values little-endian:
+
+    offset  size        field
+    0       4           magic b"GEOS"
+    4       2   uint16  format version, 1
+    6       2   uint16  encoding: 0 float32, 1 uint16 quantized
+    8       4   uint32  width W
+    12      4   uint32  height H
+    16      32  float64 min_lat, max_lat, min_lon, max_lon of the grid
+    48      4   float32 min value
+    52      4   float32 max value
+    56      8           reserved, 0
+    64      ...         W * H values, row-major, row 0 at max_lat (north),
+                        column 0 at min_lon, one value per cell centre
+
+float32: NaN for no data, viewable in place as a Float32Array.
+uint16: value = min + q * (max - min) / 65534, 65535 for no data.
+"""
+import struct
+
+import numpy as np
+
+SURFACE_MEDIA_TYPE = "application/vnd.geo-viz.surface"
+
+RASTER_MAGIC = b"GEOS"
+RASTER_VERSION = 1
+RASTER_HEADER = struct.Struct("<4sHHII4dff8x")
+RASTER_ENCODINGS = {"float32": 0, "uint16": 1}
+
+UINT16_NODATA = 65535
+UINT16_STEPS = 65534
+
+
+def encode(
+    surface: np.ndarray,
+    bbox: tuple[float, float, float, float],
+    encoding: str = "float32",
+) -> bytes:
+    """
+    `surface` is (H, W), `bbox` (min_lat, max_lat, min_lon, max_lon).
+    """
+    height, width = surface.shape
+    finite = np.isfinite(surface)
+    low = float(surface[finite].min()) if finite.any() else 0.0
+    high = float(surface[finite].max()) if finite.any() else 0.0
+    header = RASTER_HEADER.pack(
+        RASTER_MAGIC, RASTER_VERSION, RASTER_ENCODINGS[encoding], width, height, *bbox, low, high
+    )
+
+    if encoding == "uint16":
+        scale = UINT16_STEPS / (high - low) if high > low else 0.0
+        quantized = np.full(surface.shape, UINT16_NODATA, dtype="<u2")
+        quantized[finite] = np.rint((surface[finite] - low) * scale)
+        return header + quantized.tobytes()
+    return header + np.ascontiguousarray(surface, dtype="<f4").tobytes()
@@ -1,8 +1,11 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import converter, entities, interpolation
+from app.api.v1.endpoints import converter, entities, interpolation, jobs, spatial, tiles
 
 api_router = APIRouter()
 api_router.include_router(converter.router, prefix="/files", tags=["converter"])
 api_router.include_router(entities.router, prefix="/entities", tags=["entities"])
-api_router.include_router(interpolation.router, prefix="/interpolation", tags=["interpolation"])
\ No newline at end of file
+api_router.include_router(interpolation.router, prefix="/interpolation", tags=["interpolation"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(spatial.router, prefix="/spatial", tags=["spatial"])
+api_router.include_router(tiles.router, prefix="/tiles", tags=["tiles"])
\ No newline at end of file
@@ -1,13 +1,12 @@
-import shutil
-import tempfile
-from pathlib import Path
-from typing import List
+from typing import List, Literal
 
-from fastapi import APIRouter, Depends, UploadFile, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
+from app.core.config import settings
 from app.core.converter import Converter
+from app.core.service import curve_interpolator
 
 router = APIRouter()
 
@@ -15,19 +14,18 @@ router = APIRouter()
 @router.post("/convert", status_code=status.HTTP_200_OK)
 async def convert_file(
     file: UploadFile,
+    force: bool = False,
     db: AsyncSession = Depends(deps.get_db),
 ) -> dict:
     """
     Accept a well file, parse it, and persist Well + Curve data to DB.
     Returns a summary of saved entities.
+    Uploads are parsed straight from their request spool, nothing is copied to disk.
+    A file equal to the one the well's curves came from is not written again
+    (status "skipped"), unless force=true.
     """
-    # Save uploaded file to a temporary location
-    with tempfile.NamedTemporaryFile(delete=False) as tmp_in:
-        shutil.copyfileobj(file.file, tmp_in)
-        input_path = Path(tmp_in.name)
-
-    converter = Converter()
-    result = await converter.convert_well_file(db, file_path=str(input_path))
+    converter = Converter(force=force)
+    result = await converter.convert_well_file(db, file=file.file)
 
     return result
 
@@ -35,37 +33,64 @@ async def convert_file(
 @router.post("/convert/batch", status_code=status.HTTP_200_OK)
 async def convert_file_batch(
     files: List[UploadFile],
+    force: bool = False,
     db: AsyncSession = Depends(deps.get_db),
 ) -> list[dict]:
     """
-    Accept multiple well files, parse and persist them sequentially.
-    Returns a list of summaries.
+    Accept multiple well files, parse and persist up to INGEST_CONCURRENCY of them at once.
+    Returns a summary per file, in upload order; a bad file is reported
+    with status "error" and does not fail the rest of the batch, an unchanged
+    one with status "skipped" (unless force=true).
     """
-    temp_paths: list[str] = []
-    for file in files:
-        with tempfile.NamedTemporaryFile(delete=False) as tmp_in:
-            shutil.copyfileobj(file.file, tmp_in)
-            temp_paths.append(tmp_in.name)
+    converter = Converter(force=force)
+    results = await converter.convert_well_file_batch(
+        db, files=[file.file for file in files], concurrency=settings.INGEST_CONCURRENCY
+    )
+    return [{"file_name": file.filename, **result} for file, result in zip(files, results)]
 
-    converter = Converter()
-    results = await converter.convert_well_file_batch(db, file_paths=temp_paths)
-    return results
+
+@router.post("/convert/archive", status_code=status.HTTP_200_OK)
+async def convert_archive(
+    file: UploadFile,
+    interpolate: bool = False,
+    engine: Literal["sql", "numpy"] = "numpy",
+    force: bool = False,
+    db: AsyncSession = Depends(deps.get_db),
+) -> dict:
+    """
+    Accept a .zip / .tar(.gz) archive of well (LAS), welltrack and thickness
+    files and persist all of them, well files up to INGEST_CONCURRENCY at once;
+    see Converter.convert_archive for how members are detected and written.
+    interpolate=true then interpolates the wells that changed, as
+    POST /interpolation/interpolate does, and adds its report under "interpolation".
+    Returns one report for the whole archive, a bad member is reported with
+    status "error" and does not fail the rest. Unchanged well files and wells
+    are skipped, force=true writes them again.
+    """
+    converter = Converter(force=force)
+    try:
+        report = await converter.convert_archive(db, file=file.file, concurrency=settings.INGEST_CONCURRENCY)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if interpolate:
+        report["interpolation"] = await curve_interpolator.interpolate_curves(
+            db, engine=engine, concurrency=settings.INTERPOLATION_CONCURRENCY
+        )
+    return {"file_name": file.filename, **report}
 
 
 @router.post("/convert/welltrack", status_code=status.HTTP_200_OK)
 async def convert_welltrack(
     file: UploadFile,
+    force: bool = False,
     db: AsyncSession = Depends(deps.get_db),
 ) -> dict:
     """
     Accept a welltrack file and persist WellTrack rows for the wells inside.
+    Wells whose rows are unchanged are kept as they are (wells_skipped), unless force=true.
     """
-    with tempfile.NamedTemporaryFile(delete=False) as tmp_in:
-        shutil.copyfileobj(file.file, tmp_in)
-        input_path = Path(tmp_in.name)
-
-    converter = Converter()
-    result = await converter.convert_welltrack(db, file_path=str(input_path))
+    converter = Converter(force=force)
+    result = await converter.convert_welltrack(db, file=file.file)
     return result
 
 
@@ -77,12 +102,8 @@ async def convert_formation_thickness(
     """
     Accept a formation_thickness file and persist FormationThickness rows.
     """
-    with tempfile.NamedTemporaryFile(delete=False) as tmp_in:
-        shutil.copyfileobj(file.file, tmp_in)
-        input_path = Path(tmp_in.name)
-
     converter = Converter()
-    result = await converter.convert_formation_thickness(db, file_path=str(input_path))
+    result = await converter.convert_formation_thickness(db, file=file.file)
     return result
 
 
@@ -94,12 +115,8 @@ async def convert_effective_formation_thickness(
     """
     Accept an effective_formation_thickness file and persist EffectiveFormationThickness rows.
     """
-    with tempfile.NamedTemporaryFile(delete=False) as tmp_in:
-        shutil.copyfileobj(file.file, tmp_in)
-        input_path = Path(tmp_in.name)
-
     converter = Converter()
-    result = await converter.convert_effective_formation_thickness(db, file_path=str(input_path))
+    result = await converter.convert_effective_formation_thickness(db, file=file.file)
     return result
 
 
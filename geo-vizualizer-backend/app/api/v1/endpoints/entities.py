@@ -1,10 +1,18 @@
-from typing import List
-
-from fastapi import APIRouter, Depends
+import json
+from collections.abc import AsyncIterator, Callable, Sequence
+from typing import Any, List, Optional
+
+import numpy as np
+from fastapi import APIRouter, Depends, Header, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
-from app.api import deps
+from app.api import caching, columnar, deps
+from app.core import payload_cache
+from app.core.service import level_of_detail
+from app.db.session import AsyncSessionLocal
 from app.schemas import curve as curve_schema
 from app.schemas import effective_formation_thickness as eft_schema
 from app.schemas import formation_thickness as ft_schema
@@ -13,39 +21,183 @@ from app.schemas import welltrack as welltrack_schema
 
 router = APIRouter()
 
+# rows per page of the keyset-paginated list endpoints
+DEFAULT_PAGE_SIZE = 1_000
+MAX_PAGE_SIZE = 10_000
+
+JSON_MEDIA_TYPE = "application/json"
+WELLTRACKS_JSON = TypeAdapter(List[welltrack_schema.WellTrack])
+CURVES_JSON = TypeAdapter(List[curve_schema.Curve])
+
 
 @router.get("/wells", response_model=List[well_schema.Well])
 async def list_wells(db: AsyncSession = Depends(deps.get_db)):
     return await crud.wells.get_multi(db)
 
 @router.get("/wells/{well_id}/welltrack", response_model=List[welltrack_schema.WellTrack])
-async def get_welltrack(well_id: int, db: AsyncSession = Depends(deps.get_db)):
-    return await crud.welltracks.get_by_well_id(db, well_id)
+async def get_welltrack(
+    well_id: int,
+    max_points: Optional[int] = Query(None, ge=2),
+    tolerance: Optional[float] = Query(None, ge=0),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(deps.get_db),
+):
+    """
+    JSON by default; columnar binary for the media types in app.api.columnar.
+    max_points / tolerance (metres): simplified track, see app.core.service.level_of_detail.
+    Served from app.core.payload_cache with an ETag until the well's track is replaced.
+    """
+    media_type = columnar.negotiate(accept)
+
+    async def build() -> tuple[bytes, str]:
+        if max_points is not None or tolerance is not None:
+            columns = await level_of_detail.welltrack(db, well_id, max_points=max_points, tolerance=tolerance)
+            return _encode_lod(columns, media_type, well_id)
+        if media_type:
+            columns = await crud.welltracks.get_columns_by_well_id(db, well_id)
+            return columnar.encode(columns, media_type), media_type
+        return WELLTRACKS_JSON.dump_json(await crud.welltracks.get_by_well_id(db, well_id)), JSON_MEDIA_TYPE
+
+    return await caching.cached_response(
+        ("welltrack", well_id, media_type, max_points, tolerance),
+        build,
+        if_none_match=if_none_match,
+        tags=[payload_cache.well_tag(well_id)],
+        vary="Accept",
+    )
 
 @router.get("/wells/{well_id}/curve", response_model=List[curve_schema.Curve])
-async def get_welltrack(well_id: int, db: AsyncSession = Depends(deps.get_db)):
-    return await crud.curves.get_by_well_id(db, well_id)
+async def get_curve(
+    well_id: int,
+    max_points: Optional[int] = Query(None, ge=2),
+    tolerance: Optional[float] = Query(None, ge=0),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(deps.get_db),
+):
+    """
+    JSON by default; columnar binary for the media types in app.api.columnar.
+    max_points / tolerance (metres of measured depth): simplified curve that keeps
+    every 0/1 type change, see app.core.service.level_of_detail.
+    Served from app.core.payload_cache with an ETag until the well's curve is replaced.
+    """
+    media_type = columnar.negotiate(accept)
+
+    async def build() -> tuple[bytes, str]:
+        if max_points is not None or tolerance is not None:
+            columns = await level_of_detail.curve(db, well_id, max_points=max_points, tolerance=tolerance)
+            return _encode_lod(columns, media_type, well_id)
+        if media_type:
+            columns = await crud.curves.get_columns_by_well_id(db, well_id)
+            return columnar.encode(columns, media_type), media_type
+        return CURVES_JSON.dump_json(await crud.curves.get_by_well_id(db, well_id)), JSON_MEDIA_TYPE
+
+    return await caching.cached_response(
+        ("curve", well_id, media_type, max_points, tolerance),
+        build,
+        if_none_match=if_none_match,
+        tags=[payload_cache.well_tag(well_id)],
+        vary="Accept",
+    )
 
 @router.get("/welltracks", response_model=List[welltrack_schema.WellTrack])
-async def list_welltracks(db: AsyncSession = Depends(deps.get_db)):
-    return await crud.welltracks.get_multi(db)
+async def list_welltracks(
+    response: Response,
+    after_id: Optional[int] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(deps.get_db),
+):
+    return _page(response, await crud.welltracks.get_page(db, after_id=after_id, limit=limit), limit)
+
+
+@router.get("/welltracks/stream")
+async def stream_welltracks(after_id: Optional[int] = None):
+    return _ndjson_response(crud.welltracks.stream_rows, after_id)
 
 
 @router.get("/curves", response_model=List[curve_schema.Curve])
-async def list_curves(db: AsyncSession = Depends(deps.get_db)):
-    return await crud.curves.get_multi(db)
+async def list_curves(
+    response: Response,
+    after_id: Optional[int] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(deps.get_db),
+):
+    return _page(response, await crud.curves.get_page(db, after_id=after_id, limit=limit), limit)
+
+
+@router.get("/curves/stream")
+async def stream_curves(after_id: Optional[int] = None):
+    return _ndjson_response(crud.curves.stream_rows, after_id)
 
 
 @router.get("/formation-thickness", response_model=List[ft_schema.FormationThickness])
-async def list_formation_thickness(db: AsyncSession = Depends(deps.get_db)):
-    return await crud.formation_thickness.get_multi(db)
+async def list_formation_thickness(
+    response: Response,
+    after_id: Optional[int] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(deps.get_db),
+):
+    return _page(
+        response, await crud.formation_thickness.get_page(db, after_id=after_id, limit=limit), limit
+    )
+
+
+@router.get("/formation-thickness/stream")
+async def stream_formation_thickness(after_id: Optional[int] = None):
+    return _ndjson_response(crud.formation_thickness.stream_rows, after_id)
 
 
 @router.get(
     "/effective-formation-thickness",
     response_model=List[eft_schema.EffectiveFormationThickness],
 )
-async def list_effective_formation_thickness(db: AsyncSession = Depends(deps.get_db)):
-    return await crud.effective_formation_thickness.get_multi(db)
-
-
+async def list_effective_formation_thickness(
+    response: Response,
+    after_id: Optional[int] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(deps.get_db),
+):
+    return _page(
+        response,
+        await crud.effective_formation_thickness.get_page(db, after_id=after_id, limit=limit),
+        limit,
+    )
+
+
+@router.get("/effective-formation-thickness/stream")
+async def stream_effective_formation_thickness(after_id: Optional[int] = None):
+    return _ndjson_response(crud.effective_formation_thickness.stream_rows, after_id)
+
+
+def _encode_lod(columns: dict[str, np.ndarray], media_type: Optional[str], well_id: int) -> tuple[bytes, str]:
+    if media_type:
+        return columnar.encode(columns, media_type), media_type
+    body = json.dumps(columnar.records(columns, well_id=well_id), separators=(",", ":"))
+    return body.encode(), JSON_MEDIA_TYPE
+
+
+def _page(response: Response, items: Sequence[Any], limit: int) -> Sequence[Any]:
+    """
+    Keyset page: a full page sets X-Next-After-Id, pass it as after_id for the next one.
+    """
+    if len(items) == limit:
+        response.headers["X-Next-After-Id"] = str(items[-1].id)
+    return items
+
+
+def _ndjson_response(
+    stream_rows: Callable[..., AsyncIterator[list[dict]]], after_id: Optional[int]
+) -> StreamingResponse:
+    """
+    One JSON object per line, rows ordered by id, read through a server-side cursor.
+    The session is opened inside the generator: the request-scoped one from
+    deps.get_db is closed before the body is streamed.
+    """
+
+    async def body() -> AsyncIterator[str]:
+        async with AsyncSessionLocal() as db:
+            async for rows in stream_rows(db, after_id=after_id):
+                yield "".join(json.dumps(row) + "\n" for row in rows)
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
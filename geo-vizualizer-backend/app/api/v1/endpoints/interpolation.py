@@ -1,48 +1,178 @@
+import json
+from collections import defaultdict
+from collections.abc import AsyncIterator
 from typing import List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
-from app.api import deps
-from app.core.service import curve_interpolator
-from pydantic import BaseModel
-from typing import Optional
-
-
-from collections import defaultdict
+from app.api import caching, columnar, deps, raster
+from app.core import payload_cache
+from app.core.config import settings
+from app.core.service import curve_interpolator, level_of_detail, surface_interpolator
+from app.db.session import AsyncSessionLocal
+from typing import Literal, Optional
 
 router = APIRouter()
 
+# cells per side of /surface rasters
+DEFAULT_SURFACE_SIZE = 256
+MAX_SURFACE_SIZE = 2048
+
 
 @router.post("/interpolate")
-async def interpolate(db: AsyncSession = Depends(deps.get_db)):
-    await curve_interpolator.interpolate_curves(db)
+async def interpolate(
+    engine: Literal["sql", "numpy"] = "numpy",
+    force: bool = False,
+    db: AsyncSession = Depends(deps.get_db),
+) -> dict:
+    """
+    Interpolate wells whose curve/welltrack changed since the last run
+    (all wells with force=true), up to INTERPOLATION_CONCURRENCY at once.
+    Returns totals plus per-well status, row count, timing and failure reason.
+    """
+    return await curve_interpolator.interpolate_curves(
+        db, engine=engine, concurrency=settings.INTERPOLATION_CONCURRENCY, force=force
+    )
 
 @router.get("/interpolate/wells")
-async def interpolate(db: AsyncSession = Depends(deps.get_db)):
-    interpolated_curve_points = await crud.interpolated_curves.get_multi(db)
-    data: dict[int, list[InterpolatedPointDTO]] = defaultdict(list)
-
-    for row in interpolated_curve_points:
-        data[row.well_id].append(
-            InterpolatedPointDTO(
-                type=row.type,
-                lat=row.lat,
-                lon=row.lon,
-                measured_depth=row.measured_depth,
-                absolute_depth=row.absolute_depth,
+async def interpolate(
+    well_ids: Optional[List[int]] = Query(None),
+    min_lat: Optional[float] = None,
+    max_lat: Optional[float] = None,
+    min_lon: Optional[float] = None,
+    max_lon: Optional[float] = None,
+    max_points: Optional[int] = Query(None, ge=2),
+    tolerance: Optional[float] = Query(None, ge=0),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(deps.get_db),
+):
+    """
+    Interpolated points, optionally only for well_ids and/or inside a lat/lon box.
+    JSON: {well_id: [{type, lat, lon, measured_depth, absolute_depth}, ...]},
+    built per well in Postgres and streamed. Columnar binary (see app.api.columnar):
+    one row per point ordered by well_id, with a well_id column instead of grouping.
+    max_points (per well) / tolerance (metres): every well simplified,
+    see app.core.service.level_of_detail.
+    Served from app.core.payload_cache with an ETag until wells are re-ingested
+    or re-interpolated.
+    """
+    media_type = columnar.negotiate(accept)
+    key = (
+        "interpolated",
+        tuple(well_ids) if well_ids is not None else None,
+        min_lat,
+        max_lat,
+        min_lon,
+        max_lon,
+        max_points,
+        tolerance,
+        media_type,
+    )
+    tags = [payload_cache.INTERPOLATED_TAG]
+
+    if max_points is not None or tolerance is not None:
+
+        async def build_simplified() -> tuple[bytes, str]:
+            columns = await level_of_detail.interpolated(
+                db,
+                well_ids=well_ids,
+                max_points=max_points,
+                tolerance=tolerance,
+                min_lat=min_lat,
+                max_lat=max_lat,
+                min_lon=min_lon,
+                max_lon=max_lon,
             )
+            if media_type:
+                return columnar.encode(columns, media_type), media_type
+            grouped = defaultdict(list)
+            for point in columnar.records(columns):
+                grouped[point.pop("well_id")].append(point)
+            return json.dumps(grouped, separators=(",", ":")).encode(), "application/json"
+
+        return await caching.cached_response(
+            key, build_simplified, if_none_match=if_none_match, tags=tags, vary="Accept"
         )
 
-    return data
+    filters = crud.interpolated_curves.point_filters(
+        well_ids=well_ids, min_lat=min_lat, max_lat=max_lat, min_lon=min_lon, max_lon=max_lon
+    )
+    if media_type:
+
+        async def build_columns() -> tuple[bytes, str]:
+            columns = await crud.interpolated_curves.get_columns(db, filters=filters)
+            return columnar.encode(columns, media_type), media_type
+
+        return await caching.cached_response(
+            key, build_columns, if_none_match=if_none_match, tags=tags, vary="Accept"
+        )
 
+    async def body() -> AsyncIterator[str]:
+        # own session: the request-scoped one is closed before the body is streamed
+        async with AsyncSessionLocal() as session:
+            separator = "{"
+            async for well_id, points in crud.interpolated_curves.stream_json_by_well(
+                session, filters=filters
+            ):
+                yield f'{separator}"{well_id}":{points}'
+                separator = ","
+            yield "{}" if separator == "{" else "}"
 
+    return caching.cached_stream(
+        key, body, media_type="application/json", if_none_match=if_none_match, tags=tags, vary="Accept"
+    )
 
 
-class InterpolatedPointDTO(BaseModel):
-    type: Optional[str] = None
-    lat: float
-    lon: float
-    measured_depth: float
-    absolute_depth: float
+@router.get("/surface/{layer}")
+async def surface(
+    layer: Literal["formation-thickness", "effective-formation-thickness"],
+    method: Literal["idw", "kriging"] = "idw",
+    width: int = Query(DEFAULT_SURFACE_SIZE, ge=2, le=MAX_SURFACE_SIZE),
+    height: int = Query(DEFAULT_SURFACE_SIZE, ge=2, le=MAX_SURFACE_SIZE),
+    neighbours: int = Query(12, ge=1, le=64),
+    power: float = Query(2.0, gt=0, le=10),
+    min_lat: Optional[float] = None,
+    max_lat: Optional[float] = None,
+    min_lon: Optional[float] = None,
+    max_lon: Optional[float] = None,
+    encoding: Literal["float32", "uint16"] = "float32",
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(deps.get_db),
+):
+    """
+    Thickness raster of width x height cells over the field extent (or the
+    given lat/lon box, all four bounds), see app.api.raster for the format.
+    IDW over the nearest `neighbours` points with distance power `power`,
+    or ordinary kriging. Cached per dataset version of the layer.
+    """
+    bounds = (min_lat, max_lat, min_lon, max_lon)
+    if any(b is not None for b in bounds) and None in bounds:
+        raise HTTPException(status_code=422, detail="Pass all of min_lat, max_lat, min_lon, max_lon or none")
+    bbox = None if None in bounds else bounds
+    if bbox and (bbox[0] >= bbox[1] or bbox[2] >= bbox[3]):
+        raise HTTPException(status_code=422, detail="min_lat/min_lon must be below max_lat/max_lon")
+    name = layer.replace("-", "_")
+    version = await crud.dataset_versions.get(db, name=name)
+
+    async def build() -> tuple[bytes, str]:
+        try:
+            grid_values, grid = await surface_interpolator.build_surface(
+                db,
+                name,
+                width=width,
+                height=height,
+                bbox=bbox,
+                method=method,
+                neighbours=neighbours,
+                power=power,
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=404, detail=str(exc))
+        extent = (grid.min_lat, grid.max_lat, grid.min_lon, grid.max_lon)
+        return raster.encode(grid_values, extent, encoding), raster.SURFACE_MEDIA_TYPE
+
+    key = ("surface", name, version, method, width, height, neighbours, power, bbox, encoding)
+    return await caching.cached_response(key, build, if_none_match=if_none_match, tags=())
@@ -0,0 +1,83 @@
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, schemas
+from app.api import deps
+from app.core.config import settings
+from app.core.service import ingest_jobs
+
+router = APIRouter()
+
+JobKind = Literal["curve", "welltrack", "formation-thickness", "effective-formation-thickness", "archive"]
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+
+@router.post("/{kind}", response_model=schemas.IngestJob, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(
+    kind: JobKind,
+    file: UploadFile,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: AsyncSession = Depends(deps.get_db),
+):
+    """
+    Queue a file for ingest and return the job right away (202); poll
+    GET /jobs/{id} for its status and, once succeeded, the converter summary
+    (curves_saved / rows_saved ...), as returned by the /files/convert endpoints.
+    Kinds: curve (LAS well file), welltrack, formation-thickness,
+    effective-formation-thickness, archive (as /files/convert/archive, without interpolation).
+    A retry with the same Idempotency-Key header returns the first job (200)
+    instead of ingesting the file again.
+    An archive job commits member by member: while it runs, and if it is
+    cancelled or fails, result["committed"] lists the members already written;
+    those stay written and are not ingested again if the job is re-run.
+    """
+    job, created = await ingest_jobs.enqueue(
+        db,
+        kind=kind.replace("-", "_"),
+        source=file.file,
+        file_name=file.filename,
+        idempotency_key=idempotency_key,
+    )
+    if not created:
+        response.status_code = status.HTTP_200_OK
+    response.headers["Location"] = f"{settings.API_V1_STR}/jobs/{job.id}"
+    return job
+
+
+@router.get("", response_model=List[schemas.IngestJob])
+async def list_jobs(
+    status: Optional[JobStatus] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(deps.get_db),
+):
+    """
+    Latest jobs first, optionally only those with `status`.
+    """
+    return await crud.ingest_jobs.get_multi(db, status=status, limit=limit)
+
+
+@router.get("/{job_id}", response_model=schemas.IngestJob)
+async def get_job(job_id: int, db: AsyncSession = Depends(deps.get_db)):
+    job = await crud.ingest_jobs.get(db, job_id=job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+@router.delete("/{job_id}", response_model=schemas.IngestJob, status_code=status.HTTP_202_ACCEPTED)
+async def cancel_job(job_id: int, db: AsyncSession = Depends(deps.get_db)):
+    """
+    Cancel a job: a queued one is cancelled at once, a running one is stopped
+    by its worker shortly after (status "running" with cancel_requested until
+    then) and its rows are rolled back. For an archive job only the member in
+    progress is rolled back, see result["committed"]. 409 for a finished job.
+    """
+    job = await ingest_jobs.cancel(db, job_id=job_id)
+    if job is not None:
+        return job
+    if await crud.ingest_jobs.get(db, job_id=job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    raise HTTPException(status_code=409, detail=f"Job {job_id} is already finished")
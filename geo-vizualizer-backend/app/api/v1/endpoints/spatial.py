@@ -0,0 +1,68 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.core.service import spatial
+from app.db.spatial import Area, BBox, Circle
+from app.schemas import effective_formation_thickness as eft_schema
+from app.schemas import formation_thickness as ft_schema
+from app.schemas import well as well_schema
+from app.schemas import welltrack as welltrack_schema
+
+router = APIRouter()
+
+
+def get_area(
+    min_lat: Optional[float] = Query(None, ge=-90, le=90),
+    max_lat: Optional[float] = Query(None, ge=-90, le=90),
+    min_lon: Optional[float] = Query(None, ge=-180, le=180),
+    max_lon: Optional[float] = Query(None, ge=-180, le=180),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    radius: Optional[float] = Query(None, gt=0, description="metres"),
+) -> Area:
+    """
+    Either a box (min_lat, max_lat, min_lon, max_lon) or a circle (lat, lon, radius).
+    """
+    box = (min_lat, max_lat, min_lon, max_lon)
+    circle = (lat, lon, radius)
+    if None not in box and all(v is None for v in circle):
+        return BBox(*box)
+    if None not in circle and all(v is None for v in box):
+        return Circle(*circle)
+    raise HTTPException(
+        status_code=422,
+        detail="Pass either min_lat, max_lat, min_lon, max_lon or lat, lon, radius",
+    )
+
+
+@router.get("/wells", response_model=List[well_schema.Well])
+async def wells_in_area(area: Area = Depends(get_area), db: AsyncSession = Depends(deps.get_db)):
+    """
+    Wells with at least one welltrack point inside the area.
+    """
+    return await spatial.find_wells(db, area)
+
+
+@router.get("/welltracks", response_model=List[welltrack_schema.WellTrack])
+async def welltracks_in_area(area: Area = Depends(get_area), db: AsyncSession = Depends(deps.get_db)):
+    return await spatial.find_points(db, "welltrack", area)
+
+
+@router.get("/formation-thickness", response_model=List[ft_schema.FormationThickness])
+async def formation_thickness_in_area(
+    area: Area = Depends(get_area), db: AsyncSession = Depends(deps.get_db)
+):
+    return await spatial.find_points(db, "formation_thickness", area)
+
+
+@router.get(
+    "/effective-formation-thickness",
+    response_model=List[eft_schema.EffectiveFormationThickness],
+)
+async def effective_formation_thickness_in_area(
+    area: Area = Depends(get_area), db: AsyncSession = Depends(deps.get_db)
+):
+    return await spatial.find_points(db, "effective_formation_thickness", area)
@@ -0,0 +1,32 @@
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import caching, deps
+from app.core import mvt
+from app.core.service import tiles
+
+router = APIRouter()
+
+TileLayer = Literal["wells", "welltracks", "formation_thickness", "effective_formation_thickness"]
+
+
+@router.get("/{z}/{x}/{y}")
+async def get_tile(
+    z: int = Path(..., ge=0, le=tiles.MAX_ZOOM),
+    x: int = Path(..., ge=0),
+    y: int = Path(..., ge=0),
+    layers: Optional[List[TileLayer]] = Query(None, description="all layers if not given"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(deps.get_db),
+):
+    """
+    Mapbox Vector Tile z/x/y (Web Mercator, XYZ scheme) with well heads,
+    trajectories and thickness points, see app.core.service.tiles.
+    Cached on disk per dataset version; empty body for a tile without data.
+    """
+    if x >= 1 << z or y >= 1 << z:
+        raise HTTPException(status_code=404, detail=f"No tile {z}/{x}/{y}")
+    body = await tiles.get_tile(db, z, x, y, list(dict.fromkeys(layers or tiles.LAYERS)))
+    return caching.etag_response(body, mvt.MEDIA_TYPE, if_none_match=if_none_match)
@@ -0,0 +1,82 @@
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from typing import Any, NamedTuple
+
+
+class _Entry(NamedTuple):
+    value: Any
+    size: int
+    expires_at: float | None
+    tags: tuple[Hashable, ...]
+
+
+class ByteLRUCache:
+    """
+    In-process LRU cache bounded by the total size of its values.
+    Sizes are given by the caller on put (for NumPy arrays, their nbytes);
+    least recently used entries are evicted until the total fits max_bytes.
+    A value larger than max_bytes is not stored at all.
+    - ttl: seconds an entry stays valid, None for no expiry
+    - tags: put(..., tags=...) groups entries, invalidate(tag) drops the group
+    Not thread-safe: use it from the event loop only.
+    """
+
+    def __init__(self, max_bytes: int, *, ttl: float | None = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.total_bytes = 0
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._tagged: dict[Hashable, set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+            self.discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def put(self, key: Hashable, value: Any, size: int, *, tags: Iterable[Hashable] = ()) -> None:
+        self.discard(key)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        entry = _Entry(value, size, expires_at, tuple(tags))
+        self._entries[key] = entry
+        self.total_bytes += size
+        for tag in entry.tags:
+            self._tagged.setdefault(tag, set()).add(key)
+        while self.total_bytes > self.max_bytes:
+            self.discard(next(iter(self._entries)))
+
+    def discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.total_bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+    def invalidate(self, tag: Hashable) -> int:
+        """
+        Drop every entry put with `tag`, returns how many.
+        """
+        keys = self._tagged.pop(tag, set())
+        for key in keys:
+            self.discard(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tagged.clear()
+        self.total_bytes = 0
@@ -26,6 +26,18 @@ class Settings:
         self.DB_MAX_OVERFLOW = data["DB_MAX_OVERFLOW"]
         self.DB_POOL_TIMEOUT = data["DB_POOL_TIMEOUT"]
         self.FRONTEND_HOST = data["FRONTEND_HOST"]
+        self.INGEST_CHUNK_BYTES = data["INGEST_CHUNK_BYTES"]
+        self.PARSER_WORKERS = data["PARSER_WORKERS"]
+        self.INGEST_CONCURRENCY = data["INGEST_CONCURRENCY"]
+        self.INTERPOLATION_CONCURRENCY = data["INTERPOLATION_CONCURRENCY"]
+        self.LOD_CACHE_BYTES = data["LOD_CACHE_BYTES"]
+        self.RESPONSE_CACHE_BYTES = data["RESPONSE_CACHE_BYTES"]
+        self.RESPONSE_CACHE_TTL = data["RESPONSE_CACHE_TTL"]
+        self.TILE_CACHE_DIR = data["TILE_CACHE_DIR"]
+        self.INGEST_WORKERS = data["INGEST_WORKERS"]
+        self.JOB_SPOOL_DIR = data["JOB_SPOOL_DIR"]
+        self.JOB_POLL_INTERVAL = data["JOB_POLL_INTERVAL"]
+        self.JOB_STALE_AFTER = data["JOB_STALE_AFTER"]
 
     @property
     def DATABASE_URL(self) -> str:
@@ -1,131 +1,343 @@
-import re
-from pathlib import Path
-from typing import Any
-
+import asyncio
+import copy
+import hashlib
+import io
+import os
+import tarfile
+import zipfile
+from collections.abc import AsyncIterator, Awaitable, Callable, Collection, Iterable, Iterator
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Any, BinaryIO, TypeVar
+
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
+from app.core import executor, parsers, payload_cache
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+
+T = TypeVar("T")
+
+# first bytes of an archive member its kind is detected from
+ARCHIVE_SNIFF_BYTES = 64 * 1024
+# tar members up to this size are buffered in memory to be converted alongside the next ones
+ARCHIVE_BUFFER_BYTES = 64 * 1024 * 1024
+# read size when hashing an input file
+HASH_BLOCK_BYTES = 1024 * 1024
 
 
 class Converter:
-    def __init__(self, output_file: str | None = None):
+    def __init__(
+        self,
+        output_file: str | None = None,
+        *,
+        bulk: bool = True,
+        parser: str = "numpy",
+        stream: bool = True,
+        chunk_bytes: int | None = None,
+        force: bool = False,
+        before_commit: Callable[[AsyncSession, dict[str, Any]], Awaitable[None]] | None = None,
+    ):
+        if parser not in parsers.PARSER_BACKENDS:
+            raise ValueError(f"Unknown parser backend: {parser}")
+        if stream and not bulk:
+            raise ValueError("Streaming mode writes batches via COPY and requires bulk=True")
         self.output_file = output_file
-
-    async def convert_well_file(self, db: AsyncSession, *, file_path: str) -> dict[str, Any]:
+        # bulk=True writes curve/welltrack rows via COPY instead of ORM objects
+        self.bulk = bulk
+        # "numpy" parses ~Ascii and welltrack block bodies in one vectorized pass each,
+        # "python" is the line-by-line reference
+        self.parser = parser
+        # stream=True reads files in chunk_bytes blocks cut at line breaks and writes
+        # every batch as soon as it is parsed, so memory depends on chunk_bytes, not file size
+        self.stream = stream
+        self.chunk_bytes = chunk_bytes or settings.INGEST_CHUNK_BYTES
+        # force=True writes well and welltrack inputs even when their content hash
+        # equals the one stored for the well
+        self.force = force
+        # awaited with the session and the result of an ingest right before it
+        # commits, so a caller can record the outcome in the same transaction
+        # (see app.core.service.ingest_jobs)
+        self.before_commit = before_commit
+
+    async def convert_well_file(
+        self, db: AsyncSession, *, file_path: str | None = None, file: BinaryIO | None = None
+    ) -> dict[str, Any]:
         """
         Parse LAS-like file and persist Well + Curve rows into DB.
         - ~Well: STRT -> start_measured_depth, STOP -> end_measured_depth, WELL -> name + id
         - ~Ascii: first column -> measured_depth, second -> type (only 0/1 kept, else empty)
         - ~Version is skipped
+        Parsing is done by app.core.parsers with the backend selected in __init__,
+        on the parser process pool (see app.core.executor).
+        The input is `file_path` or an open binary `file` (e.g. an upload,
+        read straight from its request spool), see _open.
+        The sha256 of the file is stored as the well's curve_hash: a file equal to
+        the one the well's curves came from is not written again (status "skipped",
+        the well's data_version and the curve dataset version stay as they are).
+        An input that cannot be rewound (a large tar member) is always written.
         """
-        lines = Path(file_path).read_text(encoding="utf-8").splitlines()
+        with self._open(file_path, file) as fh:
+            content_hash = await asyncio.to_thread(self._content_hash, fh)
+            if self.stream:
+                well_data, chunks = parsers.stream_well_file(fh, chunk_bytes=self.chunk_bytes)
+                batches = self._parse_ahead(parsers.parse_ascii, chunks, backend=self.parser)
+            else:
+                well_data, depths, types = await executor.submit(
+                    parsers.parse_well_text, fh.read().decode("utf-8"), backend=self.parser
+                )
+                batches = self._iter_async([(depths, types)])
 
-        well_data: dict[str, Any] = {
-            "id": None,
-            "name": None,
-            "start_measured_depth": None,
-            "end_measured_depth": None,
-        }
-        curves: list[dict[str, Any]] = []
+            if well_data["id"] is None or well_data["name"] is None:
+                raise ValueError("Well information is incomplete in ~Well block")
 
-        current_block = None
-        for raw in lines:
-            line = raw.strip()
-            if not line:
-                continue
+            well_id = well_data["id"]
+            if content_hash is not None and not self.force:
+                stored = await crud.wells.get_content_hashes(db, kind="curve", well_ids=[well_id])
+                if stored.get(well_id) == (well_data["name"], content_hash):
+                    return {
+                        "well_id": well_id,
+                        "well_name": well_data["name"],
+                        "status": "skipped",
+                        "curves_saved": 0,
+                    }
 
-            if line.startswith("~"):
-                header = line.lower()
-                if header.startswith("~well"):
-                    current_block = "well"
-                elif header.startswith("~curve"):
-                    current_block = "curve"
-                elif header.startswith("~ascii"):
-                    current_block = "ascii"
+            # Upsert well and replace curves
+            await crud.wells.upsert_many(db, wells=[well_data])
+            if self.bulk:
+                await crud.curves.delete_for_well(db, well_id=well_id)
+                curves_saved = 0
+                async for depths, types in batches:
+                    curves_saved += await crud.curves.copy_rows(
+                        db, well_id=well_id, rows=zip(depths, types)
+                    )
+            else:
+                curves = [
+                    {"measured_depth": measured_depth, "type": type_value}
+                    async for depths, types in batches
+                    for measured_depth, type_value in zip(depths, types)
+                ]
+                curves_saved = await crud.curves.replace_for_well(db, well_id=well_id, curves=curves)
+            await crud.wells.set_content_hashes(db, kind="curve", hashes={well_id: content_hash})
+
+        result = {
+            "well_id": well_id,
+            "well_name": well_data["name"],
+            "status": "ok",
+            "curves_saved": curves_saved,
+        }
+        await self._commit(db, result)
+        payload_cache.invalidate_wells([well_id])
+        await self._bump_dataset_version(db, "curve")
+        return result
+
+    async def convert_well_file_batch(
+        self,
+        db: AsyncSession,
+        *,
+        file_paths: list[str] | None = None,
+        files: list[BinaryIO] | None = None,
+        concurrency: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Process multiple well files, given as `file_paths` or open binary `files`,
+        and return per-file summaries in input order.
+        - concurrency None or 1: files go one after another through `db`
+        - concurrency > 1: up to `concurrency` files at once, each in its own
+          session from AsyncSessionLocal
+        Either way every file gets its summary with status "ok" (or "skipped",
+        unchanged) or status "error" with the reason; a failing file is rolled
+        back on its own and does not stop the rest.
+        """
+        if (file_paths is None) == (files is None):
+            raise ValueError("Pass exactly one of file_paths and files")
+        if files is None:
+            sources = [{"file_path": path} for path in file_paths]
+        else:
+            sources = [{"file": file} for file in files]
+
+        if not concurrency or concurrency <= 1:
+            results: list[dict[str, Any]] = []
+            for source in sources:
+                try:
+                    result = await self.convert_well_file(db, **source)
+                except Exception as exc:
+                    await db.rollback()
+                    results.append({"status": "error", "error": str(exc) or type(exc).__name__})
                 else:
-                    current_block = None
-                continue
-
-            if line.startswith("#"):
-                continue
+                    results.append({"status": "ok", **result})
+            return results
 
-            if current_block == "well":
-                if line.upper().startswith("STRT"):
-                    match = re.search(r"STRT\s*\.\S*\s*([-\d\.]+)", line, re.IGNORECASE)
-                    if match:
-                        well_data["start_measured_depth"] = float(match.group(1))
-                elif line.upper().startswith("STOP"):
-                    match = re.search(r"STOP\s*\.\S*\s*([-\d\.]+)", line, re.IGNORECASE)
-                    if match:
-                        well_data["end_measured_depth"] = float(match.group(1))
-                elif line.upper().startswith("WELL"):
-                    match = re.search(r"WELL\.\s*([A-Za-z0-9_]+)", line, re.IGNORECASE)
-                    if match:
-                        well_name = match.group(1)
-                        well_data["name"] = well_name
-                        id_match = re.search(r"(\d+)$", well_name)
-                        if id_match:
-                            well_data["id"] = int(id_match.group(1))
-
-            elif current_block == "ascii":
-                parts = line.split()
-                if len(parts) < 2:
-                    continue
-                try:
-                    measured_depth = float(parts[0])
-                except ValueError:
-                    continue
+        semaphore = asyncio.Semaphore(concurrency)
 
-                type_raw = parts[1]
-                type_value = ""
+        async def convert_one(source: dict[str, Any]) -> dict[str, Any]:
+            async with semaphore:
                 try:
-                    numeric_type = float(type_raw)
-                    if numeric_type in (0.0, 1.0):
-                        type_value = str(int(numeric_type))
-                except ValueError:
-                    type_value = None
-
-                curves.append(
-                    {
-                        "measured_depth": measured_depth,
-                        "type": type_value,
-                    }
-                )
-
-        if well_data["id"] is None or well_data["name"] is None:
-            raise ValueError("Well information is incomplete in ~Well block")
-
-        well_id = well_data["id"]
-
-        # Upsert well and replace curves
-        await crud.wells.upsert(
-            db,
-            well_id=well_id,
-            name=well_data["name"],
-            start_measured_depth=well_data["start_measured_depth"],
-            end_measured_depth=well_data["end_measured_depth"],
-        )
-        await crud.curves.replace_for_well(db, well_id=well_id, curves=curves)
-
-        await db.commit()
+                    async with AsyncSessionLocal() as session:
+                        result = await self.convert_well_file(session, **source)
+                except Exception as exc:
+                    return {"status": "error", "error": str(exc) or type(exc).__name__}
+                return {"status": "ok", **result}
+
+        return list(await asyncio.gather(*(convert_one(source) for source in sources)))
+
+    async def convert_archive(
+        self,
+        db: AsyncSession,
+        *,
+        file_path: str | None = None,
+        file: BinaryIO | None = None,
+        concurrency: int | None = None,
+        done: Collection[str] = (),
+    ) -> dict[str, Any]:
+        """
+        Ingest every file in a .zip or .tar (.gz, .bz2, .xz) archive. Members are
+        parsed as streams out of the archive, nothing is extracted to disk.
+        - the kind of a member comes from its name and first ARCHIVE_SNIFF_BYTES,
+          see parsers.detect_file_kind; other files and hidden ones are "skipped"
+        - well files run up to `concurrency` (default INGEST_CONCURRENCY) at once,
+          each in its own session; welltrack and thickness members write many
+          wells in one transaction and run one at a time through `db`, so no two
+          transactions wait on each other's well rows
+        - every member is committed on its own; a failing member is reported
+          with status "error" and does not stop the rest
+        - a well file equal to the one already stored for its well is "skipped"
+          and counted as unchanged; welltrack members skip their unchanged wells
+          (see convert_well_file, convert_welltrack), so re-uploading an archive
+          costs the time of the files that changed
+        - before_commit is called for every member, with its name under "member";
+          members named in `done` (committed by an earlier run, as recorded by
+          that hook) are "skipped" without being read
+        - tar archives can only be read in order: members up to
+          ARCHIVE_BUFFER_BYTES are buffered in memory to run alongside the next
+          ones, larger ones are converted before reading on
+        Returns counts, rows saved per kind and per-member results in archive order.
+        """
+        slots = asyncio.Semaphore(max(1, concurrency or settings.INGEST_CONCURRENCY))
+        multi_well = asyncio.Lock()
+        members: list[dict[str, Any]] = []
+        tasks: list[asyncio.Task[None]] = []
 
+        async def convert_member(entry: dict[str, Any], stream: BinaryIO) -> None:
+            converter = self._member_converter(entry["name"])
+            try:
+                if entry["kind"] == "curve":
+                    async with AsyncSessionLocal() as session:
+                        result = await converter.convert_well_file(session, file=stream)
+                else:
+                    async with multi_well:
+                        try:
+                            result = await getattr(converter, f"convert_{entry['kind']}")(db, file=stream)
+                        except Exception:
+                            await db.rollback()
+                            raise
+            except Exception as exc:
+                entry.update(status="error", error=str(exc) or type(exc).__name__)
+            else:
+                entry.update({"status": "ok", **result})
+            finally:
+                stream.close()
+                slots.release()
+
+        with self._open(file_path, file) as fh:
+            try:
+                for name, size, member, in_order in self._iter_archive(fh):
+                    entry: dict[str, Any] = {"name": name, "kind": None}
+                    members.append(entry)
+                    base_name = os.path.basename(name)
+                    if base_name.startswith(".") or "__MACOSX" in name.split("/"):
+                        entry["status"] = "skipped"
+                        member.close()
+                        continue
+                    if name in done:
+                        entry.update(status="skipped", reason="committed by an earlier run")
+                        member.close()
+                        continue
+
+                    await slots.acquire()
+                    stream = io.BufferedReader(member, buffer_size=ARCHIVE_SNIFF_BYTES)
+                    entry["kind"] = parsers.detect_file_kind(name, stream.peek(ARCHIVE_SNIFF_BYTES))
+                    if entry["kind"] is None:
+                        entry["status"] = "skipped"
+                        stream.close()
+                        slots.release()
+                    elif not in_order:
+                        tasks.append(asyncio.create_task(convert_member(entry, stream)))
+                    elif size <= ARCHIVE_BUFFER_BYTES:
+                        buffered = io.BytesIO(stream.read())
+                        stream.close()
+                        tasks.append(asyncio.create_task(convert_member(entry, buffered)))
+                    else:
+                        await convert_member(entry, stream)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+            finally:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        rows_saved: dict[str, int] = {}
+        for entry in members:
+            if entry.get("status") == "ok":
+                rows = entry.get("curves_saved", entry.get("rows_saved", 0))
+                rows_saved[entry["kind"]] = rows_saved.get(entry["kind"], 0) + rows
+        statuses = [entry["status"] for entry in members]
         return {
-            "well_id": well_id,
-            "well_name": well_data["name"],
-            "curves_saved": len(curves),
+            "files": len(members),
+            "ok": statuses.count("ok"),
+            "errors": statuses.count("error"),
+            "skipped": statuses.count("skipped"),
+            "unchanged": sum(entry["status"] == "skipped" and entry["kind"] is not None for entry in members),
+            "rows_saved": rows_saved,
+            "members": members,
         }
 
-    async def convert_well_file_batch(self, db: AsyncSession, *, file_paths: list[str]) -> list[dict[str, Any]]:
+    def _member_converter(self, name: str) -> "Converter":
         """
-        Process multiple well files sequentially and return per-file summaries.
+        This converter, with before_commit getting the archive member's name under "member".
         """
-        results: list[dict[str, Any]] = []
-        for path in file_paths:
-            result = await self.convert_well_file(db, file_path=path)
-            results.append(result)
-        return results
+        if self.before_commit is None:
+            return self
+        before_commit = self.before_commit
 
-    async def convert_welltrack(self, db: AsyncSession, *, file_path: str) -> dict[str, Any]:
+        async def member_before_commit(db: AsyncSession, result: dict[str, Any]) -> None:
+            await before_commit(db, {"member": name, **result})
+
+        member = copy.copy(self)
+        member.before_commit = member_before_commit
+        return member
+
+    @staticmethod
+    def _iter_archive(fh: BinaryIO) -> Iterator[tuple[str, int, BinaryIO, bool]]:
+        """
+        (name, size, stream, in_order) per regular file of a zip or tar archive.
+        in_order: the stream is only readable until the next member is
+        requested (tar archives are read as one compressed stream).
+        """
+        start = fh.tell()
+        if zipfile.is_zipfile(fh):
+            fh.seek(start)
+            with zipfile.ZipFile(fh) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir():
+                        yield info.filename, info.file_size, archive.open(info), False
+            return
+
+        fh.seek(start)
+        try:
+            archive = tarfile.open(fileobj=fh, mode="r|*")
+        except tarfile.TarError as exc:
+            raise ValueError("Not a zip or tar archive") from exc
+        with archive:
+            for info in archive:
+                if info.isfile():
+                    yield info.name, info.size, archive.extractfile(info), True
+
+    async def convert_welltrack(
+        self, db: AsyncSession, *, file_path: str | None = None, file: BinaryIO | None = None
+    ) -> dict[str, Any]:
         """
         Parse welltrack blocks and persist WellTrack rows per well.
         Format example:
@@ -137,201 +349,317 @@ class Converter:
             ...
         - WELL_X -> well_id extracted from trailing digits of WELL_X
         - columns: lat, lon, absolute_depth, measured_depth
+        With the numpy parser a file on disk is memory-mapped, block headers are
+        found by a bytes-level scan and each block body becomes an (N, 4) array,
+        see parsers.parse_welltrack_numpy.
+        The rows of each well are hashed (sha256 of their float64 values) into the
+        well's welltrack_hash: a well whose first block in the file hashes to the
+        stored value keeps its rows, data_version and cached payloads; when no
+        well changed, the welltrack dataset version is not bumped either.
+        A block is held in memory until it is complete to be hashed, so memory
+        depends on the largest block, not the file.
         """
-        text = Path(file_path).read_text(encoding="utf-8")
-        lines = text.splitlines()
-
-        blocks: dict[int, list[dict[str, float]]] = {}
-        well_names: dict[int, str] = {}
-        current_well_id: int | None = None
-
-        header_pattern = re.compile(r"welltrack\s+'?([A-Za-z0-9_]+)'?", re.IGNORECASE)
-
-        for raw in lines:
-            line = raw.strip()
-            if not line:
-                continue
-
-            header_match = header_pattern.match(line)
-            if header_match:
-                well_name = header_match.group(1)
-                id_match = re.search(r"(\d+)$", well_name)
-                if not id_match:
-                    current_well_id = None
+        with self._open(file_path, file) as fh:
+            if self.stream:
+                segments = self._iter_welltrack_segments(fh)
+            else:
+                parsed = await executor.submit(parsers.parse_welltrack, fh.read(), backend=self.parser)
+                segments = self._iter_async(self._group_welltrack_segments(parsed))
+
+            # well_id -> (name, hash) of the stored rows
+            stored = {} if self.force else await crud.wells.get_content_hashes(db, kind="welltrack")
+            # well_id -> name already written (or kept) for this file
+            well_names: dict[int, str] = {}
+            # well_id -> hash of its rows so far in this file
+            hashes: dict[int, Any] = {}
+            # wells whose stored rows equal their first block and were kept
+            unchanged: set[int] = set()
+            total_rows = 0
+
+            async for well_id, well_name, parts in self._iter_welltrack_runs(segments):
+                first = well_id not in hashes
+                digest = hashes.setdefault(well_id, hashlib.sha256())
+                for part in parts:
+                    digest.update(np.asarray(part, dtype=np.float64).tobytes())
+                if first and stored.get(well_id) == (well_name, digest.hexdigest()):
+                    unchanged.add(well_id)
+                    well_names[well_id] = well_name
                     continue
-                current_well_id = int(id_match.group(1))
-                well_names[current_well_id] = well_name
-                blocks.setdefault(current_well_id, [])
-                continue
-
-            if current_well_id is None:
-                continue
-
-            # Remove trailing ';' if present
-            if line.endswith(";"):
-                line = line[:-1].strip()
 
-            parts = line.split()
-            if len(parts) < 4:
-                continue
-            try:
-                lat = float(parts[0])
-                lon = float(parts[1])
-                absolute_depth = float(parts[2])
-                measured_depth = float(parts[3])
-            except ValueError:
-                continue
+                if well_names.get(well_id) != well_name:
+                    await crud.wells.upsert_many(db, wells=[{"id": well_id, "name": well_name}])
+                if well_id in unchanged:
+                    # a later block of a kept well is appended to its rows
+                    unchanged.discard(well_id)
+                    await crud.wells.bump_data_version(db, well_id=well_id)
+
+                rows = [
+                    row for part in parts for row in (part.tolist() if isinstance(part, np.ndarray) else part)
+                ]
+                if not self.bulk:
+                    total_rows += await crud.welltracks.replace_for_well(
+                        db,
+                        well_id=well_id,
+                        tracks=(
+                            {
+                                "lat": lat,
+                                "lon": lon,
+                                "absolute_depth": absolute_depth,
+                                "measured_depth": measured_depth,
+                            }
+                            for lat, lon, absolute_depth, measured_depth in rows
+                        ),
+                    )
+                else:
+                    # blocks of one well may come in several runs, clear it only once
+                    if first:
+                        await crud.welltracks.delete_for_well(db, well_id=well_id)
+                    total_rows += await crud.welltracks.copy_rows(db, well_id=well_id, rows=rows)
 
-            blocks[current_well_id].append(
-                {
-                    "lat": lat,
-                    "lon": lon,
-                    "absolute_depth": absolute_depth,
-                    "measured_depth": measured_depth,
-                }
-            )
+                well_names[well_id] = well_name
 
-        total_rows = 0
-        wells_processed = 0
-
-        for well_id, records in blocks.items():
-            wells_processed += 1
-            well_name = well_names.get(well_id, f"WELL_{well_id}")
-
-            await crud.wells.upsert(
-                db,
-                well_id=well_id,
-                name=well_name,
-                start_measured_depth=None,
-                end_measured_depth=None,
+            changed = [well_id for well_id in well_names if well_id not in unchanged]
+            await crud.wells.set_content_hashes(
+                db, kind="welltrack", hashes={well_id: hashes[well_id].hexdigest() for well_id in changed}
             )
-            total_rows += await crud.welltracks.replace_for_well(db, well_id=well_id, tracks=records)
 
-        await db.commit()
-
-        return {
-            "wells_processed": wells_processed,
+        result = {
+            "wells_processed": len(well_names),
+            "wells_skipped": len(unchanged),
             "rows_saved": total_rows,
         }
-    
-    async def convert_formation_thickness(self, db: AsyncSession, *, file_path: str) -> dict[str, Any]:
+        await self._commit(db, result)
+        if changed:
+            payload_cache.invalidate_wells(changed)
+            await self._bump_dataset_version(db, "welltrack")
+        return result
+
+    @staticmethod
+    async def _iter_welltrack_runs(
+        segments: AsyncIterator[tuple[int, str, parsers.TrackRows]],
+    ) -> AsyncIterator[tuple[int, str, list[parsers.TrackRows]]]:
+        """
+        Join consecutive segments of the same well (a block cut by chunk
+        boundaries) into one run of row parts; the last name wins.
+        """
+        run: tuple[int, str, list[parsers.TrackRows]] | None = None
+        async for well_id, well_name, rows in segments:
+            if run is not None and run[0] == well_id:
+                run[2].append(rows)
+                run = (well_id, well_name, run[2])
+                continue
+            if run is not None:
+                yield run
+            run = (well_id, well_name, [rows])
+        if run is not None:
+            yield run
+
+    async def _iter_welltrack_segments(
+        self, fh: BinaryIO
+    ) -> AsyncIterator[tuple[int, str, parsers.TrackRows]]:
+        current: tuple[int, str] | None = None
+        chunks = parsers.iter_byte_chunks(fh, self.chunk_bytes)
+        async for parsed in self._parse_ahead(parsers.parse_welltrack, chunks, backend=self.parser):
+            segments, current = parsers.resolve_welltrack_chunk(parsed, current)
+            for segment in segments:
+                yield segment
+
+    @staticmethod
+    def _group_welltrack_segments(
+        parsed: tuple[parsers.TrackRows, list[tuple[int | None, str, parsers.TrackRows]]],
+    ) -> list[tuple[int, str, list[parsers.TrackRow]]]:
+        """
+        Merge repeated blocks of the same well into one segment (last name wins).
+        """
+        blocks: dict[int, tuple[str, list[parsers.TrackRow]]] = {}
+        segments, _ = parsers.resolve_welltrack_chunk(parsed, None)
+        for well_id, well_name, rows in segments:
+            _, merged = blocks.get(well_id, (well_name, []))
+            merged.extend(rows.tolist() if isinstance(rows, np.ndarray) else rows)
+            blocks[well_id] = (well_name, merged)
+        return [(well_id, name, rows) for well_id, (name, rows) in blocks.items()]
+
+    async def convert_formation_thickness(
+        self, db: AsyncSession, *, file_path: str | None = None, file: BinaryIO | None = None
+    ) -> dict[str, Any]:
         """
         Parse formation_thickness file:
         Columns: lat, lon, absolute_depth, WELL_N (id from N), thickness
         """
-        lines = Path(file_path).read_text(encoding="utf-8").splitlines()
-        total_rows = 0
-        wells_seen: set[int] = set()
-
-        for raw in lines:
-            line = raw.strip()
-            if not line or line.lower().startswith("string") or line.lower().startswith("float"):
-                continue
-            parts = line.split()
-            if len(parts) < 5:
-                continue
-            try:
-                lat = float(parts[0])
-                lon = float(parts[1])
-                absolute_depth = float(parts[2])
-            except ValueError:
-                continue
-
-            well_token = parts[3]
-            id_match = re.search(r"(\d+)$", well_token)
-            if not id_match:
-                continue
-            well_id = int(id_match.group(1))
-            wells_seen.add(well_id)
-
-            try:
-                thickness = float(parts[4])
-            except ValueError:
-                thickness = None
-
-            await crud.wells.upsert(
-                db,
-                well_id=well_id,
-                name=well_token,
-                start_measured_depth=None,
-                end_measured_depth=None,
-            )
-
-            total_rows += await crud.formation_thickness.add_many(
-                db,
-                records=[
-                    {
-                        "well_id": well_id,
-                        "lat": lat,
-                        "lon": lon,
-                        "absolute_depth": absolute_depth,
-                        "thickness": thickness,
-                    }
-                ],
-            )
-
-        await db.commit()
+        return await self._convert_thickness(
+            db, file_path=file_path, file=file, store=crud.formation_thickness, dataset="formation_thickness"
+        )
 
-        return {"rows_saved": total_rows, "wells_touched": len(wells_seen)}
-    
     async def convert_effective_formation_thickness(
-        self, db: AsyncSession, *, file_path: str
+        self, db: AsyncSession, *, file_path: str | None = None, file: BinaryIO | None = None
     ) -> dict[str, Any]:
         """
         Parse effective_formation_thickness file:
         Columns: lat, lon, absolute_depth, WELL_N (id from N), thickness
         """
-        lines = Path(file_path).read_text(encoding="utf-8").splitlines()
+        return await self._convert_thickness(
+            db,
+            file_path=file_path,
+            file=file,
+            store=crud.effective_formation_thickness,
+            dataset="effective_formation_thickness",
+        )
+
+    async def _convert_thickness(
+        self,
+        db: AsyncSession,
+        *,
+        file_path: str | None,
+        file: BinaryIO | None,
+        store: ModuleType,
+        dataset: str,
+    ) -> dict[str, Any]:
+        """
+        Shared ingest for both thickness files, `store` is the crud module to write into,
+        `dataset` the table name whose dataset version is bumped.
+        """
+        with self._open(file_path, file) as fh:
+            if self.stream:
+                return await self._write_thickness(
+                    db,
+                    store=store,
+                    dataset=dataset,
+                    batches=self._parse_ahead(
+                        parsers.parse_thickness_chunk,
+                        parsers.iter_text_chunks(fh, self.chunk_bytes),
+                    ),
+                )
+            text = fh.read().decode("utf-8")
+
+        rows = await executor.submit(parsers.parse_thickness_chunk, text)
+        return await self._write_thickness(
+            db, store=store, dataset=dataset, batches=self._iter_async([rows])
+        )
+
+    async def _write_thickness(
+        self,
+        db: AsyncSession,
+        *,
+        store: ModuleType,
+        dataset: str,
+        batches: AsyncIterator[list[parsers.ThicknessRow]],
+    ) -> dict[str, Any]:
         total_rows = 0
         wells_seen: set[int] = set()
 
-        for raw in lines:
-            line = raw.strip()
-            if not line or line.lower().startswith("string") or line.lower().startswith("float"):
-                continue
-            parts = line.split()
-            if len(parts) < 5:
-                continue
-            try:
-                lat = float(parts[0])
-                lon = float(parts[1])
-                absolute_depth = float(parts[2])
-            except ValueError:
-                continue
-
-            well_token = parts[3]
-            id_match = re.search(r"(\d+)$", well_token)
-            if not id_match:
-                continue
-            well_id = int(id_match.group(1))
-            wells_seen.add(well_id)
+        async for rows in batches:
+            # wells first appearing in this batch, upserted in one statement
+            # before their rows are written (FK on well_id)
+            new_wells: dict[int, str] = {}
+            for well_id, well_token, *_ in rows:
+                if well_id not in wells_seen:
+                    new_wells[well_id] = well_token
+            if new_wells:
+                await crud.wells.upsert_many(
+                    db,
+                    wells=({"id": well_id, "name": name} for well_id, name in new_wells.items()),
+                )
+                wells_seen.update(new_wells)
+
+            # one write per parsed batch: COPY in bulk mode, one flush otherwise
+            if self.bulk:
+                total_rows += await store.copy_rows(
+                    db,
+                    rows=(
+                        (well_id, lat, lon, absolute_depth, thickness)
+                        for well_id, _, lat, lon, absolute_depth, thickness in rows
+                    ),
+                )
+            else:
+                total_rows += await store.add_many(
+                    db,
+                    records=[
+                        {
+                            "well_id": well_id,
+                            "lat": lat,
+                            "lon": lon,
+                            "absolute_depth": absolute_depth,
+                            "thickness": thickness,
+                        }
+                        for well_id, _, lat, lon, absolute_depth, thickness in rows
+                    ],
+                )
 
-            try:
-                thickness = float(parts[4])
-            except ValueError:
-                thickness = None
-
-            await crud.wells.upsert(
-                db,
-                well_id=well_id,
-                name=well_token,
-                start_measured_depth=None,
-                end_measured_depth=None,
-            )
+        result = {"rows_saved": total_rows, "wells_touched": len(wells_seen)}
+        await self._commit(db, result)
+        await self._bump_dataset_version(db, dataset)
+        return result
 
-            total_rows += await crud.effective_formation_thickness.add_many(
-                db,
-                records=[
-                    {
-                        "well_id": well_id,
-                        "lat": lat,
-                        "lon": lon,
-                        "absolute_depth": absolute_depth,
-                        "thickness": thickness,
-                    }
-                ],
-            )
+    @staticmethod
+    @contextmanager
+    def _open(file_path: str | None, file: BinaryIO | None) -> Iterator[BinaryIO]:
+        """
+        The input as a binary file: `file` as given (read from its current
+        position and left open, the caller owns it) or `file_path` opened here.
+        """
+        if (file_path is None) == (file is None):
+            raise ValueError("Pass exactly one of file_path and file")
+        if file is not None:
+            yield file
+            return
+        with open(file_path, "rb") as fh:
+            yield fh
+
+    @staticmethod
+    def _content_hash(fh: BinaryIO) -> str | None:
+        """
+        sha256 hex digest of `fh` from its current position, which it is then
+        rewound to; None, with nothing read, if `fh` cannot seek.
+        """
+        try:
+            if not fh.seekable():
+                return None
+        except AttributeError:
+            # tar members of a stream opened with "r|*"
+            return None
+        start = fh.tell()
+        digest = hashlib.sha256()
+        while block := fh.read(HASH_BLOCK_BYTES):
+            digest.update(block)
+        fh.seek(start)
+        return digest.hexdigest()
+
+    async def _commit(self, db: AsyncSession, result: dict[str, Any]) -> None:
+        """
+        Commit an ingest, after handing its result to before_commit in the same transaction.
+        """
+        if self.before_commit is not None:
+            await self.before_commit(db, result)
+        await db.commit()
 
+    @staticmethod
+    async def _bump_dataset_version(db: AsyncSession, name: str) -> None:
+        """
+        Bump the dataset version of table `name` in its own short transaction,
+        after the ingest commit: caches keyed by the old version are rebuilt,
+        and concurrent ingests never hold the version row while writing.
+        """
+        await crud.dataset_versions.bump(db, name=name)
         await db.commit()
 
-        return {"rows_saved": total_rows, "wells_touched": len(wells_seen)}
\ No newline at end of file
+    @staticmethod
+    async def _parse_ahead(
+        func: Callable[..., T], chunks: Iterable[str | bytes], **kwargs: Any
+    ) -> AsyncIterator[T]:
+        """
+        Parse chunks on the parser pool, keeping one chunk in flight ahead of the
+        consumer so workers parse the next batch while the loop writes the current one.
+        """
+        pending: "asyncio.Future[T] | None" = None
+        for chunk in chunks:
+            future = executor.submit(func, chunk, **kwargs)
+            if pending is not None:
+                yield await pending
+            pending = future
+        if pending is not None:
+            yield await pending
+
+    @staticmethod
+    async def _iter_async(items: Iterable[T]) -> AsyncIterator[T]:
+        for item in items:
+            yield item
@@ -0,0 +1,54 @@
+import asyncio
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+_parser_pool: ProcessPoolExecutor | None = None
+
+
+def get_parser_pool() -> ProcessPoolExecutor | None:
+    """
+    Shared process pool for CPU-bound file parsing, started on first use.
+    Returns None when PARSER_WORKERS is 0, parsing then runs inline on the loop.
+    """
+    global _parser_pool
+    if settings.PARSER_WORKERS <= 0:
+        return None
+    if _parser_pool is None:
+        # spawn: workers must not inherit the loop, DB connections or pool threads
+        _parser_pool = ProcessPoolExecutor(
+            max_workers=settings.PARSER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _parser_pool
+
+
+def submit(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> "asyncio.Future[T]":
+    """
+    Schedule func(*args, **kwargs) on the parser pool and return an awaitable future.
+    func and its arguments must be picklable (module-level functions, plain data).
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_parser_pool()
+    if pool is not None:
+        return loop.run_in_executor(pool, partial(func, *args, **kwargs))
+
+    future: asyncio.Future[T] = loop.create_future()
+    try:
+        future.set_result(func(*args, **kwargs))
+    except Exception as exc:
+        future.set_exception(exc)
+    return future
+
+
+def shutdown_parser_pool() -> None:
+    global _parser_pool
+    if _parser_pool is not None:
+        _parser_pool.shutdown(wait=True, cancel_futures=True)
+        _parser_pool = None
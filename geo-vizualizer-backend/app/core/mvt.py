@@ -0,0 +1,253 @@
+"""
+Mapbox Vector Tile 2.1 encoding (application/vnd.mapbox-vector-tile),
+written by hand, no protobuf dependency.
+
+A tile is a protobuf Tile message, which only holds `repeated Layer layers = 3`.
+layer() returns one complete `layers` field, so a tile is the concatenation
+of its layers and layers can be cached and combined independently.
+
+Geometry is in tile units: 0..EXTENT across the tile, y pointing down.
+Coordinates in the buffer around the tile are allowed, renderers clip them.
+
+Features are laid out as one flat array of varints (field keys, lengths, id,
+tags, geometry commands and parameters) and encoded together with NumPy,
+only string values are handled one by one.
+"""
+from collections.abc import Mapping
+
+import numpy as np
+
+MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+
+MVT_VERSION = 2
+EXTENT = 4096
+
+# Feature.type
+POINT = 1
+LINESTRING = 2
+
+# geometry commands
+MOVE_TO = 1
+LINE_TO = 2
+
+# field keys, (field number << 3) | wire type
+TILE_LAYER = 0x1A
+LAYER_NAME = 0x0A
+LAYER_FEATURE = 0x12
+LAYER_KEY = 0x1A
+LAYER_VALUE = 0x22
+LAYER_EXTENT = 0x28
+LAYER_VERSION = 0x78
+FEATURE_ID = 0x08
+FEATURE_TAGS = 0x12
+FEATURE_TYPE = 0x18
+FEATURE_GEOMETRY = 0x22
+VALUE_STRING = 0x0A
+VALUE_DOUBLE = 0x19
+VALUE_SINT = 0x30
+
+_DOUBLE_VALUE = np.dtype([("key", "u1"), ("length", "u1"), ("type", "u1"), ("value", "<f8")])
+
+# geometry of a layer: flat uint64 tokens, feature i is tokens[starts[i]:starts[i + 1]]
+Geometry = tuple[np.ndarray, np.ndarray]
+
+
+def varint_sizes(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=np.uint64)
+    sizes = np.ones(values.shape, dtype=np.int64)
+    for shift in range(7, 64, 7):
+        sizes += values >= np.uint64(1 << shift)
+    return sizes
+
+
+def encode_varints(values: np.ndarray) -> bytes:
+    """
+    Base 128 varints of all `values` (non-negative), in row-major order.
+    """
+    values = np.ascontiguousarray(values, dtype=np.uint64).ravel()
+    if not len(values):
+        return b""
+    sizes = varint_sizes(values)
+    starts = np.cumsum(sizes) - sizes
+    out = np.empty(int(sizes.sum()), dtype=np.uint8)
+    for i in range(int(sizes.max())):
+        has = sizes > i
+        group = (values[has] >> np.uint64(7 * i)) & np.uint64(0x7F)
+        more = (sizes[has] > i + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[has] + i] = group | more
+    return out.tobytes()
+
+
+def zigzag(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values, dtype=np.int64)
+    return ((values << 1) ^ (values >> 63)).view(np.uint64)
+
+
+def command(command_id: int, count: np.ndarray | int) -> np.ndarray:
+    return np.uint64(command_id) | (np.asarray(count, dtype=np.uint64) << np.uint64(3))
+
+
+def point_geometry(x: np.ndarray, y: np.ndarray) -> Geometry:
+    """
+    One point feature per x, y: MoveTo(1) x y.
+    """
+    tokens = np.empty((len(x), 3), dtype=np.uint64)
+    tokens[:, 0] = command(MOVE_TO, 1)
+    tokens[:, 1] = zigzag(x)
+    tokens[:, 2] = zigzag(y)
+    return tokens.ravel(), np.arange(0, 3 * len(x) + 1, 3)
+
+
+def line_geometry(vertices: np.ndarray, part_starts: np.ndarray, feature_parts: np.ndarray) -> Geometry:
+    """
+    (Multi)line features. `vertices` is (V, 2) integer; part i is
+    vertices[part_starts[i]:part_starts[i + 1]], at least 2 vertices;
+    feature j has parts feature_parts[j] to feature_parts[j + 1].
+    Per part: MoveTo(1) dx dy, LineTo(m - 1) dx dy ...
+    """
+    # parameters are deltas from the cursor, which starts at 0, 0 in every feature
+    deltas = np.diff(vertices, axis=0, prepend=np.zeros((1, 2), dtype=vertices.dtype))
+    feature_starts = part_starts[feature_parts[:-1]]
+    deltas[feature_starts] = vertices[feature_starts]
+
+    counts = np.diff(part_starts)
+    part_tokens = 2 * counts + 2
+    token_starts = np.concatenate([[0], np.cumsum(part_tokens)])
+    tokens = np.empty(int(token_starts[-1]), dtype=np.uint64)
+    tokens[token_starts[:-1]] = command(MOVE_TO, 1)
+    tokens[token_starts[:-1] + 3] = command(LINE_TO, counts - 1)
+
+    # vertex j of a part goes to 1 + 2j, shifted past the LineTo for j >= 1
+    local = np.arange(len(vertices)) - np.repeat(part_starts[:-1], counts)
+    x_at = np.repeat(token_starts[:-1], counts) + 1 + 2 * local + (local > 0)
+    tokens[x_at] = zigzag(deltas[:, 0])
+    tokens[x_at + 1] = zigzag(deltas[:, 1])
+    return tokens, token_starts[feature_parts]
+
+
+def layer(
+    name: str,
+    ids: np.ndarray,
+    geometry_type: int,
+    geometry: Geometry,
+    properties: Mapping[str, np.ndarray],
+) -> bytes:
+    """
+    One `layers` field: features with `ids`, their geometry (point_geometry
+    or line_geometry) and `properties`, arrays aligned with the features.
+    Float properties become double values, integer ones sint values, anything
+    else strings; NaN / None leaves the property out of that feature.
+    b"" for no features.
+    """
+    if not len(ids):
+        return b""
+    keys = list(properties)
+    values: list[bytes] = []
+    value_count = 0
+    # per key: value index of every feature, -1 where missing
+    tags = np.empty((len(ids), len(keys)), dtype=np.int64)
+    for i, values_of_key in enumerate(properties.values()):
+        encoded, count, index = _values(np.asarray(values_of_key))
+        tags[:, i] = np.where(index >= 0, index + value_count, -1)
+        values.append(encoded)
+        value_count += count
+
+    body = b"".join(
+        [
+            encode_varints([LAYER_VERSION, MVT_VERSION]),
+            _bytes_field(LAYER_NAME, name.encode()),
+            _features(ids, geometry_type, tags, geometry),
+            *(_bytes_field(LAYER_KEY, key.encode()) for key in keys),
+            *values,
+            encode_varints([LAYER_EXTENT, EXTENT]),
+        ]
+    )
+    return _bytes_field(TILE_LAYER, body)
+
+
+def _features(ids: np.ndarray, geometry_type: int, tags: np.ndarray, geometry: Geometry) -> bytes:
+    """
+    Every feature as
+    LAYER_FEATURE len FEATURE_ID id FEATURE_TAGS len <key value ...>
+    FEATURE_TYPE type FEATURE_GEOMETRY len <geometry>, all varints.
+    """
+    geometry_tokens, geometry_starts = geometry
+    present_rows, present_keys = np.nonzero(tags >= 0)
+    tag_tokens = np.column_stack([present_keys, tags[present_rows, present_keys]]).ravel()
+    tag_counts = 2 * np.bincount(present_rows, minlength=len(ids))
+    tag_starts = np.concatenate([[0], np.cumsum(tag_counts)])
+    geometry_counts = np.diff(geometry_starts)
+
+    counts = 6 + tag_counts + 4 + geometry_counts
+    starts = np.concatenate([[0], np.cumsum(counts)])
+    first = starts[:-1]
+    tokens = np.empty(int(starts[-1]), dtype=np.uint64)
+    tokens[first] = LAYER_FEATURE
+    tokens[first + 1] = 0  # feature length, set below
+    tokens[first + 2] = FEATURE_ID
+    tokens[first + 3] = ids
+    tokens[first + 4] = FEATURE_TAGS
+    tokens[first + 5] = _segment_sums(varint_sizes(tag_tokens), tag_starts)
+    tokens[np.repeat(first + 6 - tag_starts[:-1], tag_counts) + np.arange(len(tag_tokens))] = tag_tokens
+    after_tags = first + 6 + tag_counts
+    tokens[after_tags] = FEATURE_TYPE
+    tokens[after_tags + 1] = geometry_type
+    tokens[after_tags + 2] = FEATURE_GEOMETRY
+    tokens[after_tags + 3] = _segment_sums(varint_sizes(geometry_tokens), geometry_starts)
+    geometry_at = np.repeat(after_tags + 4 - geometry_starts[:-1], geometry_counts)
+    tokens[geometry_at + np.arange(len(geometry_tokens))] = geometry_tokens
+
+    # the length counts everything after the key and the (1 byte placeholder) length
+    tokens[first + 1] = _segment_sums(varint_sizes(tokens), starts) - 2
+    return encode_varints(tokens)
+
+
+def _segment_sums(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    Sums of values[starts[i]:starts[i + 1]], 0 for empty segments.
+    """
+    cumulative = np.concatenate([[0], np.cumsum(values)])
+    return cumulative[starts[1:]] - cumulative[starts[:-1]]
+
+
+def _values(values: np.ndarray) -> tuple[bytes, int, np.ndarray]:
+    """
+    Encoded `values` fields of the distinct values, their count, and the index
+    of every feature's value among them (-1 for NaN / None).
+    """
+    if values.dtype.kind == "f":
+        present = ~np.isnan(values)
+    elif values.dtype.kind in "iu":
+        present = np.ones(len(values), dtype=bool)
+    else:
+        present = np.array([value is not None for value in values], dtype=bool)
+    index = np.full(len(values), -1, dtype=np.int64)
+    if not present.any():
+        return b"", 0, index
+    distinct, inverse = np.unique(values[present], return_inverse=True)
+    index[present] = inverse.ravel()
+
+    if values.dtype.kind == "f":
+        records = np.empty(len(distinct), dtype=_DOUBLE_VALUE)
+        records["key"], records["length"], records["type"] = LAYER_VALUE, 9, VALUE_DOUBLE
+        records["value"] = distinct
+        return records.tobytes(), len(distinct), index
+    if values.dtype.kind in "iu":
+        encoded = zigzag(distinct)
+        rows = np.column_stack(
+            [
+                np.full(len(distinct), LAYER_VALUE, dtype=np.uint64),
+                (varint_sizes(encoded) + 1).astype(np.uint64),
+                np.full(len(distinct), VALUE_SINT, dtype=np.uint64),
+                encoded,
+            ]
+        )
+        return encode_varints(rows), len(distinct), index
+    encoded = b"".join(
+        _bytes_field(LAYER_VALUE, _bytes_field(VALUE_STRING, str(value).encode())) for value in distinct
+    )
+    return encoded, len(distinct), index
+
+
+def _bytes_field(key: int, data: bytes) -> bytes:
+    return encode_varints([key, len(data)]) + data
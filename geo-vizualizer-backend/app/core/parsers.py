@@ -0,0 +1,528 @@
+import io
+import mmap
+import os
+import re
+import stat
+import warnings
+from collections.abc import Iterable, Iterator
+from typing import Any, BinaryIO
+
+import numpy as np
+
+PARSER_BACKENDS = ("python", "numpy")
+
+# "~Well", "~Ascii", ... at the start of a line (leading whitespace allowed)
+SECTION_PATTERN = re.compile(r"^[ \t]*(~[^\n]*)$", re.MULTILINE)
+
+WELLTRACK_HEADER_PATTERN = re.compile(r"welltrack\s+'?([A-Za-z0-9_]+)'?", re.IGNORECASE)
+# the same header as a whole line of bytes, matched from the line start
+WELLTRACK_HEADER_LINE_PATTERN = re.compile(
+    rb"[^\S\n]*welltrack[^\S\n]+'?([A-Za-z0-9_]+)'?[^\n]*\n?", re.IGNORECASE
+)
+WELL_ID_PATTERN = re.compile(r"(\d+)$")
+# a whole-line "#" comment, the only kind parse_ascii_python skips
+ASCII_COMMENT_PATTERN = re.compile(r"^[ \t]*#.*$", re.MULTILINE)
+# ASCII characters str.splitlines() / str.split() treat as line breaks or blanks
+# and np.loadtxt does not; text with any of them (or any non-ASCII character)
+# goes through the python backend
+LOADTXT_UNSAFE_CHARS = "\x0b\x0c\x1c\x1d\x1e\x1f"
+# the ";" closing a welltrack block: one, at the end of a line
+WELLTRACK_TERMINATOR_PATTERN = re.compile(r";[ \t]*$", re.MULTILINE)
+
+TrackRow = tuple[float, float, float, float]
+# rows of one welltrack block: tuples (python backend) or an (N, 4) float array (numpy backend)
+TrackRows = list[TrackRow] | np.ndarray
+ThicknessRow = tuple[int, str, float, float, float, float | None]
+
+
+def empty_well_data() -> dict[str, Any]:
+    return {
+        "id": None,
+        "name": None,
+        "start_measured_depth": None,
+        "end_measured_depth": None,
+    }
+
+
+def parse_well_line(line: str, well_data: dict[str, Any]) -> None:
+    """
+    Apply one stripped ~Well line (STRT / STOP / WELL) to well_data in place.
+    """
+    if line.upper().startswith("STRT"):
+        match = re.search(r"STRT\s*\.\S*\s*([-\d\.]+)", line, re.IGNORECASE)
+        if match:
+            well_data["start_measured_depth"] = float(match.group(1))
+    elif line.upper().startswith("STOP"):
+        match = re.search(r"STOP\s*\.\S*\s*([-\d\.]+)", line, re.IGNORECASE)
+        if match:
+            well_data["end_measured_depth"] = float(match.group(1))
+    elif line.upper().startswith("WELL"):
+        match = re.search(r"WELL\.\s*([A-Za-z0-9_]+)", line, re.IGNORECASE)
+        if match:
+            well_name = match.group(1)
+            well_data["name"] = well_name
+            id_match = re.search(r"(\d+)$", well_name)
+            if id_match:
+                well_data["id"] = int(id_match.group(1))
+
+
+def parse_ascii_python(lines: Iterable[str]) -> tuple[list[float], list[str | None]]:
+    """
+    Reference ~Ascii parser, one line at a time.
+    - first column -> measured_depth (line skipped if not a number)
+    - second column -> type: "0"/"1" for 0/1, "" for other numbers, None for non-numbers
+    """
+    depths: list[float] = []
+    types: list[str | None] = []
+
+    for raw in lines:
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        parts = line.split()
+        if len(parts) < 2:
+            continue
+        try:
+            measured_depth = float(parts[0])
+        except ValueError:
+            continue
+
+        type_raw = parts[1]
+        type_value = ""
+        try:
+            numeric_type = float(type_raw)
+            if numeric_type in (0.0, 1.0):
+                type_value = str(int(numeric_type))
+        except ValueError:
+            type_value = None
+
+        depths.append(measured_depth)
+        types.append(type_value)
+
+    return depths, types
+
+
+def parse_ascii_numpy(text: str) -> tuple[list[float], list[str | None]]:
+    """
+    Vectorized ~Ascii parser: one np.loadtxt call over the whole block,
+    the 0/1 type rule is applied as an array mask.
+    Blocks that loadtxt rejects (non-numeric cells, short rows) go through
+    parse_ascii_python so both backends always agree; "#" only starts a
+    comment at the beginning of a line, as there.
+    """
+    if not text.strip():
+        return [], []
+    if not loadtxt_safe(text):
+        return parse_ascii_python(text.splitlines())
+    if "\r" in text:
+        # lone "\r" ends a line for str.splitlines() too
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    if "#" in text:
+        text = ASCII_COMMENT_PATTERN.sub("", text)
+
+    try:
+        with warnings.catch_warnings():
+            # a block of only comments is valid here, not worth a warning
+            warnings.simplefilter("ignore", UserWarning)
+            data = np.loadtxt(
+                io.StringIO(text),
+                usecols=(0, 1),
+                ndmin=2,
+                comments=None,
+                dtype=np.float64,
+            )
+    except ValueError:
+        return parse_ascii_python(text.splitlines())
+
+    type_column = data[:, 1]
+    types = np.full(len(data), "", dtype=object)
+    types[type_column == 0.0] = "0"
+    types[type_column == 1.0] = "1"
+
+    return data[:, 0].tolist(), types.tolist()
+
+
+def loadtxt_safe(text: str | bytes) -> bool:
+    """
+    Whether np.loadtxt splits `text` into the same lines and cells as
+    str.splitlines() / str.split(), line ends aside (see LOADTXT_UNSAFE_CHARS).
+    """
+    chars = LOADTXT_UNSAFE_CHARS if isinstance(text, str) else LOADTXT_UNSAFE_CHARS.encode("ascii")
+    return text.isascii() and not any(chars[i : i + 1] in text for i in range(len(chars)))
+
+
+def parse_ascii(text: str, *, backend: str = "numpy") -> tuple[list[float], list[str | None]]:
+    if backend == "numpy":
+        return parse_ascii_numpy(text)
+    if backend == "python":
+        return parse_ascii_python(text.splitlines())
+    raise ValueError(f"Unknown parser backend: {backend}")
+
+
+def parse_well_text(
+    text: str, *, backend: str = "numpy"
+) -> tuple[dict[str, Any], list[float], list[str | None]]:
+    """
+    Parse a whole LAS-like file.
+    Sections are located once with SECTION_PATTERN; ~Well lines go through
+    parse_well_line, ~Ascii bodies through the selected parse_ascii backend.
+    Returns (well_data, measured_depths, types).
+    """
+    well_data = empty_well_data()
+    depths: list[float] = []
+    types: list[str | None] = []
+
+    # [preamble, header_1, body_1, header_2, body_2, ...]
+    chunks = SECTION_PATTERN.split(text)
+    for header, body in zip(chunks[1::2], chunks[2::2]):
+        header = header.strip().lower()
+        if header.startswith("~well"):
+            for raw in body.splitlines():
+                line = raw.strip()
+                if line and not line.startswith("#"):
+                    parse_well_line(line, well_data)
+        elif header.startswith("~ascii"):
+            block_depths, block_types = parse_ascii(body, backend=backend)
+            depths.extend(block_depths)
+            types.extend(block_types)
+
+    return well_data, depths, types
+
+
+def iter_byte_chunks(fh: BinaryIO, size: int) -> Iterator[bytes]:
+    """
+    Yield the rest of an open binary file in chunks of about `size` bytes,
+    each cut after its last line break, so only about one chunk is held in
+    memory at a time and no line is split between chunks. A line longer than
+    `size` is yielded whole.
+    A regular file is memory-mapped and sliced at line breaks found in the
+    mapping, other files (e.g. upload spools) are read block by block.
+    """
+    if _is_regular_file(fh):
+        yield from _iter_mapped_chunks(fh, size)
+        return
+
+    rest = b""
+    while block := fh.read(size):
+        if rest:
+            block = rest + block
+        end = block.rfind(b"\n") + 1
+        if not end:
+            rest = block
+            continue
+        rest = block[end:]
+        yield block[:end]
+    if rest:
+        yield rest
+
+
+def _is_regular_file(fh: BinaryIO) -> bool:
+    if not isinstance(fh, (io.BufferedReader, io.BufferedRandom, io.FileIO)):
+        return False
+    try:
+        return stat.S_ISREG(os.fstat(fh.fileno()).st_mode)
+    except (AttributeError, OSError):
+        # e.g. a tar member: a BufferedReader over an in-archive stream
+        return False
+
+
+def _iter_mapped_chunks(fh: BinaryIO, size: int) -> Iterator[bytes]:
+    start = fh.tell()
+    length = os.fstat(fh.fileno()).st_size
+    if start >= length:
+        return
+    with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        while start < length:
+            end = start + size
+            if end >= length:
+                end = length
+            else:
+                end = mapped.rfind(b"\n", start, end) + 1 or mapped.find(b"\n", end) + 1 or length
+            yield mapped[start:end]
+            start = end
+    fh.seek(length)
+
+
+def iter_text_chunks(fh: BinaryIO, size: int) -> Iterator[str]:
+    """
+    iter_byte_chunks decoded as UTF-8 (chunks end at line breaks, so never
+    inside a character).
+    """
+    for chunk in iter_byte_chunks(fh, size):
+        yield chunk.decode("utf-8")
+
+
+def iter_ascii_chunks(fh: BinaryIO, chunk_bytes: int) -> Iterator[str]:
+    """
+    Yield ~Ascii bodies from a file positioned right after the ~Ascii header.
+    Lines of any other section that follows are dropped, a later ~Ascii resumes output.
+    """
+    in_ascii = True
+    for chunk in iter_text_chunks(fh, chunk_bytes):
+        if "~" not in chunk:
+            if in_ascii:
+                yield chunk
+            continue
+
+        parts = SECTION_PATTERN.split(chunk)
+        body = parts[0] if in_ascii else ""
+        for header, section in zip(parts[1::2], parts[2::2]):
+            in_ascii = header.strip().lower().startswith("~ascii")
+            if in_ascii:
+                body += section
+        if body:
+            yield body
+
+
+def stream_well_file(fh: BinaryIO, *, chunk_bytes: int) -> tuple[dict[str, Any], Iterator[str]]:
+    """
+    Read a LAS-like file (opened in binary mode) up to its ~Ascii header and
+    return (well_data, ascii_chunks). ascii_chunks lazily yields the data
+    section in chunks of about chunk_bytes for parse_ascii. Sections after
+    ~Ascii (other than ~Ascii) are ignored, so ~Well must precede ~Ascii as LAS requires.
+    """
+    well_data = empty_well_data()
+    current_block = None
+
+    while raw := fh.readline():
+        line = raw.decode("utf-8").strip()
+        if not line:
+            continue
+
+        if line.startswith("~"):
+            header = line.lower()
+            if header.startswith("~ascii"):
+                return well_data, iter_ascii_chunks(fh, chunk_bytes)
+            current_block = "well" if header.startswith("~well") else None
+            continue
+
+        if line.startswith("#"):
+            continue
+
+        if current_block == "well":
+            parse_well_line(line, well_data)
+
+    return well_data, iter(())
+
+
+def parse_welltrack_chunk(
+    text: str,
+) -> tuple[list[TrackRow], list[tuple[int | None, str, list[TrackRow]]]]:
+    """
+    Parse a piece of a welltrack file without knowing which block it starts in,
+    so pieces can be parsed independently (e.g. in worker processes).
+    Returns (leading_rows, segments):
+    - leading_rows: rows before the first header, they belong to the block
+      the previous piece ended in
+    - segments: (well_id, well_name, rows) per header; well_id is None for
+      names without trailing digits, their rows are dropped
+    Use resolve_welltrack_chunk to attach leading_rows to the right well.
+    """
+    leading_rows: list[TrackRow] = []
+    segments: list[tuple[int | None, str, list[TrackRow]]] = []
+    rows: list[TrackRow] | None = leading_rows
+
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+
+        header_match = WELLTRACK_HEADER_PATTERN.match(line)
+        if header_match:
+            well_name = header_match.group(1)
+            id_match = WELL_ID_PATTERN.search(well_name)
+            if not id_match:
+                segments.append((None, well_name, []))
+                rows = None
+                continue
+            rows = []
+            segments.append((int(id_match.group(1)), well_name, rows))
+            continue
+
+        if rows is None:
+            continue
+
+        # Remove trailing ';' if present
+        if line.endswith(";"):
+            line = line[:-1].strip()
+
+        parts = line.split()
+        if len(parts) < 4:
+            continue
+        try:
+            rows.append((float(parts[0]), float(parts[1]), float(parts[2]), float(parts[3])))
+        except ValueError:
+            continue
+
+    return leading_rows, segments
+
+
+def parse_welltrack_numpy(
+    data: bytes,
+) -> tuple[np.ndarray, list[tuple[int | None, str, np.ndarray]]]:
+    """
+    Vectorized parse_welltrack_chunk over raw bytes, rows come back as
+    (N, 4) float arrays. Header lines are located with a bytes-level scan
+    (find_welltrack_headers), never line by line; every block body goes
+    through one np.loadtxt call. Bodies that loadtxt rejects (non-numeric
+    cells, short rows) go through parse_welltrack_chunk so both backends
+    always agree, and so do whole pieces with line breaks other than "\n"
+    and "\r\n" (see loadtxt_safe), which the header scan would not see.
+    """
+    lone_cr = b"\r" in data and data.count(b"\r") != data.count(b"\r\n")
+    if lone_cr or not loadtxt_safe(data):
+        return parse_welltrack_chunk(data.decode("utf-8"))
+    headers = find_welltrack_headers(data)
+    leading_rows = _parse_welltrack_body(data[: headers[0][0]] if headers else data)
+    segments: list[tuple[int | None, str, np.ndarray]] = []
+    for i, (_, body_start, well_name) in enumerate(headers):
+        id_match = WELL_ID_PATTERN.search(well_name)
+        if not id_match:
+            segments.append((None, well_name, _empty_track()))
+            continue
+        body_end = headers[i + 1][0] if i + 1 < len(headers) else len(data)
+        segments.append((int(id_match.group(1)), well_name, _parse_welltrack_body(data[body_start:body_end])))
+    return leading_rows, segments
+
+
+def find_welltrack_headers(data: bytes) -> list[tuple[int, int, str]]:
+    """
+    (line_start, body_start, well_name) of every welltrack header line.
+    Only the positions of "welltrack" (any case) are tested against
+    WELLTRACK_HEADER_LINE_PATTERN, the bytes in between are not looked at in Python.
+    """
+    headers: list[tuple[int, int, str]] = []
+    lowered = data.lower()
+    at = lowered.find(b"welltrack")
+    while at != -1:
+        line_start = lowered.rfind(b"\n", 0, at) + 1
+        match = WELLTRACK_HEADER_LINE_PATTERN.match(data, line_start)
+        if match:
+            headers.append((line_start, match.end(), match.group(1).decode("ascii")))
+            at = match.end()
+        else:
+            at += len(b"welltrack")
+        at = lowered.find(b"welltrack", at)
+    return headers
+
+
+def _parse_welltrack_body(body: bytes) -> np.ndarray:
+    if not body.strip():
+        return _empty_track()
+    text = body.decode("utf-8")
+    # the one ";" parse_welltrack_chunk strips off a line, any other makes a cell invalid
+    cells = text.replace("\r\n", "\n") if "\r" in text else text
+    if ";" in cells:
+        cells = WELLTRACK_TERMINATOR_PATTERN.sub("", cells)
+    try:
+        with warnings.catch_warnings():
+            # a body of only ";" terminators is valid here, not worth a warning
+            warnings.simplefilter("ignore", UserWarning)
+            return np.loadtxt(io.StringIO(cells), usecols=(0, 1, 2, 3), ndmin=2, comments=None, dtype=np.float64)
+    except ValueError:
+        rows, _ = parse_welltrack_chunk(text)
+        return np.array(rows, dtype=np.float64).reshape(-1, 4)
+
+
+def _empty_track() -> np.ndarray:
+    return np.empty((0, 4), dtype=np.float64)
+
+
+def parse_welltrack(
+    data: bytes, *, backend: str = "numpy"
+) -> tuple[TrackRows, list[tuple[int | None, str, TrackRows]]]:
+    """
+    Parse a piece of a welltrack file (UTF-8 bytes), see parse_welltrack_chunk.
+    """
+    if backend == "numpy":
+        return parse_welltrack_numpy(data)
+    if backend == "python":
+        return parse_welltrack_chunk(data.decode("utf-8"))
+    raise ValueError(f"Unknown parser backend: {backend}")
+
+
+def resolve_welltrack_chunk(
+    parsed: tuple[TrackRows, list[tuple[int | None, str, TrackRows]]],
+    current: tuple[int, str] | None,
+) -> tuple[list[tuple[int, str, TrackRows]], tuple[int, str] | None]:
+    """
+    Turn parse_welltrack output into (well_id, well_name, rows) segments.
+    `current` is the (well_id, well_name) block the piece starts in, i.e. the
+    second value returned for the previous piece (None at file start).
+    Every header yields a segment even when its block has no rows.
+    """
+    leading_rows, parsed_segments = parsed
+    segments: list[tuple[int, str, TrackRows]] = []
+    if current is not None and len(leading_rows):
+        segments.append((current[0], current[1], leading_rows))
+
+    for well_id, well_name, rows in parsed_segments:
+        if well_id is None:
+            current = None
+            continue
+        current = (well_id, well_name)
+        segments.append((well_id, well_name, rows))
+
+    return segments, current
+
+
+def detect_file_kind(name: str, head: bytes) -> str | None:
+    """
+    What an input file holds, from its name and first bytes: "curve" (LAS),
+    "welltrack", "formation_thickness" or "effective_formation_thickness";
+    None when it is none of them.
+    - LAS: .las extension, or the first non-blank line is a ~section
+    - welltrack: a welltrack header line
+    - thickness: rows parse_thickness_chunk accepts; both thickness files
+      look the same, "eff" starting a word of the file name marks the effective one
+    """
+    base_name = os.path.basename(name).lower()
+    if base_name.endswith(".las") or head.lstrip().startswith(b"~"):
+        return "curve"
+    if find_welltrack_headers(head):
+        return "welltrack"
+    # judge whole lines only, the head may end inside one
+    complete = head[: head.rfind(b"\n") + 1] or head
+    if parse_thickness_chunk(complete.decode("utf-8", errors="replace")):
+        if re.search(r"(^|[^a-z])eff", base_name):
+            return "effective_formation_thickness"
+        return "formation_thickness"
+    return None
+
+
+def parse_thickness_chunk(text: str) -> list[ThicknessRow]:
+    """
+    Parse a piece of a (effective) formation thickness file.
+    Columns: lat, lon, absolute_depth, WELL_N (id from N), thickness.
+    Returns (well_id, well_token, lat, lon, absolute_depth, thickness) rows.
+    """
+    rows: list[ThicknessRow] = []
+
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line or line.lower().startswith("string") or line.lower().startswith("float"):
+            continue
+        parts = line.split()
+        if len(parts) < 5:
+            continue
+        try:
+            lat = float(parts[0])
+            lon = float(parts[1])
+            absolute_depth = float(parts[2])
+        except ValueError:
+            continue
+
+        well_token = parts[3]
+        id_match = WELL_ID_PATTERN.search(well_token)
+        if not id_match:
+            continue
+
+        try:
+            thickness = float(parts[4])
+        except ValueError:
+            thickness = None
+
+        rows.append((int(id_match.group(1)), well_token, lat, lon, absolute_depth, thickness))
+
+    return rows
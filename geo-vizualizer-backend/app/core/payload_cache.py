@@ -0,0 +1,82 @@
+"""
+Serialized responses of the per-well and interpolated-points endpoints.
+
+Payloads are kept in a ByteLRUCache of RESPONSE_CACHE_BYTES, each with a
+content ETag. Entries are tagged:
+- well_tag(well_id): welltrack/curve payloads of one well
+- INTERPOLATED_TAG: every /interpolate/wells payload
+Payloads whose key holds a dataset version (thickness surfaces) need no tag,
+a new version simply misses and the old entries age out.
+The Converter invalidates the wells it replaced, the interpolator the
+interpolated payloads. Invalidation only reaches this process: with several
+workers, set RESPONSE_CACHE_TTL to bound how long the others serve old payloads.
+"""
+import hashlib
+from collections.abc import Hashable, Iterable
+from dataclasses import dataclass
+
+from app.core.cache import ByteLRUCache
+from app.core.config import settings
+
+INTERPOLATED_TAG = "interpolated"
+
+_cache = ByteLRUCache(settings.RESPONSE_CACHE_BYTES, ttl=settings.RESPONSE_CACHE_TTL or None)
+
+# bumped by every invalidation: a payload built while one happened may
+# already be stale and is not stored
+_generation = 0
+
+
+@dataclass(frozen=True)
+class Payload:
+    body: bytes
+    media_type: str
+    etag: str
+
+
+def well_tag(well_id: int) -> tuple[str, int]:
+    return ("well", well_id)
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def max_bytes() -> int:
+    return _cache.max_bytes
+
+
+def generation() -> int:
+    return _generation
+
+
+def get(key: Hashable) -> Payload | None:
+    return _cache.get(key)
+
+
+def put(key: Hashable, body: bytes, media_type: str, *, tags: Iterable[Hashable], since: int) -> Payload:
+    """
+    Store `body` unless an invalidation happened after generation() returned `since`.
+    """
+    payload = Payload(body=body, media_type=media_type, etag=make_etag(body))
+    if since == _generation:
+        _cache.put(key, payload, len(body), tags=tags)
+    return payload
+
+
+def invalidate_wells(well_ids: Iterable[int]) -> None:
+    """
+    Curves or tracks of these wells were replaced. Interpolated points of
+    replaced curves are gone too (ON DELETE CASCADE), so those payloads go as well.
+    """
+    global _generation
+    _generation += 1
+    for well_id in well_ids:
+        _cache.invalidate(well_tag(well_id))
+    _cache.invalidate(INTERPOLATED_TAG)
+
+
+def invalidate_interpolated() -> None:
+    global _generation
+    _generation += 1
+    _cache.invalidate(INTERPOLATED_TAG)
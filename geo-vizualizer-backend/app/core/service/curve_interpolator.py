@@ -1,7 +1,18 @@
+import asyncio
+import time
+from typing import Any
+
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 from app import crud
-from app.models import Curve, WellTrack
-from sqlalchemy import exists, select, text
+from app.core import payload_cache
+from app.db.session import AsyncSessionLocal
+from app.models import Curve, Well, WellTrack
+from sqlalchemy import exists, func, select, text
+
+# "sql": LATERAL nearest-point query below, kept as the reference
+# "numpy": one well loaded as arrays and interpolated with searchsorted
+INTERPOLATION_ENGINES = ("sql", "numpy")
 
 query = text("""
     insert into interpolated_curve (curve_point_id, lat, lon, absolute_depth)
@@ -51,32 +62,196 @@ query = text("""
     ORDER BY md_curve;
 """)
 
-async def interpolate_curves(db: AsyncSession):
-    wells = await crud.wells.get_multi(db)
-    failed_ids = []
-    for well in wells:
-        try:
-            await interpolate_curve_for_well(db, well.id)
-        except Exception as e:
-            failed_ids.append(well.id)
+async def interpolate_curves(
+    db: AsyncSession,
+    *,
+    engine: str = "numpy",
+    concurrency: int | None = None,
+    force: bool = False,
+) -> dict[str, Any]:
+    """
+    Interpolate every well whose curve/welltrack changed since its last
+    interpolation (all wells with force=True) and report how it went.
+    - concurrency None or 1: wells one after another through `db`
+    - concurrency > 1: up to `concurrency` wells at once, each in its own
+      session from AsyncSessionLocal
+    A failing well never stops the others; its reason is in the report:
+    {"wells_total", "wells_skipped", "wells_succeeded", "wells_failed", "rows_saved",
+     "seconds", "wells": [{"well_id", "status", "rows_saved", "seconds", "error"?}, ...]}
+    Up-to-date wells are only counted in wells_skipped.
+    """
+    started = time.perf_counter()
+    wells_total = await db.scalar(select(func.count()).select_from(Well))
+    stmt = select(Well.id).order_by(Well.id)
+    if not force:
+        stmt = stmt.where(Well.interpolated_version.is_distinct_from(Well.data_version))
+    well_ids = list(await db.scalars(stmt))
 
-async def interpolate_curve_for_well(db: AsyncSession, well_id: int):
+    if not concurrency or concurrency <= 1:
+        reports = [
+            await _interpolate_and_report(db, well_id, engine=engine, force=force)
+            for well_id in well_ids
+        ]
+    else:
+        semaphore = asyncio.Semaphore(concurrency)
 
-    has_curves = await db.scalar(
-        select(exists().where(Curve.well_id == well_id))
-    )
-    if not has_curves:
-        raise Exception(f"zero curves for well with id={well_id}")
+        async def run_one(well_id: int) -> dict[str, Any]:
+            async with semaphore:
+                async with AsyncSessionLocal() as session:
+                    return await _interpolate_and_report(session, well_id, engine=engine, force=force)
 
-    has_welltracks = await db.scalar(
-        select(exists().where(WellTrack.well_id == well_id))
-    )
-    if not has_welltracks:
-        raise Exception(f"zero welltracks for well with id={well_id}")
+        reports = list(await asyncio.gather(*(run_one(well_id) for well_id in well_ids)))
+
+    succeeded = sum(1 for report in reports if report["status"] == "ok")
+    failed = sum(1 for report in reports if report["status"] == "error")
+    return {
+        "wells_total": wells_total,
+        "wells_skipped": wells_total - succeeded - failed,
+        "wells_succeeded": succeeded,
+        "wells_failed": failed,
+        "rows_saved": sum(report["rows_saved"] for report in reports),
+        "seconds": round(time.perf_counter() - started, 3),
+        "wells": [report for report in reports if report["status"] != "skipped"],
+    }
+
+
+async def _interpolate_and_report(
+    db: AsyncSession, well_id: int, *, engine: str, force: bool
+) -> dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        rows_saved = await interpolate_curve_for_well(db, well_id, engine=engine, force=force)
+    except Exception as exc:
+        return {
+            "well_id": well_id,
+            "status": "error",
+            "rows_saved": 0,
+            "seconds": round(time.perf_counter() - started, 3),
+            "error": str(exc) or type(exc).__name__,
+        }
+    return {
+        "well_id": well_id,
+        # changed by another run between listing and processing
+        "status": "skipped" if rows_saved is None else "ok",
+        "rows_saved": rows_saved or 0,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+async def interpolate_curve_for_well(
+    db: AsyncSession, well_id: int, *, engine: str = "numpy", force: bool = False
+) -> int | None:
+    """
+    Recompute interpolated_curve rows of one well.
+    Old rows are deleted, new ones written and the well stamped with the
+    data_version they were computed from in one transaction, so readers see
+    either the previous result or the new one.
+    The well row is locked (SELECT ... FOR UPDATE) for that transaction, so
+    overlapping runs on one well take turns; the run that waited sees the
+    well already stamped and skips it (unless force).
+    A well without curve or welltrack rows has nothing to interpolate: its old
+    rows are deleted and it is stamped all the same, so later runs skip it
+    until an upload changes its data_version.
+    Returns the number of rows written, None if the well is up to date (unless force).
+    """
+    if engine not in INTERPOLATION_ENGINES:
+        raise ValueError(f"Unknown interpolation engine: {engine}")
+
+    versions = (
+        await db.execute(
+            select(Well.data_version, Well.interpolated_version)
+            .where(Well.id == well_id)
+            .with_for_update()
+        )
+    ).one_or_none()
+    if versions is None:
+        raise Exception(f"no well with id={well_id}")
+    # read under the lock: a run that held it before has already committed
+    data_version, interpolated_version = versions
+    if not force and interpolated_version == data_version:
+        # release the lock
+        await db.rollback()
+        return None
 
     try:
-        await db.execute(query, {"well_id": well_id})
+        has_curves = await db.scalar(
+            select(exists().where(Curve.well_id == well_id))
+        )
+        has_welltracks = await db.scalar(
+            select(exists().where(WellTrack.well_id == well_id))
+        )
+        await crud.interpolated_curves.delete_for_well(db, well_id=well_id)
+        if not has_curves or not has_welltracks:
+            rows_saved = 0
+        elif engine == "sql":
+            result = await db.execute(query, {"well_id": well_id})
+            rows_saved = result.rowcount
+        else:
+            rows_saved = await _interpolate_well_numpy(db, well_id)
+        await crud.wells.mark_interpolated(db, well_id=well_id, data_version=data_version)
         await db.commit()
     except Exception:
         await db.rollback()
         raise
+    payload_cache.invalidate_interpolated()
+    return rows_saved
+
+
+def interpolate_along_track(
+    track_md: np.ndarray, track_values: np.ndarray, curve_md: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Linear interpolation of track_values (N x k, rows sorted by track_md) at curve_md,
+    with the same rules as the SQL query:
+    - w1 = last track point with md <= curve md, w2 = first with md >= curve md
+    - points outside the track's md range are dropped
+    - md1 == md2 takes w1's values
+    Returns (mask of kept curve points, M x k values for them).
+    """
+    lower = np.searchsorted(track_md, curve_md, side="right") - 1
+    upper = np.searchsorted(track_md, curve_md, side="left")
+    keep = (lower >= 0) & (upper < len(track_md))
+    lower, upper, md = lower[keep], upper[keep], curve_md[keep]
+
+    md1, md2 = track_md[lower], track_md[upper]
+    v1, v2 = track_values[lower], track_values[upper]
+    span = md2 - md1
+    same = span == 0
+    # avoid 0/0 where md1 == md2, those rows take v1 below
+    ratio = np.where(same, 0.0, (md - md1) / np.where(same, 1.0, span))
+    values = v1 + (v2 - v1) * ratio[:, None]
+    values[same] = v1[same]
+    return keep, values
+
+
+async def _interpolate_well_numpy(db: AsyncSession, well_id: int) -> int:
+    track_rows = (
+        await db.execute(
+            select(WellTrack.measured_depth, WellTrack.lat, WellTrack.lon, WellTrack.absolute_depth)
+            .where(WellTrack.well_id == well_id, WellTrack.measured_depth.is_not(None))
+            .order_by(WellTrack.measured_depth)
+        )
+    ).all()
+    curve_rows = (
+        await db.execute(
+            select(Curve.id, Curve.measured_depth)
+            .where(Curve.well_id == well_id, Curve.measured_depth.is_not(None))
+        )
+    ).all()
+    if not track_rows or not curve_rows:
+        return 0
+
+    # None (NULL) becomes NaN in float arrays
+    track = np.array(track_rows, dtype=np.float64)
+    curve = np.array(curve_rows, dtype=np.float64)
+    keep, values = interpolate_along_track(track[:, 0], track[:, 1:], curve[:, 1])
+    curve_ids = curve[keep, 0].astype(np.int64)
+
+    # NULL inputs must stay NULL in the output, not NaN
+    missing = np.isnan(values)
+    if missing.any():
+        values = values.astype(object)
+        values[missing] = None
+
+    return await crud.interpolated_curves.copy_rows(
+        db, rows=zip(curve_ids.tolist(), *values.T.tolist())
+    )
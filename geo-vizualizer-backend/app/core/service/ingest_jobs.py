@@ -0,0 +1,231 @@
+"""
+Background ingest: uploads are queued as ingest_job rows and converted by a
+fixed pool of INGEST_WORKERS workers, so ingest throughput depends on the
+worker count and not on how many clients upload at once.
+
+- enqueue() stores the upload in JOB_SPOOL_DIR and inserts a "queued" job;
+  an upload with a known Idempotency-Key returns the existing job instead
+- workers claim jobs with FOR UPDATE SKIP LOCKED (crud.ingest_jobs.claim_next),
+  so several app processes can share the queue, and run the Converter method
+  of the job kind in their own session
+- a running job heartbeats every JOB_POLL_INTERVAL seconds and is stopped
+  once cancellation is requested; the Converter commits once at the end,
+  so a cancelled or failed job leaves no partial rows
+- the job is marked "succeeded" in the ingest's own transaction (Converter
+  before_commit, crud.ingest_jobs.succeed): its rows and its status are
+  committed together
+- jobs running at shutdown go back to the queue, a job whose worker died is
+  claimed again after JOB_STALE_AFTER seconds without heartbeat; such a job
+  has committed nothing, so running it again is safe even for the thickness
+  kinds, whose ingest appends rows
+- archive jobs are the exception: every member commits on its own, and its
+  name is added to the job's result["committed"] in that transaction. A
+  cancelled or failed archive job keeps this list, showing what was written;
+  an archive job run again skips the members in it
+"""
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.core.config import settings
+from app.core.converter import Converter
+from app.db.session import AsyncSessionLocal
+from app.models import IngestJob
+
+logger = logging.getLogger(__name__)
+
+# job kind -> Converter method
+KINDS = {
+    "curve": "convert_well_file",
+    "welltrack": "convert_welltrack",
+    "formation_thickness": "convert_formation_thickness",
+    "effective_formation_thickness": "convert_effective_formation_thickness",
+    "archive": "convert_archive",
+}
+# a job claimed this many times (its workers kept dying) is failed
+MAX_ATTEMPTS = 3
+
+_workers: list["asyncio.Task[None]"] = []
+# job id -> conversion task, of the jobs running in this process
+_running: dict[int, "asyncio.Task[dict[str, Any]]"] = {}
+_wakeup: asyncio.Event | None = None
+_stopping = False
+
+
+async def enqueue(
+    db: AsyncSession,
+    *,
+    kind: str,
+    source: BinaryIO,
+    file_name: str | None,
+    idempotency_key: str | None = None,
+) -> tuple[IngestJob, bool]:
+    """
+    Queue the upload `source` as a `kind` job. Returns the job and whether it
+    was created (False: the job of an earlier upload with idempotency_key).
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    if idempotency_key is not None:
+        existing = await crud.ingest_jobs.get_by_idempotency_key(db, idempotency_key=idempotency_key)
+        if existing is not None:
+            return existing, False
+
+    file_path = await asyncio.to_thread(_spool, source)
+    try:
+        job = await crud.ingest_jobs.create(
+            db, kind=kind, file_name=file_name, file_path=file_path, idempotency_key=idempotency_key
+        )
+    except BaseException:
+        _remove(file_path)
+        raise
+    if job is None:
+        # a concurrent upload with the same key won
+        _remove(file_path)
+        return await crud.ingest_jobs.get_by_idempotency_key(db, idempotency_key=idempotency_key), False
+    if _wakeup is not None:
+        _wakeup.set()
+    return job, True
+
+
+async def cancel(db: AsyncSession, *, job_id: int) -> IngestJob | None:
+    """
+    Request cancellation; see crud.ingest_jobs.request_cancel.
+    A job running in this process is stopped right away, in another process
+    on its next heartbeat.
+    """
+    job = await crud.ingest_jobs.request_cancel(db, job_id=job_id)
+    if job is None:
+        return None
+    if job.status == "cancelled":
+        _remove(job.file_path)
+    elif job.id in _running:
+        _running[job.id].cancel()
+    return job
+
+
+def start() -> None:
+    global _wakeup, _stopping
+    if _workers:
+        return
+    _wakeup = asyncio.Event()
+    _stopping = False
+    for _ in range(settings.INGEST_WORKERS):
+        _workers.append(asyncio.create_task(_work()))
+
+
+async def stop() -> None:
+    """
+    Stop the workers; their running jobs are put back in the queue.
+    """
+    global _stopping
+    _stopping = True
+    for worker in _workers:
+        worker.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+
+async def _work() -> None:
+    while True:
+        _wakeup.clear()
+        try:
+            async with AsyncSessionLocal() as db:
+                job = await crud.ingest_jobs.claim_next(db, stale_after=settings.JOB_STALE_AFTER)
+        except Exception:
+            logger.exception("Could not claim an ingest job")
+            job = None
+        if job is None:
+            try:
+                await asyncio.wait_for(_wakeup.wait(), settings.JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        try:
+            await _run(job)
+        except Exception:
+            logger.exception("Ingest job %s could not be finished", job.id)
+
+
+async def _run(job: IngestJob) -> None:
+    if job.attempts > MAX_ATTEMPTS:
+        await _finish(job, "failed", error=f"Gave up after {MAX_ATTEMPTS} attempts")
+        return
+
+    task = asyncio.create_task(_convert(job))
+    _running[job.id] = task
+    watcher = asyncio.create_task(_watch(job.id, task))
+    try:
+        result = await task
+    except asyncio.CancelledError:
+        if _stopping:
+            async with AsyncSessionLocal() as db:
+                await crud.ingest_jobs.requeue(db, job_ids=[job.id])
+            raise
+        await _finish(job, "cancelled")
+    except Exception as exc:
+        await _finish(job, "failed", error=str(exc) or type(exc).__name__)
+    else:
+        await _finish(job, "succeeded", result=result)
+    finally:
+        watcher.cancel()
+        del _running[job.id]
+
+
+async def _convert(job: IngestJob) -> dict[str, Any]:
+    async def succeed(db: AsyncSession, result: dict[str, Any]) -> None:
+        await crud.ingest_jobs.succeed(db, job_id=job.id, result=result)
+
+    async def member_committed(db: AsyncSession, result: dict[str, Any]) -> None:
+        await crud.ingest_jobs.add_committed_member(db, job_id=job.id, name=result["member"])
+
+    async with AsyncSessionLocal() as db:
+        if job.kind == "archive":
+            # an archive commits member by member, the job is finished after the last one
+            committed = (job.result or {}).get("committed", [])
+            return await Converter(before_commit=member_committed).convert_archive(
+                db, file_path=job.file_path, done=set(committed)
+            )
+        return await getattr(Converter(before_commit=succeed), KINDS[job.kind])(db, file_path=job.file_path)
+
+
+async def _watch(job_id: int, task: "asyncio.Task[dict[str, Any]]") -> None:
+    while True:
+        await asyncio.sleep(settings.JOB_POLL_INTERVAL)
+        try:
+            async with AsyncSessionLocal() as db:
+                cancel_requested = await crud.ingest_jobs.heartbeat(db, job_id=job_id)
+        except Exception:
+            logger.exception("Could not heartbeat ingest job %s", job_id)
+            continue
+        if cancel_requested:
+            task.cancel()
+            return
+
+
+async def _finish(job: IngestJob, status: str, **fields: Any) -> None:
+    async with AsyncSessionLocal() as db:
+        await crud.ingest_jobs.finish(db, job_id=job.id, status=status, **fields)
+    _remove(job.file_path)
+
+
+def _spool(source: BinaryIO) -> str:
+    Path(settings.JOB_SPOOL_DIR).mkdir(parents=True, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=settings.JOB_SPOOL_DIR, suffix=".upload")
+    with os.fdopen(fd, "wb") as out:
+        shutil.copyfileobj(source, out)
+    return path
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
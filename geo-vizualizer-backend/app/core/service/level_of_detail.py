@@ -0,0 +1,308 @@
+"""
+Level-of-detail simplification of per-well welltracks, curves and interpolated points.
+
+Every well is ranked once with a greedy Douglas–Peucker pass: points enter in
+order of their distance to the simplified polyline, so any prefix of the ranking
+is a shape-preserving simplification. A request then only picks a prefix:
+- max_points: the first max_points ranked points
+- tolerance: the points that deviate more than `tolerance` metres
+  (the Douglas–Peucker result for that tolerance)
+First/last points and both sides of every 0/1 type change are always kept.
+
+Points are compared in 3D metres: lat/lon projected around the well, absolute
+depth as is. Curves only have measured depth, so between type changes every
+point is on the line and the extra points are spread evenly along the well.
+
+Rankings are cached together with the well's columns in a ByteLRUCache of
+LOD_CACHE_BYTES, keyed by the well's data/interpolated version, so a re-upload
+or re-interpolation is never served from a stale ranking.
+"""
+import asyncio
+import heapq
+import math
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.core.cache import ByteLRUCache
+from app.core.config import settings
+
+# ranking depth per well; max_points above it (or a tolerance below the
+# last ranked distance) returns the whole well
+LOD_MAX_RANKED = 20_000
+
+METRES_PER_DEGREE = 111_320.0
+
+# crud.interpolated_curves.get_columns layout, for an empty result
+INTERPOLATED_DTYPES = {
+    "well_id": "<i4",
+    "type": "|i1",
+    "lat": "<f8",
+    "lon": "<f8",
+    "measured_depth": "<f8",
+    "absolute_depth": "<f8",
+}
+
+_cache = ByteLRUCache(settings.LOD_CACHE_BYTES)
+
+
+@dataclass(frozen=True)
+class RankedWell:
+    columns: dict[str, np.ndarray]
+    # point indices, most significant first, and their Douglas–Peucker
+    # distance (non-increasing, inf for kept-always points)
+    order: np.ndarray
+    significance: np.ndarray
+    forced: int
+
+    @property
+    def size(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(v.nbytes for v in self.columns.values()) + self.order.nbytes + self.significance.nbytes
+
+    def select(self, *, max_points: int | None = None, tolerance: float | None = None) -> np.ndarray:
+        """
+        Sorted indices of the points to keep.
+        """
+        limit = self.size
+        if tolerance is not None:
+            # significance is non-increasing: count of points above tolerance
+            kept = int(np.searchsorted(-self.significance, -tolerance, side="left"))
+            if kept < len(self.order):
+                limit = kept
+        if max_points is not None and max_points < len(self.order):
+            limit = min(limit, max(max_points, self.forced))
+        if limit >= self.size:
+            return np.arange(self.size)
+        return np.sort(self.order[:limit])
+
+    def subset(self, **kwargs) -> dict[str, np.ndarray]:
+        indices = self.select(**kwargs)
+        return {name: values[indices] for name, values in self.columns.items()}
+
+
+def rank_points(
+    points: np.ndarray, forced: np.ndarray, max_ranked: int = LOD_MAX_RANKED
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Greedy Douglas–Peucker ranking of an (N, 3) polyline.
+    `forced` marks points that are always kept; with the first and last
+    point they split the polyline into the initial segments. Then the point
+    farthest from its segment is taken next, capped by the distance of the
+    split that created the segment, so distances never increase along the order.
+    Segments with every point on the line are split in the middle, after
+    all deviating points. Ranking stops after max_ranked points.
+    Returns (order, significance).
+    """
+    n = len(points)
+    if n == 0:
+        return np.empty(0, dtype=np.int32), np.empty(0)
+    forced = forced.copy()
+    forced[0] = forced[-1] = True
+    anchors = np.flatnonzero(forced)
+
+    order = anchors.tolist()
+    significance = [math.inf] * len(order)
+    heap: list[tuple[float, int, int, int, int]] = []
+
+    def push(start: int, end: int, cap: float) -> None:
+        if end - start < 2:
+            return
+        distances = _segment_distances(points[start + 1 : end], points[start], points[end])
+        k = int(np.argmax(distances))
+        distance = float(distances[k])
+        if distance <= 0.0:
+            k = (end - start) // 2 - 1
+        heapq.heappush(heap, (-min(distance, cap), start - end, start + 1 + k, start, end))
+
+    for start, end in zip(anchors[:-1], anchors[1:]):
+        push(int(start), int(end), math.inf)
+
+    while heap and len(order) < max_ranked:
+        distance, _, split, start, end = heapq.heappop(heap)
+        order.append(split)
+        significance.append(-distance)
+        push(start, split, -distance)
+        push(split, end, -distance)
+
+    return np.array(order, dtype=np.int32), np.array(significance)
+
+
+def _segment_distances(points: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    direction = end - start
+    offsets = points - start
+    length2 = float(direction @ direction)
+    if length2 > 0.0:
+        t = np.clip(offsets @ direction / length2, 0.0, 1.0)
+        offsets = offsets - t[:, None] * direction
+    return np.sqrt(np.einsum("ij,ij->i", offsets, offsets))
+
+
+def _local_metres(lat: np.ndarray, lon: np.ndarray, depth: np.ndarray) -> np.ndarray:
+    """
+    lat/lon/depth as (N, 3) metres around the well's mean position, NaN as 0.
+    """
+    lat0 = float(np.nanmean(lat)) if np.isfinite(lat).any() else 0.0
+    lon0 = float(np.nanmean(lon)) if np.isfinite(lon).any() else 0.0
+    points = np.column_stack(
+        (
+            (lon - lon0) * METRES_PER_DEGREE * math.cos(math.radians(lat0)),
+            (lat - lat0) * METRES_PER_DEGREE,
+            depth,
+        )
+    )
+    return np.nan_to_num(points, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def _type_changes(types: np.ndarray) -> np.ndarray:
+    changed = types[1:] != types[:-1]
+    forced = np.zeros(len(types), dtype=bool)
+    forced[1:] |= changed
+    forced[:-1] |= changed
+    return forced
+
+
+def _rank_welltrack(columns: dict[str, np.ndarray]) -> RankedWell:
+    points = _local_metres(columns["lat"], columns["lon"], columns["absolute_depth"])
+    return _ranked(columns, points, np.zeros(len(points), dtype=bool))
+
+
+def _rank_curve(columns: dict[str, np.ndarray]) -> RankedWell:
+    md = np.nan_to_num(columns["measured_depth"], nan=0.0)
+    points = np.column_stack((md, np.zeros_like(md), np.zeros_like(md)))
+    return _ranked(columns, points, _type_changes(columns["type"]))
+
+
+def _rank_interpolated(columns: dict[str, np.ndarray]) -> RankedWell:
+    points = _local_metres(columns["lat"], columns["lon"], columns["absolute_depth"])
+    return _ranked(columns, points, _type_changes(columns["type"]))
+
+
+def _ranked(columns: dict[str, np.ndarray], points: np.ndarray, forced: np.ndarray) -> RankedWell:
+    order, significance = rank_points(points, forced)
+    n_forced = int(np.isinf(significance).sum())
+    return RankedWell(columns=columns, order=order, significance=significance, forced=n_forced)
+
+
+async def _get_ranked(
+    key: tuple,
+    load: Callable[[], Awaitable[dict[str, np.ndarray]]],
+    rank: Callable[[dict[str, np.ndarray]], RankedWell],
+    *,
+    cache: bool = True,
+) -> RankedWell:
+    ranked = _cache.get(key)
+    if ranked is None:
+        # ranking is pure NumPy/Python, keep it off the event loop
+        ranked = await asyncio.to_thread(rank, await load())
+        if cache:
+            _cache.put(key, ranked, ranked.nbytes)
+    return ranked
+
+
+async def welltrack(
+    db: AsyncSession, well_id: int, *, max_points: int | None = None, tolerance: float | None = None
+) -> dict[str, np.ndarray]:
+    """
+    Simplified welltrack, columns as crud.welltracks.get_columns_by_well_id.
+    """
+    versions = await crud.wells.get_versions(db, [well_id])
+    ranked = await _get_ranked(
+        ("welltrack", well_id, versions.get(well_id, (None,))[0]),
+        lambda: crud.welltracks.get_columns_by_well_id(db, well_id),
+        _rank_welltrack,
+        cache=well_id in versions,
+    )
+    return ranked.subset(max_points=max_points, tolerance=tolerance)
+
+
+async def curve(
+    db: AsyncSession, well_id: int, *, max_points: int | None = None, tolerance: float | None = None
+) -> dict[str, np.ndarray]:
+    """
+    Simplified curve, columns as crud.curves.get_columns_by_well_id.
+    """
+    versions = await crud.wells.get_versions(db, [well_id])
+    ranked = await _get_ranked(
+        ("curve", well_id, versions.get(well_id, (None,))[0]),
+        lambda: crud.curves.get_columns_by_well_id(db, well_id),
+        _rank_curve,
+        cache=well_id in versions,
+    )
+    return ranked.subset(max_points=max_points, tolerance=tolerance)
+
+
+async def interpolated(
+    db: AsyncSession,
+    *,
+    well_ids: list[int] | None = None,
+    max_points: int | None = None,
+    tolerance: float | None = None,
+    min_lat: float | None = None,
+    max_lat: float | None = None,
+    min_lon: float | None = None,
+    max_lon: float | None = None,
+) -> dict[str, np.ndarray]:
+    """
+    Interpolated points simplified per well (max_points is per well), columns
+    as crud.interpolated_curves.get_columns. Wells missing from the cache are
+    loaded with a single query; the lat/lon box is applied after simplification.
+    """
+    versions = await crud.wells.get_versions(db, well_ids)
+    ranked: dict[int, RankedWell] = {}
+    missing: list[int] = []
+    for well_id in sorted(versions):
+        cached = _cache.get(("interpolated", well_id, versions[well_id]))
+        if cached is None:
+            missing.append(well_id)
+        else:
+            ranked[well_id] = cached
+
+    if missing:
+        loaded = await crud.interpolated_curves.get_columns(
+            db, filters=crud.interpolated_curves.point_filters(well_ids=missing)
+        )
+        by_well = _split_by_well(loaded)
+        empty = {name: values[:0] for name, values in loaded.items()}
+        for well_id in missing:
+            # wells without points are cached too, so they are not queried again
+            ranked[well_id] = await asyncio.to_thread(_rank_interpolated, by_well.get(well_id, empty))
+            _cache.put(("interpolated", well_id, versions[well_id]), ranked[well_id], ranked[well_id].nbytes)
+
+    parts = [ranked[well_id].subset(max_points=max_points, tolerance=tolerance) for well_id in sorted(ranked)]
+    columns = {
+        name: np.concatenate([part[name] for part in parts]) if parts else np.empty(0, dtype=dtype)
+        for name, dtype in INTERPOLATED_DTYPES.items()
+    }
+
+    mask = np.ones(len(columns["well_id"]), dtype=bool)
+    for name, bound, compare in (
+        ("lat", min_lat, np.greater_equal),
+        ("lat", max_lat, np.less_equal),
+        ("lon", min_lon, np.greater_equal),
+        ("lon", max_lon, np.less_equal),
+    ):
+        if bound is not None:
+            mask &= compare(columns[name], bound)
+    if not mask.all():
+        columns = {name: values[mask] for name, values in columns.items()}
+    return columns
+
+
+def _split_by_well(columns: dict[str, np.ndarray]) -> dict[int, dict[str, np.ndarray]]:
+    """
+    Columns ordered by well_id, split into one set of columns per well.
+    """
+    well_ids = columns["well_id"]
+    starts = np.flatnonzero(np.r_[True, well_ids[1:] != well_ids[:-1]]) if len(well_ids) else []
+    ends = list(starts[1:]) + [len(well_ids)]
+    return {
+        int(well_ids[start]): {name: values[start:end] for name, values in columns.items()}
+        for start, end in zip(starts, ends)
+    }
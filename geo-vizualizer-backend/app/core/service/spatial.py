@@ -0,0 +1,156 @@
+"""
+Bounding-box and radius queries over welltrack and thickness points.
+
+- PostGIS installed: one query, served by the ix_<table>_geom GiST expression
+  indexes (see the dataset_version migration)
+- otherwise: an in-process GridIndex over id/well_id/lat/lon, built once per
+  dataset version of the table, then only the matching rows are read by id
+
+Either way the cost follows the number of matching points, not the table size
+(apart from building the grid once after every ingest).
+"""
+import asyncio
+import math
+from typing import Any
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.db import spatial
+from app.db.spatial import Area, Circle
+from app.models import EffectiveFormationThickness, FormationThickness, Well, WellTrack
+
+LAYERS: dict[str, type[Any]] = {
+    "welltrack": WellTrack,
+    "formation_thickness": FormationThickness,
+    "effective_formation_thickness": EffectiveFormationThickness,
+}
+
+# table name -> (dataset version, index)
+_grids: dict[str, tuple[int, "GridIndex"]] = {}
+_grid_locks: dict[str, asyncio.Lock] = {}
+
+
+class GridIndex:
+    """
+    Uniform lat/lon grid over a point set, about POINTS_PER_CELL points per cell.
+    Points are stored sorted by cell (row-major), so the cells of one grid row
+    inside a box are a single contiguous slice.
+    Rows with NULL lat/lon are left out.
+    """
+
+    POINTS_PER_CELL = 64
+    MAX_CELLS_PER_AXIS = 4096
+
+    def __init__(self, ids: np.ndarray, well_ids: np.ndarray, lat: np.ndarray, lon: np.ndarray):
+        finite = np.isfinite(lat) & np.isfinite(lon)
+        ids, well_ids, lat, lon = ids[finite], well_ids[finite], lat[finite], lon[finite]
+        n = len(ids)
+
+        self.min_lat = float(lat.min()) if n else 0.0
+        self.min_lon = float(lon.min()) if n else 0.0
+        span_lat = max(float(lat.max()) - self.min_lat, 1e-9) if n else 1.0
+        span_lon = max(float(lon.max()) - self.min_lon, 1e-9) if n else 1.0
+
+        cells = max(1, n // self.POINTS_PER_CELL)
+        self.nx = int(min(self.MAX_CELLS_PER_AXIS, max(1, round(math.sqrt(cells * span_lon / span_lat)))))
+        self.ny = int(min(self.MAX_CELLS_PER_AXIS, max(1, cells // self.nx)))
+        self.cell_lat = span_lat / self.ny
+        self.cell_lon = span_lon / self.nx
+
+        cell = self._row(lat) * self.nx + self._col(lon)
+        order = np.argsort(cell, kind="stable")
+        self.ids = ids[order]
+        self.well_ids = well_ids[order]
+        self.lat = lat[order]
+        self.lon = lon[order]
+        # points of cell c are [starts[c], starts[c + 1])
+        self.starts = np.searchsorted(cell[order], np.arange(self.nx * self.ny + 1))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self.ids.nbytes + self.well_ids.nbytes + self.lat.nbytes + self.lon.nbytes + self.starts.nbytes
+
+    def _row(self, lat: np.ndarray) -> np.ndarray:
+        return np.clip(((lat - self.min_lat) // self.cell_lat).astype(np.int64), 0, self.ny - 1)
+
+    def _col(self, lon: np.ndarray) -> np.ndarray:
+        return np.clip(((lon - self.min_lon) // self.cell_lon).astype(np.int64), 0, self.nx - 1)
+
+    def query(self, area: Area) -> np.ndarray:
+        """
+        Positions (into ids / well_ids) of the points inside `area`, ascending.
+        """
+        box = area.bbox() if isinstance(area, Circle) else area
+        if not len(self) or box.min_lat > box.max_lat or box.min_lon > box.max_lon:
+            return np.empty(0, dtype=np.int64)
+        row0, row1 = self._row(np.array([box.min_lat, box.max_lat]))
+        col0, col1 = self._col(np.array([box.min_lon, box.max_lon]))
+
+        slices = [
+            np.arange(self.starts[row * self.nx + col0], self.starts[row * self.nx + col1 + 1])
+            for row in range(row0, row1 + 1)
+        ]
+        candidates = np.concatenate(slices)
+        lat, lon = self.lat[candidates], self.lon[candidates]
+        inside = (
+            (lat >= box.min_lat) & (lat <= box.max_lat) & (lon >= box.min_lon) & (lon <= box.max_lon)
+        )
+        if isinstance(area, Circle):
+            inside &= spatial.haversine(lat, lon, area.lat, area.lon) <= area.radius
+        return np.sort(candidates[inside])
+
+
+async def _get_grid(db: AsyncSession, layer: str) -> GridIndex:
+    """
+    Grid index of `layer` for its current dataset version, rebuilt after an ingest.
+    """
+    version = await crud.dataset_versions.get(db, name=layer)
+    cached = _grids.get(layer)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    async with _grid_locks.setdefault(layer, asyncio.Lock()):
+        cached = _grids.get(layer)
+        if cached is None or cached[0] != version:
+            points = await spatial.get_points(db, LAYERS[layer])
+            grid = await asyncio.to_thread(
+                GridIndex, points["id"], points["well_id"], points["lat"], points["lon"]
+            )
+            _grids[layer] = (version, grid)
+        return _grids[layer][1]
+
+
+async def find_points(db: AsyncSession, layer: str, area: Area) -> list[dict[str, Any]]:
+    """
+    Rows of `layer` (a key of LAYERS) inside `area`, ordered by id.
+    """
+    model = LAYERS[layer]
+    if await spatial.postgis_available(db):
+        stmt = select(*model.__table__.columns).where(spatial.postgis_condition(model, area)).order_by(model.id)
+        result = await db.execute(stmt)
+        keys = list(result.keys())
+        return [dict(zip(keys, row)) for row in result]
+
+    grid = await _get_grid(db, layer)
+    return await spatial.get_rows_by_ids(db, model, grid.ids[grid.query(area)])
+
+
+async def find_wells(db: AsyncSession, area: Area) -> list[Well]:
+    """
+    Wells with at least one welltrack point inside `area`, ordered by id.
+    """
+    if await spatial.postgis_available(db):
+        well_ids = select(WellTrack.well_id).where(spatial.postgis_condition(WellTrack, area))
+    else:
+        grid = await _get_grid(db, "welltrack")
+        well_ids = np.unique(grid.well_ids[grid.query(area)]).tolist()
+        if not well_ids:
+            return []
+    result = await db.execute(select(Well).where(Well.id.in_(well_ids)).order_by(Well.id))
+    return list(result.scalars().all())
@@ -0,0 +1,326 @@
+"""
+Thickness surfaces: formation_thickness / effective_formation_thickness points
+interpolated onto a regular lat/lon grid.
+
+- "idw": inverse distance weighting over the `neighbours` nearest points
+- "kriging": ordinary kriging over the same neighbourhood, with a spherical
+  variogram fitted to the points
+Neighbours come from scipy's cKDTree (scipy is in requirements.txt); the
+exact tiled search in NumPy (see _nearest_on_grid) is kept for installs
+without scipy.
+Distances are in metres on a local equirectangular projection.
+Points at the same lat/lon are merged (mean thickness) first.
+"""
+import asyncio
+import math
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # scipy missing, the NumPy tiled search is used instead
+    cKDTree = None
+
+SURFACE_METHODS = ("idw", "kriging")
+SURFACE_LAYERS = ("formation_thickness", "effective_formation_thickness")
+
+METRES_PER_DEGREE = 111_320.0
+
+# grid nodes per tile side and initial search margin (in average
+# k-neighbour radii) of the NumPy neighbour search
+TILE_SIZE = 16
+MARGIN_FACTOR = 1.5
+# targets per batched kriging solve, bounds the (chunk, k+1, k+1) systems
+KRIGING_CHUNK = 32_768
+# point pairs sampled for the empirical variogram
+VARIOGRAM_PAIRS = 200_000
+VARIOGRAM_BINS = 15
+
+
+@dataclass(frozen=True)
+class GridSpec:
+    min_lat: float
+    max_lat: float
+    min_lon: float
+    max_lon: float
+    width: int
+    height: int
+
+    def node_lats(self) -> np.ndarray:
+        """
+        Cell centre latitudes, north to south (row 0 is max_lat).
+        """
+        step = (self.max_lat - self.min_lat) / self.height
+        return self.max_lat - (np.arange(self.height) + 0.5) * step
+
+    def node_lons(self) -> np.ndarray:
+        step = (self.max_lon - self.min_lon) / self.width
+        return self.min_lon + (np.arange(self.width) + 0.5) * step
+
+
+async def load_points(db: AsyncSession, layer: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    lat, lon, thickness of `layer`, rows with a NULL in any of them dropped.
+    """
+    store = getattr(crud, layer)
+    columns = await store.get_surface_columns(db)
+    lat, lon, thickness = columns["lat"], columns["lon"], columns["thickness"]
+    valid = np.isfinite(lat) & np.isfinite(lon) & np.isfinite(thickness)
+    return lat[valid], lon[valid], thickness[valid]
+
+
+async def build_surface(
+    db: AsyncSession,
+    layer: str,
+    *,
+    width: int,
+    height: int,
+    bbox: tuple[float, float, float, float] | None = None,
+    method: str = "idw",
+    neighbours: int = 12,
+    power: float = 2.0,
+) -> tuple[np.ndarray, GridSpec]:
+    """
+    Surface of `layer` (one of SURFACE_LAYERS) over `bbox`
+    (min_lat, max_lat, min_lon, max_lon), the padded field extent when None.
+    Raises ValueError when the layer has no points.
+    """
+    if layer not in SURFACE_LAYERS:
+        raise ValueError(f"Unknown surface layer: {layer}")
+    lat, lon, values = await load_points(db, layer)
+    grid = GridSpec(*(bbox or field_extent(lat, lon)), width=width, height=height)
+    # seconds of NumPy for large grids, keep it off the event loop
+    surface = await asyncio.to_thread(
+        interpolate_surface, lat, lon, values, grid, method=method, neighbours=neighbours, power=power
+    )
+    return surface, grid
+
+
+def field_extent(lat: np.ndarray, lon: np.ndarray, padding: float = 0.05) -> tuple[float, float, float, float]:
+    """
+    (min_lat, max_lat, min_lon, max_lon) of the points, padded by `padding` of each span.
+    """
+    if not len(lat):
+        raise ValueError("No points to interpolate")
+    min_lat, max_lat = float(lat.min()), float(lat.max())
+    min_lon, max_lon = float(lon.min()), float(lon.max())
+    pad_lat = max((max_lat - min_lat) * padding, 1e-4)
+    pad_lon = max((max_lon - min_lon) * padding, 1e-4)
+    return min_lat - pad_lat, max_lat + pad_lat, min_lon - pad_lon, max_lon + pad_lon
+
+
+def interpolate_surface(
+    lat: np.ndarray,
+    lon: np.ndarray,
+    values: np.ndarray,
+    grid: GridSpec,
+    *,
+    method: str = "idw",
+    neighbours: int = 12,
+    power: float = 2.0,
+) -> np.ndarray:
+    """
+    (height, width) float32 grid of interpolated values, row 0 at max_lat.
+    """
+    if method not in SURFACE_METHODS:
+        raise ValueError(f"Unknown surface method: {method}")
+    lat, lon, values = _merge_duplicates(lat, lon, values)
+    if not len(values):
+        raise ValueError("No points to interpolate")
+
+    lat0 = (grid.min_lat + grid.max_lat) / 2
+    sources = _project(lat, lon, lat0)
+    xs = _project(np.zeros(grid.width), grid.node_lons(), lat0)[:, 0]
+    ys = _project(grid.node_lats(), np.zeros(grid.height), lat0)[:, 1]
+    k = min(neighbours, len(values))
+    distances, indices = _nearest_on_grid(sources, xs, ys, k)
+
+    if method == "kriging" and k >= 2:
+        nodes = np.column_stack((np.tile(xs, len(ys)), np.repeat(ys, len(xs))))
+        surface = _ordinary_kriging(sources, values, nodes, distances, indices)
+    else:
+        surface = _idw(values, distances, indices, power)
+    return surface.reshape(grid.height, grid.width).astype(np.float32)
+
+
+def _merge_duplicates(
+    lat: np.ndarray, lon: np.ndarray, values: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    locations, inverse = np.unique(np.column_stack((lat, lon)), axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    sums = np.bincount(inverse, weights=values, minlength=len(locations))
+    counts = np.bincount(inverse, minlength=len(locations))
+    return locations[:, 0], locations[:, 1], sums / counts
+
+
+def _project(lat: np.ndarray, lon: np.ndarray, lat0: float) -> np.ndarray:
+    scale = METRES_PER_DEGREE * math.cos(math.radians(lat0))
+    return np.column_stack((lon * scale, lat * METRES_PER_DEGREE))
+
+
+def _nearest_on_grid(
+    sources: np.ndarray, xs: np.ndarray, ys: np.ndarray, k: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Distances and indices of the k nearest sources of every grid node
+    (row-major over ys, xs), nearest first.
+    NumPy path: nodes are processed in TILE_SIZE x TILE_SIZE tiles, each
+    against the sources inside the tile's box grown by a margin. The result is
+    exact once every node's k-th distance is within the margin; otherwise
+    the margin is doubled for that tile.
+    """
+    if cKDTree is not None:
+        nodes = np.column_stack((np.tile(xs, len(ys)), np.repeat(ys, len(xs))))
+        distances, indices = cKDTree(sources).query(nodes, k=k, workers=-1)
+        return distances.reshape(len(nodes), k), indices.reshape(len(nodes), k)
+
+    n_nodes = len(xs) * len(ys)
+    distances = np.empty((n_nodes, k))
+    indices = np.empty((n_nodes, k), dtype=np.int64)
+    span = np.ptp(sources, axis=0) if len(sources) > 1 else np.ones(2)
+    area = max(float(span[0] * span[1]), 1.0)
+    # radius holding about k sources at the average density
+    initial_margin = MARGIN_FACTOR * math.sqrt(k * area / (math.pi * len(sources)))
+    sx, sy = sources[:, 0], sources[:, 1]
+
+    for row0 in range(0, len(ys), TILE_SIZE):
+        tile_ys = ys[row0 : row0 + TILE_SIZE]
+        for col0 in range(0, len(xs), TILE_SIZE):
+            tile_xs = xs[col0 : col0 + TILE_SIZE]
+            nodes = np.column_stack((np.tile(tile_xs, len(tile_ys)), np.repeat(tile_ys, len(tile_xs))))
+            margin = initial_margin
+            while True:
+                near = np.flatnonzero(
+                    (sx >= tile_xs.min() - margin)
+                    & (sx <= tile_xs.max() + margin)
+                    & (sy >= tile_ys.min() - margin)
+                    & (sy <= tile_ys.max() + margin)
+                )
+                if len(near) >= k:
+                    d2 = (nodes[:, :1] - sx[near]) ** 2 + (nodes[:, 1:] - sy[near]) ** 2
+                    if len(near) > k:
+                        part = np.argpartition(d2, k - 1, axis=1)[:, :k]
+                    else:
+                        part = np.tile(np.arange(k), (len(nodes), 1))
+                    part_d2 = np.take_along_axis(d2, part, axis=1)
+                    order = np.argsort(part_d2, axis=1)
+                    tile_d = np.sqrt(np.take_along_axis(part_d2, order, axis=1))
+                    if len(near) == len(sources) or tile_d[:, -1].max() <= margin:
+                        break
+                margin *= 2
+
+            rows = (np.arange(len(tile_ys))[:, None] + row0) * len(xs) + (np.arange(len(tile_xs)) + col0)
+            rows = rows.ravel()
+            distances[rows] = tile_d
+            indices[rows] = near[np.take_along_axis(part, order, axis=1)]
+    return distances, indices
+
+
+def _idw(values: np.ndarray, distances: np.ndarray, indices: np.ndarray, power: float) -> np.ndarray:
+    # a node on a point takes its value instead of an infinite weight
+    exact = distances[:, 0] <= 1e-9
+    weights = 1.0 / np.maximum(distances, 1e-9) ** power
+    surface = (weights * values[indices]).sum(axis=1) / weights.sum(axis=1)
+    surface[exact] = values[indices[exact, 0]]
+    return surface
+
+
+def _fit_spherical_variogram(sources: np.ndarray, values: np.ndarray) -> tuple[float, float, float]:
+    """
+    (nugget, partial sill, range) of a spherical variogram, least squares on
+    the binned empirical semivariogram of up to VARIOGRAM_PAIRS random pairs.
+    """
+    n = len(values)
+    rng = np.random.default_rng(0)
+    if n * (n - 1) // 2 <= VARIOGRAM_PAIRS:
+        i, j = np.triu_indices(n, k=1)
+    else:
+        i = rng.integers(0, n, VARIOGRAM_PAIRS)
+        j = rng.integers(0, n, VARIOGRAM_PAIRS)
+        keep = i != j
+        i, j = i[keep], j[keep]
+    lags = np.hypot(*(sources[i] - sources[j]).T)
+    semivariances = 0.5 * (values[i] - values[j]) ** 2
+    variance = float(values.var()) or 1.0
+    max_lag = float(lags.max()) / 2 if len(lags) else 0.0
+    if max_lag <= 0:
+        return 0.0, variance, 1.0
+
+    edges = np.linspace(0, max_lag, VARIOGRAM_BINS + 1)
+    bins = np.digitize(lags, edges) - 1
+    inside = (bins >= 0) & (bins < VARIOGRAM_BINS)
+    counts = np.bincount(bins[inside], minlength=VARIOGRAM_BINS)
+    used = counts > 0
+    h = (np.bincount(bins[inside], weights=lags[inside], minlength=VARIOGRAM_BINS)[used] / counts[used])
+    gamma = (
+        np.bincount(bins[inside], weights=semivariances[inside], minlength=VARIOGRAM_BINS)[used]
+        / counts[used]
+    )
+
+    best = (0.0, variance, max_lag)
+    best_error = math.inf
+    for range_ in np.linspace(max_lag / 20, max_lag * 2, 40):
+        # linear in nugget and partial sill once the range is fixed
+        basis = np.column_stack((np.ones_like(h), _spherical(h, range_)))
+        (nugget, sill), *_ = np.linalg.lstsq(basis, gamma, rcond=None)
+        nugget, sill = max(float(nugget), 0.0), max(float(sill), 1e-12)
+        error = float(((nugget + sill * _spherical(h, range_) - gamma) ** 2 * counts[used]).sum())
+        if error < best_error:
+            best, best_error = (nugget, sill, float(range_)), error
+    return best
+
+
+def _spherical(h: np.ndarray, range_: float) -> np.ndarray:
+    r = np.minimum(h / range_, 1.0)
+    return 1.5 * r - 0.5 * r**3
+
+
+def _ordinary_kriging(
+    sources: np.ndarray,
+    values: np.ndarray,
+    nodes: np.ndarray,
+    distances: np.ndarray,
+    indices: np.ndarray,
+) -> np.ndarray:
+    """
+    Local ordinary kriging over each node's k neighbours, in chunks of KRIGING_CHUNK nodes.
+    The (k+1) x (k+1) kriging matrix only depends on the neighbour set, which
+    neighbouring nodes mostly share: it is inverted once per distinct set in
+    the chunk and applied to every node's right-hand side.
+    """
+    nugget, sill, range_ = _fit_spherical_variogram(sources, values)
+
+    def variogram(h: np.ndarray) -> np.ndarray:
+        return np.where(h > 0, nugget + sill * _spherical(h, range_), 0.0)
+
+    k = indices.shape[1]
+    # canonical order within each set, so equal sets compare equal
+    order = np.argsort(indices, axis=1)
+    indices = np.take_along_axis(indices, order, axis=1)
+    distances = np.take_along_axis(distances, order, axis=1)
+
+    surface = np.empty(len(nodes))
+    for start in range(0, len(nodes), KRIGING_CHUNK):
+        chunk = slice(start, start + KRIGING_CHUNK)
+        sets, inverse = np.unique(indices[chunk], axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+
+        points = sources[sets]
+        pairwise = np.sqrt(((points[:, :, None, :] - points[:, None, :, :]) ** 2).sum(axis=3))
+        system = np.ones((len(sets), k + 1, k + 1))
+        system[:, :k, :k] = variogram(pairwise)
+        system[:, k, k] = 0.0
+        try:
+            system_inv = np.linalg.inv(system)
+        except np.linalg.LinAlgError:
+            system_inv = np.linalg.pinv(system)
+
+        rhs = np.ones((len(inverse), k + 1))
+        rhs[:, :k] = variogram(distances[chunk])
+        weights = np.einsum("nij,nj->ni", system_inv[inverse], rhs)[:, :k]
+        surface[chunk] = (weights * values[indices[chunk]]).sum(axis=1)
+    return surface
@@ -0,0 +1,350 @@
+"""
+Map tiles (Mapbox Vector Tiles, see app.core.mvt) of the field, by zoom/x/y
+in the usual Web Mercator tiling. Layers:
+- wells: well heads, the first welltrack point of every well
+- welltracks: projected trajectories, one line per well
+- formation_thickness, effective_formation_thickness: the thickness points
+Features carry well_id (and name, or thickness and absolute_depth) as properties.
+
+Tiles are built lazily, one layer at a time, from an in-process copy of the
+layer in Web Mercator loaded once per dataset version, and written to
+TILE_CACHE_DIR/<layer>/<versions>/<z>/<x>/<y>.mvt. Ingests bump the dataset
+versions (see crud.dataset_versions), so the next request misses, builds the
+tile from the new data and the directories of older versions are deleted.
+
+Detail follows the zoom level: at most one point per POINT_SPACING tile
+units, line vertices rounded to whole tile units and repeats dropped, lines
+clipped to the tile plus BUFFER.
+"""
+import asyncio
+import math
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.core import mvt
+from app.core.config import settings
+
+MAX_ZOOM = 22
+
+# tile units around the tile still drawn, so symbols and lines crossing
+# the edge are not cut off
+BUFFER = 64
+# at most one point per POINT_SPACING square, (EXTENT / POINT_SPACING)^2 = 16384
+# points per tile; 4 px apart at 512 px per tile
+POINT_SPACING = 32
+
+MAX_LAT = 85.0511287798
+
+# layer -> dataset versions its tiles are built from; well names come from
+# curve (LAS) as well as welltrack ingests
+LAYERS: dict[str, tuple[str, ...]] = {
+    "wells": ("welltrack", "curve"),
+    "welltracks": ("welltrack", "curve"),
+    "formation_thickness": ("formation_thickness",),
+    "effective_formation_thickness": ("effective_formation_thickness",),
+}
+
+THICKNESS_STORES = {
+    "formation_thickness": crud.formation_thickness,
+    "effective_formation_thickness": crud.effective_formation_thickness,
+}
+
+# layer -> (versions key, source)
+_sources: dict[str, tuple[str, "PointSource | LineSource"]] = {}
+_source_locks: dict[str, asyncio.Lock] = {}
+
+
+def mercator(lat: np.ndarray, lon: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Web Mercator world coordinates in 0..1, y pointing south.
+    """
+    x = (np.asarray(lon) + 180.0) / 360.0
+    sin_lat = np.sin(np.radians(np.clip(lat, -MAX_LAT, MAX_LAT)))
+    y = 0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return x, y
+
+
+def _to_tile(values: np.ndarray, z: int, index: int) -> np.ndarray:
+    return (values * (1 << z) - index) * mvt.EXTENT
+
+
+@dataclass(frozen=True)
+class PointSource:
+    name: str
+    # world coordinates, sorted by x
+    x: np.ndarray
+    y: np.ndarray
+    ids: np.ndarray
+    properties: dict[str, np.ndarray]
+
+    @classmethod
+    def build(
+        cls,
+        name: str,
+        ids: np.ndarray,
+        lat: np.ndarray,
+        lon: np.ndarray,
+        properties: dict[str, np.ndarray],
+    ) -> "PointSource":
+        finite = np.isfinite(lat) & np.isfinite(lon)
+        x, y = mercator(lat[finite], lon[finite])
+        order = np.argsort(x, kind="stable")
+        return cls(
+            name=name,
+            x=x[order],
+            y=y[order],
+            ids=ids[finite][order],
+            properties={key: values[finite][order] for key, values in properties.items()},
+        )
+
+    def tile(self, z: int, x: int, y: int) -> bytes:
+        margin = BUFFER / mvt.EXTENT / (1 << z)
+        start, stop = np.searchsorted(self.x, [x / (1 << z) - margin, (x + 1) / (1 << z) + margin])
+        px = np.floor(_to_tile(self.x[start:stop], z, x)).astype(np.int64)
+        py = np.floor(_to_tile(self.y[start:stop], z, y)).astype(np.int64)
+        low, high = -BUFFER, mvt.EXTENT + BUFFER
+        inside = (px >= low) & (px <= high) & (py >= low) & (py <= high)
+        px, py = px[inside], py[inside]
+
+        # first point of every POINT_SPACING square, in x order
+        cells = (px + BUFFER) // POINT_SPACING * (mvt.EXTENT + 2 * BUFFER) + (py + BUFFER) // POINT_SPACING
+        _, kept = np.unique(cells, return_index=True)
+        kept.sort()
+        rows = start + np.flatnonzero(inside)[kept]
+        return mvt.layer(
+            self.name,
+            self.ids[rows],
+            mvt.POINT,
+            mvt.point_geometry(px[kept], py[kept]),
+            {key: values[rows] for key, values in self.properties.items()},
+        )
+
+
+@dataclass(frozen=True)
+class LineSource:
+    name: str
+    # vertices of line i are x/y[starts[i]:starts[i + 1]], world coordinates
+    x: np.ndarray
+    y: np.ndarray
+    starts: np.ndarray
+    ids: np.ndarray
+    properties: dict[str, np.ndarray]
+    # per line: min_x, max_x, min_y, max_y
+    bounds: np.ndarray
+
+    @classmethod
+    def build(
+        cls,
+        name: str,
+        line_ids: np.ndarray,
+        lat: np.ndarray,
+        lon: np.ndarray,
+        properties: dict[str, np.ndarray],
+    ) -> "LineSource":
+        """
+        `line_ids` of every vertex, vertices of a line contiguous and in order;
+        `properties` are per line, in the order of np.unique(line_ids).
+        """
+        finite = np.isfinite(lat) & np.isfinite(lon)
+        x, y = mercator(lat[finite], lon[finite])
+        ids, starts = np.unique(line_ids[finite], return_index=True)
+        starts = np.append(starts, len(x))
+        present = np.isin(np.unique(line_ids), ids)
+        bounds = np.empty((len(ids), 4))
+        if len(ids):
+            bounds[:, 0] = np.minimum.reduceat(x, starts[:-1])
+            bounds[:, 1] = np.maximum.reduceat(x, starts[:-1])
+            bounds[:, 2] = np.minimum.reduceat(y, starts[:-1])
+            bounds[:, 3] = np.maximum.reduceat(y, starts[:-1])
+        return cls(
+            name=name,
+            x=x,
+            y=y,
+            starts=starts,
+            ids=ids,
+            properties={key: values[present] for key, values in properties.items()},
+            bounds=bounds,
+        )
+
+    def tile(self, z: int, x: int, y: int) -> bytes:
+        margin = BUFFER / mvt.EXTENT / (1 << z)
+        x0, x1 = x / (1 << z) - margin, (x + 1) / (1 << z) + margin
+        y0, y1 = y / (1 << z) - margin, (y + 1) / (1 << z) + margin
+        min_x, max_x, min_y, max_y = self.bounds.T
+        candidates = np.flatnonzero((max_x >= x0) & (min_x <= x1) & (max_y >= y0) & (min_y <= y1))
+
+        if not len(candidates):
+            return b""
+
+        # vertices of all candidate lines, line i at line_starts[i]:line_starts[i + 1]
+        counts = self.starts[candidates + 1] - self.starts[candidates]
+        line_starts = np.concatenate([[0], np.cumsum(counts)])
+        index = np.arange(line_starts[-1]) + np.repeat(self.starts[candidates] - line_starts[:-1], counts)
+        vertices, part_starts, part_lines = _clip(
+            _to_tile(self.x[index], z, x), _to_tile(self.y[index], z, y), line_starts
+        )
+        lines, feature_parts = np.unique(part_lines, return_index=True)
+        lines = candidates[lines]
+        return mvt.layer(
+            self.name,
+            self.ids[lines],
+            mvt.LINESTRING,
+            mvt.line_geometry(vertices, part_starts, np.append(feature_parts, len(part_lines))),
+            {key: values[lines] for key, values in self.properties.items()},
+        )
+
+
+def _clip(
+    px: np.ndarray, py: np.ndarray, line_starts: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Runs of the polylines whose segments touch the buffered tile, vertices
+    rounded to tile units without repeats; runs that collapse to one vertex
+    are dropped. Returns the (V, 2) vertices, part starts into them and the
+    line of every part, parts of a line contiguous.
+    """
+    low, high = -BUFFER, mvt.EXTENT + BUFFER
+    # segment i joins vertex i and i + 1
+    touching = (
+        (np.maximum(px[:-1], px[1:]) >= low)
+        & (np.minimum(px[:-1], px[1:]) <= high)
+        & (np.maximum(py[:-1], py[1:]) >= low)
+        & (np.minimum(py[:-1], py[1:]) <= high)
+    )
+    touching[line_starts[1:-1] - 1] = False
+    kept = np.zeros(len(px), dtype=bool)
+    kept[:-1] |= touching
+    kept[1:] |= touching
+    part_firsts = np.flatnonzero(kept & ~np.append(False, touching))
+
+    vertices = np.column_stack([np.rint(px[kept]), np.rint(py[kept])]).astype(np.int64)
+    part_of = np.cumsum(kept & ~np.append(False, touching))[kept] - 1
+    repeat = np.append(False, (vertices[1:] == vertices[:-1]).all(axis=1) & (part_of[1:] == part_of[:-1]))
+    vertices, part_of = vertices[~repeat], part_of[~repeat]
+
+    sizes = np.bincount(part_of, minlength=len(part_firsts))
+    long_enough = sizes >= 2
+    vertices = vertices[long_enough[part_of]]
+    part_starts = np.concatenate([[0], np.cumsum(sizes[long_enough])])
+    part_lines = np.searchsorted(line_starts, part_firsts[long_enough], side="right") - 1
+    return vertices, part_starts, part_lines
+
+
+def _well_names(wells, well_ids: np.ndarray) -> np.ndarray:
+    names = {well.id: well.name for well in wells}
+    return np.array([names.get(well_id) for well_id in well_ids.tolist()], dtype=object)
+
+
+async def _load(db: AsyncSession, layer: str) -> PointSource | LineSource:
+    if layer in THICKNESS_STORES:
+        columns = await THICKNESS_STORES[layer].get_map_columns(db)
+        return await asyncio.to_thread(
+            PointSource.build,
+            layer,
+            columns["id"],
+            columns["lat"],
+            columns["lon"],
+            {key: columns[key] for key in ("well_id", "thickness", "absolute_depth")},
+        )
+
+    tracks = await crud.welltracks.get_map_columns(db)
+    wells = await crud.wells.get_multi(db)
+    finite = np.isfinite(tracks["lat"]) & np.isfinite(tracks["lon"])
+    if layer == "wells":
+        # rows come ordered by well, the first finite one of each is the head
+        well_ids, first = np.unique(tracks["well_id"][finite], return_index=True)
+        heads = np.flatnonzero(finite)[first]
+        return await asyncio.to_thread(
+            PointSource.build,
+            layer,
+            well_ids,
+            tracks["lat"][heads],
+            tracks["lon"][heads],
+            {"well_id": well_ids, "name": _well_names(wells, well_ids)},
+        )
+    well_ids = np.unique(tracks["well_id"])
+    return await asyncio.to_thread(
+        LineSource.build,
+        layer,
+        tracks["well_id"],
+        tracks["lat"],
+        tracks["lon"],
+        {"well_id": well_ids, "name": _well_names(wells, well_ids)},
+    )
+
+
+async def _get_source(db: AsyncSession, layer: str, versions: str) -> PointSource | LineSource:
+    cached = _sources.get(layer)
+    if cached is not None and cached[0] == versions:
+        return cached[1]
+
+    async with _source_locks.setdefault(layer, asyncio.Lock()):
+        cached = _sources.get(layer)
+        if cached is None or cached[0] != versions:
+            _sources[layer] = (versions, await _load(db, layer))
+            await asyncio.to_thread(_remove_old_versions, layer, versions)
+        return _sources[layer][1]
+
+
+def _tile_path(layer: str, versions: str, z: int, x: int, y: int) -> Path:
+    return Path(settings.TILE_CACHE_DIR) / layer / versions / str(z) / str(x) / f"{y}.mvt"
+
+
+def _read(path: Path) -> bytes | None:
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def _write(path: Path, data: bytes) -> None:
+    # written under a temporary name and renamed, a reader never sees half a tile
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _remove_old_versions(layer: str, versions: str) -> None:
+    """
+    Delete the tile directories of `layer` built from older dataset versions.
+    Versions only grow, so a directory with any newer version is kept: it
+    belongs to a request that read the versions after this one.
+    """
+    root = Path(settings.TILE_CACHE_DIR) / layer
+    if not root.is_dir():
+        return
+    current = [int(version) for version in versions.split("-")]
+    for directory in root.iterdir():
+        try:
+            other = [int(version) for version in directory.name.split("-")]
+        except ValueError:
+            continue
+        if other != current and len(other) == len(current) and all(o <= c for o, c in zip(other, current)):
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+async def get_tile(db: AsyncSession, z: int, x: int, y: int, layers: list[str]) -> bytes:
+    """
+    Tile z/x/y with `layers` (keys of LAYERS) in that order; empty layers are left out.
+    """
+    dataset_versions = await crud.dataset_versions.get_all(db)
+    parts = []
+    for layer in layers:
+        versions = "-".join(str(dataset_versions.get(name, 0)) for name in LAYERS[layer])
+        path = _tile_path(layer, versions, z, x, y)
+        data = await asyncio.to_thread(_read, path)
+        if data is None:
+            source = await _get_source(db, layer, versions)
+            data = await asyncio.to_thread(source.tile, z, x, y)
+            await asyncio.to_thread(_write, path, data)
+        parts.append(data)
+    return b"".join(parts)
@@ -6,6 +6,8 @@ from app.crud import (
     formation_thickness,
     interpolated_curves,
     effective_formation_thickness,
+    dataset_versions,
+    ingest_jobs,
 )
 
 __all__ = [
@@ -15,6 +17,8 @@ __all__ = [
     "formation_thickness",
     "interpolated_curves",
     "effective_formation_thickness",
+    "dataset_versions",
+    "ingest_jobs",
 ]
 
 
@@ -1,15 +1,36 @@
-from collections.abc import Iterable, Sequence
+from collections.abc import AsyncIterator, Iterable, Sequence
 
-from sqlalchemy import delete, select
+import numpy as np
+from sqlalchemy import SmallInteger, case, delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.crud.wells import bump_data_version
+from app.db import keyset
+from app.db.bulk import copy_records
+from app.db.columns import fetch_columns, float_column
 from app.models import Curve
 
+BULK_COLUMNS = ("well_id", "measured_depth", "type")
+
+# type in columnar form: 0 / 1, -1 for anything else ("" or NULL)
+TYPE_CODE = case((Curve.type == "0", 0), (Curve.type == "1", 1), else_=-1).cast(SmallInteger)
+
 
 async def get_multi(db: AsyncSession) -> Sequence[Curve]:
     result = await db.execute(select(Curve).order_by(Curve.id))
     return result.scalars().all()
 
+
+async def get_page(
+    db: AsyncSession, *, after_id: int | None = None, limit: int
+) -> Sequence[Curve]:
+    return await keyset.get_page(db, Curve, after_id=after_id, limit=limit)
+
+
+def stream_rows(db: AsyncSession, *, after_id: int | None = None) -> AsyncIterator[list[dict]]:
+    return keyset.stream_rows(db, Curve, after_id=after_id)
+
+
 async def get_by_well_id(db: AsyncSession, well_id: int) -> Sequence[Curve]:
     """
     Получает все записи WellTrack для заданного well_id.
@@ -20,13 +41,61 @@ async def get_by_well_id(db: AsyncSession, well_id: int) -> Sequence[Curve]:
     return result.scalars().all()
 
 
+async def get_columns_by_well_id(db: AsyncSession, well_id: int) -> dict[str, np.ndarray]:
+    """
+    Кривая скважины по колонкам: id, measured_depth (NaN вместо NULL), type (TYPE_CODE).
+    """
+    stmt = (
+        select(
+            Curve.id.label("id"),
+            float_column(Curve.measured_depth).label("measured_depth"),
+            TYPE_CODE.label("type"),
+        )
+        .where(Curve.well_id == well_id)
+        .order_by(Curve.id)
+    )
+    columns = await fetch_columns(db, stmt, {"id": ">i4", "measured_depth": ">f8", "type": ">i2"})
+    columns["type"] = columns["type"].astype(np.int8)
+    return columns
+
+
+async def delete_for_well(db: AsyncSession, *, well_id: int) -> None:
+    await db.execute(delete(Curve).where(Curve.well_id == well_id))
+    await bump_data_version(db, well_id=well_id)
+
+
+async def copy_rows(
+    db: AsyncSession,
+    *,
+    well_id: int,
+    rows: Iterable[tuple[float | None, str | None]],
+) -> int:
+    """
+    Пишет строки (measured_depth, type) для well_id через COPY, без ORM-объектов.
+    """
+    return await copy_records(
+        db,
+        Curve.__table__,
+        BULK_COLUMNS,
+        ((well_id, measured_depth, type_value) for measured_depth, type_value in rows),
+    )
+
+
 async def replace_for_well(
     db: AsyncSession,
     *,
     well_id: int,
     curves: Iterable[dict[str, object]],
+    bulk: bool = False,
 ) -> int:
-    await db.execute(delete(Curve).where(Curve.well_id == well_id))
+    await delete_for_well(db, well_id=well_id)
+
+    if bulk:
+        return await copy_rows(
+            db,
+            well_id=well_id,
+            rows=((c.get("measured_depth"), c.get("type")) for c in curves),
+        )
 
     count = 0
     for c in curves:
@@ -40,5 +109,3 @@ async def replace_for_well(
         count += 1
     await db.flush()
     return count
-
-
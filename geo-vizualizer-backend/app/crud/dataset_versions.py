@@ -0,0 +1,33 @@
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import DatasetVersion
+
+
+async def get(db: AsyncSession, *, name: str) -> int:
+    """
+    Текущая версия данных таблицы `name`, 0 если в неё ещё ничего не загружали.
+    """
+    version = await db.scalar(select(DatasetVersion.version).where(DatasetVersion.name == name))
+    return version or 0
+
+
+async def get_all(db: AsyncSession) -> dict[str, int]:
+    """
+    Текущие версии данных всех таблиц, в которые что-то загружали.
+    """
+    result = await db.execute(select(DatasetVersion.name, DatasetVersion.version))
+    return dict(result.all())
+
+
+async def bump(db: AsyncSession, *, name: str) -> None:
+    """
+    Увеличивает версию данных таблицы `name` (создаёт строку при первой загрузке).
+    """
+    stmt = insert(DatasetVersion).values(name=name, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DatasetVersion.name],
+        set_={"version": DatasetVersion.version + 1},
+    )
+    await db.execute(stmt)
@@ -1,16 +1,70 @@
-from collections.abc import Iterable, Sequence
+from collections.abc import AsyncIterator, Iterable, Sequence
 
+import numpy as np
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db import keyset
+from app.db.bulk import copy_records
+from app.db.columns import fetch_columns, float_column
 from app.models import FormationThickness
 
+BULK_COLUMNS = ("well_id", "lat", "lon", "absolute_depth", "thickness")
+MAP_FLOAT_COLUMNS = ("lat", "lon", "absolute_depth", "thickness")
+
 
 async def get_multi(db: AsyncSession) -> Sequence[FormationThickness]:
     result = await db.execute(select(FormationThickness).order_by(FormationThickness.id))
     return result.scalars().all()
 
 
+async def get_page(
+    db: AsyncSession, *, after_id: int | None = None, limit: int
+) -> Sequence[FormationThickness]:
+    return await keyset.get_page(db, FormationThickness, after_id=after_id, limit=limit)
+
+
+def stream_rows(db: AsyncSession, *, after_id: int | None = None) -> AsyncIterator[list[dict]]:
+    return keyset.stream_rows(db, FormationThickness, after_id=after_id)
+
+
+async def get_surface_columns(db: AsyncSession) -> dict[str, np.ndarray]:
+    """
+    Все точки по колонкам для построения поверхности: lat, lon, thickness (NaN вместо NULL).
+    """
+    stmt = select(
+        float_column(FormationThickness.lat).label("lat"),
+        float_column(FormationThickness.lon).label("lon"),
+        float_column(FormationThickness.thickness).label("thickness"),
+    )
+    return await fetch_columns(db, stmt, {"lat": ">f8", "lon": ">f8", "thickness": ">f8"})
+
+
+async def get_map_columns(db: AsyncSession) -> dict[str, np.ndarray]:
+    """
+    Все точки по колонкам для карты: id, well_id, lat, lon, absolute_depth, thickness (NaN вместо NULL).
+    """
+    stmt = select(
+        FormationThickness.id.label("id"),
+        FormationThickness.well_id.label("well_id"),
+        *(float_column(getattr(FormationThickness, name)).label(name) for name in MAP_FLOAT_COLUMNS),
+    ).order_by(FormationThickness.id)
+    return await fetch_columns(
+        db, stmt, {"id": ">i4", "well_id": ">i4", **{name: ">f8" for name in MAP_FLOAT_COLUMNS}}
+    )
+
+
+async def copy_rows(
+    db: AsyncSession,
+    *,
+    rows: Iterable[tuple[int, float | None, float | None, float | None, float | None]],
+) -> int:
+    """
+    Пишет строки (well_id, lat, lon, absolute_depth, thickness) через COPY, без ORM-объектов.
+    """
+    return await copy_records(db, FormationThickness.__table__, BULK_COLUMNS, rows)
+
+
 async def add_many(
     db: AsyncSession,
     *,
@@ -0,0 +1,193 @@
+from collections.abc import Sequence
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import IngestJob
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+async def create(
+    db: AsyncSession,
+    *,
+    kind: str,
+    file_name: str | None,
+    file_path: str,
+    idempotency_key: str | None = None,
+) -> IngestJob | None:
+    """
+    Ставит задачу в очередь (status = "queued").
+    None, если задача с таким idempotency_key уже есть, её можно взять через get_by_idempotency_key.
+    """
+    stmt = (
+        insert(IngestJob)
+        .values(kind=kind, status="queued", file_name=file_name, file_path=file_path, idempotency_key=idempotency_key)
+        .on_conflict_do_nothing(index_elements=[IngestJob.idempotency_key])
+        .returning(IngestJob)
+    )
+    job = await db.scalar(stmt)
+    await db.commit()
+    return job
+
+
+async def get(db: AsyncSession, *, job_id: int) -> IngestJob | None:
+    return await db.get(IngestJob, job_id)
+
+
+async def get_by_idempotency_key(db: AsyncSession, *, idempotency_key: str) -> IngestJob | None:
+    return await db.scalar(select(IngestJob).where(IngestJob.idempotency_key == idempotency_key))
+
+
+async def get_multi(db: AsyncSession, *, status: str | None = None, limit: int = 100) -> Sequence[IngestJob]:
+    """
+    Последние задачи, новые первыми; только со статусом `status`, если он задан.
+    """
+    stmt = select(IngestJob).order_by(IngestJob.id.desc()).limit(limit)
+    if status is not None:
+        stmt = stmt.where(IngestJob.status == status)
+    result = await db.execute(stmt)
+    return result.scalars().all()
+
+
+async def claim_next(db: AsyncSession, *, stale_after: float) -> IngestJob | None:
+    """
+    Забирает самую старую задачу из очереди и переводит её в "running".
+    Задачи "running" без heartbeat дольше stale_after секунд (воркер умер) забираются заново.
+    FOR UPDATE SKIP LOCKED: несколько воркеров (и процессов) не получат одну задачу.
+    """
+    next_id = (
+        select(IngestJob.id)
+        .where(
+            or_(
+                IngestJob.status == "queued",
+                and_(
+                    IngestJob.status == "running",
+                    IngestJob.heartbeat_at < func.now() - timedelta(seconds=stale_after),
+                ),
+            )
+        )
+        .order_by(IngestJob.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    stmt = (
+        update(IngestJob)
+        .where(IngestJob.id == next_id)
+        .values(
+            status="running",
+            started_at=func.now(),
+            heartbeat_at=func.now(),
+            attempts=IngestJob.attempts + 1,
+        )
+        .returning(IngestJob)
+        .execution_options(synchronize_session=False)
+    )
+    job = await db.scalar(stmt)
+    await db.commit()
+    return job
+
+
+async def heartbeat(db: AsyncSession, *, job_id: int) -> bool:
+    """
+    Отмечает, что задача ещё выполняется. Возвращает True, если запрошена её отмена.
+    """
+    stmt = (
+        update(IngestJob)
+        .where(IngestJob.id == job_id, IngestJob.status == "running")
+        .values(heartbeat_at=func.now())
+        .returning(IngestJob.cancel_requested)
+    )
+    cancel_requested = await db.scalar(stmt)
+    await db.commit()
+    return bool(cancel_requested)
+
+
+async def finish(
+    db: AsyncSession,
+    *,
+    job_id: int,
+    status: str,
+    result: dict[str, Any] | None = None,
+    error: str | None = None,
+) -> None:
+    """
+    Завершает задачу: status = "succeeded" | "failed" | "cancelled".
+    Только выполняющуюся: задача, уже отмеченная succeed в транзакции ingest'а, не меняется.
+    result=None оставляет прежний result (например, записанные члены архива, см. add_committed_member).
+    """
+    values: dict[str, Any] = {"status": status, "error": error, "finished_at": func.now()}
+    if result is not None:
+        values["result"] = result
+    stmt = update(IngestJob).where(IngestJob.id == job_id, IngestJob.status == "running").values(values)
+    await db.execute(stmt)
+    await db.commit()
+
+
+async def succeed(db: AsyncSession, *, job_id: int, result: dict[str, Any]) -> None:
+    """
+    Отмечает выполняющуюся задачу как "succeeded" без commit: вызывается в транзакции
+    ingest'а перед её commit, так что строки и статус задачи фиксируются вместе,
+    и задача с записанными строками не будет взята повторно.
+    """
+    stmt = (
+        update(IngestJob)
+        .where(IngestJob.id == job_id, IngestJob.status == "running")
+        .values(status="succeeded", result=result, finished_at=func.now())
+    )
+    await db.execute(stmt)
+
+
+async def add_committed_member(db: AsyncSession, *, job_id: int, name: str) -> None:
+    """
+    Добавляет член архива name в result["committed"] задачи без commit: вызывается
+    в транзакции члена перед её commit, так что список всегда совпадает с записанными строками.
+    Строка задачи блокируется (FOR UPDATE), параллельные члены дописывают по очереди.
+    """
+    result = await db.scalar(select(IngestJob.result).where(IngestJob.id == job_id).with_for_update())
+    result = dict(result or {})
+    result["committed"] = [*result.get("committed", []), name]
+    await db.execute(update(IngestJob).where(IngestJob.id == job_id).values(result=result))
+
+
+async def request_cancel(db: AsyncSession, *, job_id: int) -> IngestJob | None:
+    """
+    Отмена: задача из очереди сразу становится "cancelled", у выполняющейся
+    ставится cancel_requested, её воркер останавливается при следующем heartbeat.
+    None, если задачи нет или она уже завершена.
+    """
+    queued = IngestJob.status == "queued"
+    stmt = (
+        update(IngestJob)
+        .where(IngestJob.id == job_id, IngestJob.status.in_(ACTIVE_STATUSES))
+        .values(
+            cancel_requested=True,
+            status=case((queued, "cancelled"), else_=IngestJob.status),
+            finished_at=case((queued, func.now()), else_=IngestJob.finished_at),
+        )
+        .returning(IngestJob)
+        .execution_options(synchronize_session=False)
+    )
+    job = await db.scalar(stmt)
+    await db.commit()
+    return job
+
+
+async def requeue(db: AsyncSession, *, job_ids: Sequence[int]) -> None:
+    """
+    Возвращает выполнявшиеся задачи в очередь (остановка приложения),
+    прерванная попытка не засчитывается.
+    """
+    if not job_ids:
+        return
+    stmt = (
+        update(IngestJob)
+        .where(IngestJob.id.in_(job_ids), IngestJob.status == "running")
+        .values(status="queued", started_at=None, heartbeat_at=None, attempts=IngestJob.attempts - 1)
+    )
+    await db.execute(stmt)
+    await db.commit()
@@ -1,12 +1,22 @@
-from collections.abc import Iterable, Sequence
+from collections.abc import AsyncIterator, Iterable, Sequence
 
-from sqlalchemy import delete, select
+import numpy as np
+from sqlalchemy import ColumnElement, Text, delete, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.crud.curves import TYPE_CODE
+from app.db.bulk import copy_records
+from app.db.columns import fetch_columns, float_column
 from app.models import Curve
 from app.models import InterpolatedCurve 
 from app.schemas import curve_with_coords as curve_wc
 
+BULK_COLUMNS = ("curve_point_id", "lat", "lon", "absolute_depth")
+
+# wells per round trip when streaming grouped JSON
+JSON_STREAM_BATCH_SIZE = 50
+
 async def get_multi(db: AsyncSession):
     stmt = (
         select(
@@ -26,3 +36,110 @@ async def get_multi(db: AsyncSession):
         curve_wc.CurveWithCoords(**row._mapping)
         for row in result
     ]
+
+
+def point_filters(
+    *,
+    well_ids: Sequence[int] | None = None,
+    min_lat: float | None = None,
+    max_lat: float | None = None,
+    min_lon: float | None = None,
+    max_lon: float | None = None,
+) -> list[ColumnElement[bool]]:
+    """
+    Условия отбора точек: список скважин и/или прямоугольник по lat/lon (любая из границ).
+    """
+    conditions: list[ColumnElement[bool]] = []
+    if well_ids is not None:
+        conditions.append(Curve.well_id.in_(well_ids))
+    if min_lat is not None:
+        conditions.append(InterpolatedCurve.lat >= min_lat)
+    if max_lat is not None:
+        conditions.append(InterpolatedCurve.lat <= max_lat)
+    if min_lon is not None:
+        conditions.append(InterpolatedCurve.lon >= min_lon)
+    if max_lon is not None:
+        conditions.append(InterpolatedCurve.lon <= max_lon)
+    return conditions
+
+
+async def stream_json_by_well(
+    db: AsyncSession, *, filters: Sequence[ColumnElement[bool]] = ()
+) -> AsyncIterator[tuple[int, str]]:
+    """
+    (well_id, JSON-массив точек скважины) по возрастанию well_id.
+    JSON собирается в Postgres (json_agg), без объектов на каждую точку.
+    """
+    point = func.json_build_object(
+        "type", Curve.type,
+        "lat", InterpolatedCurve.lat,
+        "lon", InterpolatedCurve.lon,
+        "measured_depth", Curve.measured_depth,
+        "absolute_depth", InterpolatedCurve.absolute_depth,
+    )
+    stmt = (
+        select(Curve.well_id, func.json_agg(aggregate_order_by(point, Curve.id)).cast(Text))
+        .join(InterpolatedCurve, InterpolatedCurve.curve_point_id == Curve.id)
+        .where(*filters)
+        .group_by(Curve.well_id)
+        .order_by(Curve.well_id)
+        .execution_options(yield_per=JSON_STREAM_BATCH_SIZE)
+    )
+    result = await db.stream(stmt)
+    async for well_id, points in result:
+        yield well_id, points
+
+
+async def get_columns(
+    db: AsyncSession, *, filters: Sequence[ColumnElement[bool]] = ()
+) -> dict[str, np.ndarray]:
+    """
+    Все интерполированные точки по колонкам, по скважинам и id точки кривой:
+    well_id, type (TYPE_CODE), lat, lon, measured_depth, absolute_depth (NaN вместо NULL).
+    """
+    stmt = (
+        select(
+            Curve.well_id.label("well_id"),
+            TYPE_CODE.label("type"),
+            float_column(InterpolatedCurve.lat).label("lat"),
+            float_column(InterpolatedCurve.lon).label("lon"),
+            float_column(Curve.measured_depth).label("measured_depth"),
+            float_column(InterpolatedCurve.absolute_depth).label("absolute_depth"),
+        )
+        .join(InterpolatedCurve, InterpolatedCurve.curve_point_id == Curve.id)
+        .where(*filters)
+        .order_by(Curve.well_id, Curve.id)
+    )
+    columns = await fetch_columns(
+        db,
+        stmt,
+        {
+            "well_id": ">i4",
+            "type": ">i2",
+            "lat": ">f8",
+            "lon": ">f8",
+            "measured_depth": ">f8",
+            "absolute_depth": ">f8",
+        },
+    )
+    columns["type"] = columns["type"].astype(np.int8)
+    return columns
+
+
+async def delete_for_well(db: AsyncSession, *, well_id: int) -> None:
+    await db.execute(
+        delete(InterpolatedCurve).where(
+            InterpolatedCurve.curve_point_id.in_(select(Curve.id).where(Curve.well_id == well_id))
+        )
+    )
+
+
+async def copy_rows(
+    db: AsyncSession,
+    *,
+    rows: Iterable[tuple[int, float | None, float | None, float | None]],
+) -> int:
+    """
+    Пишет строки (curve_point_id, lat, lon, absolute_depth) через COPY, без ORM-объектов.
+    """
+    return await copy_records(db, InterpolatedCurve.__table__, BULK_COLUMNS, rows)
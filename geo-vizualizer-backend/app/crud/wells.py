@@ -1,10 +1,17 @@
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
+from itertools import islice
 
-from sqlalchemy import select
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Well
 
+# 4 bind parameters per row, keeps one statement far below the 32767 limit
+UPSERT_CHUNK_SIZE = 5_000
+# input kind -> column with the content hash of its stored rows
+HASH_COLUMNS = {"curve": "curve_hash", "welltrack": "welltrack_hash"}
+
 
 async def get_multi(db: AsyncSession) -> Sequence[Well]:
     result = await db.execute(select(Well).order_by(Well.id))
@@ -38,3 +45,98 @@ async def upsert(
     return obj
 
 
+async def upsert_many(
+    db: AsyncSession,
+    *,
+    wells: Iterable[dict[str, object]],
+) -> int:
+    """
+    Вставляет или обновляет набор скважин одним INSERT ... ON CONFLICT (id) DO UPDATE.
+    Ключи: id, name, start_measured_depth, end_measured_depth; без name новая
+    скважина получает WELL_<id>, без глубин сохраняются уже записанные
+    (в траекториях и мощностях глубин нет).
+    Повторные id схлопываются (побеждает последний). Возвращает число скважин.
+    """
+    rows: dict[int, dict[str, object]] = {}
+    for w in wells:
+        well_id = w["id"]
+        rows[well_id] = {
+            "id": well_id,
+            "name": w.get("name") or f"WELL_{well_id}",
+            "start_measured_depth": w.get("start_measured_depth"),
+            "end_measured_depth": w.get("end_measured_depth"),
+        }
+
+    values = iter(rows.values())
+    while chunk := list(islice(values, UPSERT_CHUNK_SIZE)):
+        stmt = insert(Well).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Well.id],
+            set_={
+                "name": stmt.excluded.name,
+                "start_measured_depth": func.coalesce(
+                    stmt.excluded.start_measured_depth, Well.start_measured_depth
+                ),
+                "end_measured_depth": func.coalesce(
+                    stmt.excluded.end_measured_depth, Well.end_measured_depth
+                ),
+            },
+        )
+        await db.execute(stmt)
+    return len(rows)
+
+
+async def bump_data_version(db: AsyncSession, *, well_id: int) -> None:
+    """
+    Помечает кривую/траекторию скважины изменёнными, следующая интерполяция её пересчитает.
+    """
+    await db.execute(
+        update(Well).where(Well.id == well_id).values(data_version=Well.data_version + 1)
+    )
+
+
+async def mark_interpolated(db: AsyncSession, *, well_id: int, data_version: int) -> None:
+    await db.execute(
+        update(Well).where(Well.id == well_id).values(interpolated_version=data_version)
+    )
+
+
+async def get_versions(
+    db: AsyncSession, well_ids: Sequence[int] | None = None
+) -> dict[int, tuple[int, int | None]]:
+    """
+    {well_id: (data_version, interpolated_version)} для well_ids (для всех скважин при None).
+    """
+    stmt = select(Well.id, Well.data_version, Well.interpolated_version)
+    if well_ids is not None:
+        stmt = stmt.where(Well.id.in_(well_ids))
+    result = await db.execute(stmt)
+    return {well_id: (data_version, interpolated) for well_id, data_version, interpolated in result}
+
+
+async def get_content_hashes(
+    db: AsyncSession, *, kind: str, well_ids: Sequence[int] | None = None
+) -> dict[int, tuple[str, str]]:
+    """
+    {well_id: (name, hash)} скважин с сохранённым хешем содержимого `kind`
+    ("curve" или "welltrack"), для well_ids (для всех таких скважин при None).
+    """
+    column = getattr(Well, HASH_COLUMNS[kind])
+    stmt = select(Well.id, Well.name, column).where(column.is_not(None))
+    if well_ids is not None:
+        stmt = stmt.where(Well.id.in_(well_ids))
+    result = await db.execute(stmt)
+    return {well_id: (name, content_hash) for well_id, name, content_hash in result}
+
+
+async def set_content_hashes(db: AsyncSession, *, kind: str, hashes: dict[int, str | None]) -> None:
+    """
+    Сохраняет хеш содержимого `kind` по id скважины; None его сбрасывает.
+    """
+    if not hashes:
+        return
+    # ORM bulk UPDATE by primary key, one executemany
+    column = HASH_COLUMNS[kind]
+    await db.execute(
+        update(Well), [{"id": well_id, column: content_hash} for well_id, content_hash in hashes.items()]
+    )
@@ -1,31 +1,112 @@
-from collections.abc import Iterable, Sequence
+from collections.abc import AsyncIterator, Iterable, Sequence
 
+import numpy as np
 from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.crud.wells import bump_data_version
+from app.db import keyset
+from app.db.bulk import copy_records
+from app.db.columns import fetch_columns, float_column
 from app.models import WellTrack
 
+BULK_COLUMNS = ("well_id", "lat", "lon", "absolute_depth", "measured_depth")
+FLOAT_COLUMNS = ("lat", "lon", "absolute_depth", "measured_depth")
+
 
 async def get_multi(db: AsyncSession) -> Sequence[WellTrack]:
     result = await db.execute(select(WellTrack).order_by(WellTrack.id))
     return result.scalars().all()
 
+
+async def get_page(
+    db: AsyncSession, *, after_id: int | None = None, limit: int
+) -> Sequence[WellTrack]:
+    return await keyset.get_page(db, WellTrack, after_id=after_id, limit=limit)
+
+
+def stream_rows(db: AsyncSession, *, after_id: int | None = None) -> AsyncIterator[list[dict]]:
+    return keyset.stream_rows(db, WellTrack, after_id=after_id)
+
+
 async def get_by_well_id(db: AsyncSession, well_id: int) -> Sequence[WellTrack]:
     """
     Получает все записи WellTrack для заданного well_id.
     """
     result = await db.execute(
-        select(WellTrack).where(WellTrack.id == well_id).order_by(WellTrack.id)
+        select(WellTrack).where(WellTrack.well_id == well_id).order_by(WellTrack.id)
     )
     return result.scalars().all()
 
+
+async def get_columns_by_well_id(db: AsyncSession, well_id: int) -> dict[str, np.ndarray]:
+    """
+    Траектория скважины по колонкам: id, lat, lon, absolute_depth, measured_depth (NaN вместо NULL).
+    """
+    stmt = (
+        select(
+            WellTrack.id.label("id"),
+            *(float_column(getattr(WellTrack, name)).label(name) for name in FLOAT_COLUMNS),
+        )
+        .where(WellTrack.well_id == well_id)
+        .order_by(WellTrack.id)
+    )
+    return await fetch_columns(db, stmt, {"id": ">i4", **{name: ">f8" for name in FLOAT_COLUMNS}})
+
+
+async def get_map_columns(db: AsyncSession) -> dict[str, np.ndarray]:
+    """
+    Все траектории по колонкам для карты: well_id, lat, lon (NaN вместо NULL),
+    по скважинам, точки каждой скважины в порядке загрузки.
+    """
+    stmt = select(
+        WellTrack.well_id.label("well_id"),
+        float_column(WellTrack.lat).label("lat"),
+        float_column(WellTrack.lon).label("lon"),
+    ).order_by(WellTrack.well_id, WellTrack.id)
+    return await fetch_columns(db, stmt, {"well_id": ">i4", "lat": ">f8", "lon": ">f8"})
+
+
+async def delete_for_well(db: AsyncSession, *, well_id: int) -> None:
+    await db.execute(delete(WellTrack).where(WellTrack.well_id == well_id))
+    await bump_data_version(db, well_id=well_id)
+
+
+async def copy_rows(
+    db: AsyncSession,
+    *,
+    well_id: int,
+    rows: Iterable[tuple[float | None, float | None, float | None, float | None]],
+) -> int:
+    """
+    Пишет строки (lat, lon, absolute_depth, measured_depth) для well_id через COPY, без ORM-объектов.
+    """
+    return await copy_records(
+        db,
+        WellTrack.__table__,
+        BULK_COLUMNS,
+        ((well_id, *row) for row in rows),
+    )
+
+
 async def replace_for_well(
     db: AsyncSession,
     *,
     well_id: int,
     tracks: Iterable[dict[str, object]],
+    bulk: bool = False,
 ) -> int:
-    await db.execute(delete(WellTrack).where(WellTrack.well_id == well_id))
+    await delete_for_well(db, well_id=well_id)
+
+    if bulk:
+        return await copy_rows(
+            db,
+            well_id=well_id,
+            rows=(
+                (t.get("lat"), t.get("lon"), t.get("absolute_depth"), t.get("measured_depth"))
+                for t in tracks
+            ),
+        )
 
     count = 0
     for t in tracks:
@@ -41,5 +122,3 @@ async def replace_for_well(
         count += 1
     await db.flush()
     return count
-
-
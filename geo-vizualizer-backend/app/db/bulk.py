@@ -0,0 +1,45 @@
+from collections.abc import Iterable, Sequence
+from itertools import islice
+
+from sqlalchemy import Table, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Rows per multi-row INSERT when binary COPY is not available
+EXECUTEMANY_CHUNK_SIZE = 5_000
+
+
+async def copy_records(
+    db: AsyncSession,
+    table: Table,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[object]],
+) -> int:
+    """
+    Write plain row tuples into `table` without creating ORM instances.
+    - asyncpg inside an open transaction: binary COPY on the session's own connection
+    - anything else: chunked multi-row INSERT (executemany)
+    Returns the number of written rows.
+    """
+    conn = await db.connection()
+
+    if conn.dialect.driver == "asyncpg":
+        raw = await conn.get_raw_connection()
+        driver_conn = raw.driver_connection
+        # COPY outside of the session transaction would be committed immediately
+        if driver_conn.is_in_transaction():
+            status = await driver_conn.copy_records_to_table(
+                table.name,
+                records=rows,
+                columns=list(columns),
+                schema_name=table.schema,
+            )
+            # status looks like "COPY 50000"
+            return int(status.rsplit(" ", 1)[-1])
+
+    stmt = insert(table)
+    rows_iter = iter(rows)
+    count = 0
+    while chunk := list(islice(rows_iter, EXECUTEMANY_CHUNK_SIZE)):
+        await conn.execute(stmt, [dict(zip(columns, row)) for row in chunk])
+        count += len(chunk)
+    return count
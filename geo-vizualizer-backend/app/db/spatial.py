@@ -0,0 +1,123 @@
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from sqlalchemy import Integer, any_, bindparam, func, literal_column, select, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.db.columns import fetch_columns, float_column
+
+EARTH_RADIUS_M = 6_371_008.8
+
+# SRID literal, not a bind parameter: the planner only uses the
+# expression indexes when the query repeats their expression exactly
+WGS84 = literal_column("4326")
+
+_postgis_available: bool | None = None
+
+
+@dataclass(frozen=True)
+class BBox:
+    min_lat: float
+    max_lat: float
+    min_lon: float
+    max_lon: float
+
+
+@dataclass(frozen=True)
+class Circle:
+    lat: float
+    lon: float
+    radius: float  # metres
+
+    def bbox(self) -> BBox:
+        """
+        Lat/lon box around the circle, the index prefilter for radius queries.
+        """
+        dlat = np.degrees(self.radius / EARTH_RADIUS_M)
+        cos_lat = np.cos(np.radians(self.lat))
+        dlon = 180.0 if cos_lat < 1e-9 else min(180.0, np.degrees(self.radius / (EARTH_RADIUS_M * cos_lat)))
+        return BBox(
+            min_lat=float(self.lat - dlat),
+            max_lat=float(self.lat + dlat),
+            min_lon=float(self.lon - dlon),
+            max_lon=float(self.lon + dlon),
+        )
+
+
+Area = BBox | Circle
+
+
+async def postgis_available(db: AsyncSession) -> bool:
+    """
+    Whether the postgis extension is installed, checked once per process.
+    """
+    global _postgis_available
+    if _postgis_available is None:
+        installed = await db.scalar(text("SELECT 1 FROM pg_extension WHERE extname = 'postgis'"))
+        _postgis_available = installed is not None
+    return _postgis_available
+
+
+def point_geometry(model: type[Any]) -> ColumnElement:
+    """
+    Point of a lat/lon row, the expression of the ix_<table>_geom GiST indexes.
+    """
+    return func.ST_SetSRID(func.ST_MakePoint(model.lon, model.lat), WGS84)
+
+
+def postgis_condition(model: type[Any], area: Area) -> ColumnElement[bool]:
+    """
+    Rows of `model` inside `area`: bounding-box && served by the GiST index,
+    then the exact spherical distance for circles.
+    """
+    box = area.bbox() if isinstance(area, Circle) else area
+    geometry = point_geometry(model)
+    condition = geometry.op("&&")(
+        func.ST_MakeEnvelope(box.min_lon, box.min_lat, box.max_lon, box.max_lat, WGS84)
+    )
+    if isinstance(area, Circle):
+        center = func.ST_SetSRID(func.ST_MakePoint(area.lon, area.lat), WGS84)
+        condition = condition & (func.ST_DistanceSphere(geometry, center) <= area.radius)
+    return condition
+
+
+async def get_points(db: AsyncSession, model: type[Any]) -> dict[str, np.ndarray]:
+    """
+    id, well_id, lat, lon (NaN for NULL) of every row of `model`, for the in-process index.
+    """
+    stmt = select(
+        model.id.label("id"),
+        model.well_id.label("well_id"),
+        float_column(model.lat).label("lat"),
+        float_column(model.lon).label("lon"),
+    )
+    return await fetch_columns(db, stmt, {"id": ">i4", "well_id": ">i4", "lat": ">f8", "lon": ">f8"})
+
+
+async def get_rows_by_ids(db: AsyncSession, model: type[Any], ids: Sequence[int]) -> list[dict[str, Any]]:
+    """
+    Rows of `model` with the given ids, ordered by id, as {column: value} dicts.
+    One array parameter instead of one bind parameter per id.
+    """
+    if not len(ids):
+        return []
+    ids_param = bindparam("ids", value=[int(i) for i in ids], type_=ARRAY(Integer))
+    stmt = select(*model.__table__.columns).where(model.id == any_(ids_param)).order_by(model.id)
+    result = await db.execute(stmt)
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
+
+
+def haversine(lat: np.ndarray, lon: np.ndarray, lat0: float, lon0: float) -> np.ndarray:
+    """
+    Great-circle distance in metres from (lat0, lon0) to every point.
+    """
+    phi, phi0 = np.radians(lat), np.radians(lat0)
+    dphi = phi - phi0
+    dlambda = np.radians(lon - lon0)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi) * np.cos(phi0) * np.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
@@ -6,6 +6,8 @@ from app.db.session import engine
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.executor import shutdown_parser_pool
+from app.core.service import ingest_jobs
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -33,6 +35,7 @@ app.add_middleware(
         "Accept",
         "Origin",
         "X-Requested-With",
+        "Idempotency-Key",
     ],
     expose_headers=["*"],  # Какие заголовки доступны клиенту
     max_age=600,  # Время кэширования preflight запросов в секундах
@@ -57,4 +60,10 @@ async def on_startup() -> None:
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+    ingest_jobs.start()
 
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    await ingest_jobs.stop()
+    shutdown_parser_pool()
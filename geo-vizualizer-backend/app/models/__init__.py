@@ -5,6 +5,8 @@ from app.models.curve import Curve
 from app.models.formation_thickness import FormationThickness
 from app.models.interpolated_curve import InterpolatedCurve
 from app.models.effective_formation_thickness import EffectiveFormationThickness
+from app.models.dataset_version import DatasetVersion
+from app.models.ingest_job import IngestJob
 
 __all__ = [
     "Item",
@@ -14,6 +16,8 @@ __all__ = [
     "FormationThickness",
     "InterpolatedCurve",
     "EffectiveFormationThickness",
+    "DatasetVersion",
+    "IngestJob",
 ]
 
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Float, ForeignKey, Integer, String
+from sqlalchemy import Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -6,6 +6,15 @@ from app.db.base import Base
 
 class Curve(Base):
     __tablename__ = "curve"
+    # per-well reads, deletes and interpolation lookups by measured_depth
+    __table_args__ = (
+        Index(
+            "ix_curve_well_id_measured_depth",
+            "well_id",
+            "measured_depth",
+            postgresql_include=["id", "type"],
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     well_id: Mapped[int] = mapped_column(ForeignKey("well.id", ondelete="CASCADE"), nullable=False)
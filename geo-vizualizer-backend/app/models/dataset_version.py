@@ -0,0 +1,12 @@
+from sqlalchemy import Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class DatasetVersion(Base):
+    __tablename__ = "dataset_version"
+
+    # table name; the row is bumped after every committed ingest into that table
+    name: Mapped[str] = mapped_column(String(length=64), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
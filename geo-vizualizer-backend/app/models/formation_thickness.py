@@ -8,7 +8,9 @@ class FormationThickness(Base):
     __tablename__ = "formation_thickness"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    well_id: Mapped[int] = mapped_column(ForeignKey("well.id", ondelete="CASCADE"), nullable=False)
+    well_id: Mapped[int] = mapped_column(
+        ForeignKey("well.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     lat: Mapped[float | None] = mapped_column(Float, nullable=True)
     lon: Mapped[float | None] = mapped_column(Float, nullable=True)
     absolute_depth: Mapped[float | None] = mapped_column(Float, nullable=True)
@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Boolean, DateTime, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class IngestJob(Base):
+    __tablename__ = "ingest_job"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    # curve | welltrack | formation_thickness | effective_formation_thickness | archive
+    kind: Mapped[str] = mapped_column(String(length=32), nullable=False)
+    # queued -> running -> succeeded | failed | cancelled
+    status: Mapped[str] = mapped_column(String(length=16), nullable=False, index=True, default="queued")
+    file_name: Mapped[str | None] = mapped_column(String(length=255), nullable=True)
+    # uploaded file in JOB_SPOOL_DIR, removed once the job is finished
+    file_path: Mapped[str] = mapped_column(String(length=1024), nullable=False)
+    # client supplied Idempotency-Key, a retried upload gets the existing job
+    idempotency_key: Mapped[str | None] = mapped_column(String(length=255), nullable=True, unique=True)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default="false")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # converter summary (row counts) of a succeeded job; for an archive job
+    # {"committed": [member names]} while it runs or once cancelled / failed
+    result: Mapped[dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # refreshed by the worker while running; a stale one means the worker died
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -8,7 +8,9 @@ class InterpolatedCurve(Base):
     __tablename__ = "interpolated_curve"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    curve_point_id: Mapped[int] = mapped_column(ForeignKey("curve.id", ondelete="CASCADE"), nullable=False)
+    curve_point_id: Mapped[int] = mapped_column(
+        ForeignKey("curve.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     lat: Mapped[float | None] = mapped_column(Float, nullable=True)
     lon: Mapped[float | None] = mapped_column(Float, nullable=True)
     absolute_depth: Mapped[float | None] = mapped_column(Float, nullable=True)
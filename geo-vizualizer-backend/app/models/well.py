@@ -11,6 +11,14 @@ class Well(Base):
     name: Mapped[str] = mapped_column(String(length=255), nullable=False)
     start_measured_depth: Mapped[float | None] = mapped_column(Float, nullable=True)
     end_measured_depth: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # bumped whenever curve or welltrack rows of the well are replaced
+    data_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    # data_version the stored interpolated_curve rows were computed from, None if never
+    interpolated_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # sha256 of the well file / of the welltrack rows the stored rows came from,
+    # None if unknown; unchanged re-uploads are skipped (see Converter)
+    curve_hash: Mapped[str | None] = mapped_column(String(length=64), nullable=True)
+    welltrack_hash: Mapped[str | None] = mapped_column(String(length=64), nullable=True)
 
     tracks = relationship("WellTrack", back_populates="well", cascade="all, delete-orphan")
     curves = relationship("Curve", back_populates="well", cascade="all, delete-orphan")
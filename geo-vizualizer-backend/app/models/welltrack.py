@@ -1,4 +1,4 @@
-from sqlalchemy import Float, ForeignKey, Integer
+from sqlalchemy import Float, ForeignKey, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -6,6 +6,15 @@ from app.db.base import Base
 
 class WellTrack(Base):
     __tablename__ = "welltrack"
+    # nearest track points by measured_depth in the interpolation query
+    __table_args__ = (
+        Index(
+            "ix_welltrack_well_id_measured_depth",
+            "well_id",
+            "measured_depth",
+            postgresql_include=["lat", "lon", "absolute_depth"],
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     well_id: Mapped[int] = mapped_column(ForeignKey("well.id", ondelete="CASCADE"), nullable=False)
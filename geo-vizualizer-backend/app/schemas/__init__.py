@@ -3,6 +3,7 @@ from app.schemas.welltrack import WellTrack
 from app.schemas.curve import Curve
 from app.schemas.formation_thickness import FormationThickness
 from app.schemas.effective_formation_thickness import EffectiveFormationThickness
+from app.schemas.ingest_job import IngestJob
 
 __all__ = [
     "Well",
@@ -10,5 +11,6 @@ __all__ = [
     "Curve",
     "FormationThickness",
     "EffectiveFormationThickness",
+    "IngestJob",
 ]
 
@@ -0,0 +1,90 @@
+"""
+Compare two benchmarks.suite reports, e.g. of the base and the head commit.
+
+For every phase in both reports, prints each metric of METRICS as
+{"base", "head", "change_pct"} and lists the regressions: throughput down or
+time / latency / memory up by more than --threshold percent.
+Reports of different specs (scale, seed) are refused, their numbers do not compare.
+
+Usage:
+    python -m benchmarks.compare base.json head.json --threshold 10 --fail-on-regression
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+# metric -> True when higher is better
+METRICS = {
+    "seconds": False,
+    "rows_per_second": True,
+    "requests_per_second": True,
+    "first_ms": False,
+    "latency.p50_ms": False,
+    "latency.p95_ms": False,
+    "latency.p99_ms": False,
+    "peak_rss_mb": False,
+    "workers_peak_rss_mb": False,
+}
+
+
+def _metric(phase: dict[str, Any], name: str) -> float | None:
+    value: Any = phase
+    for key in name.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value if isinstance(value, (int, float)) else None
+
+
+def compare(base: dict[str, Any], head: dict[str, Any], *, threshold: float) -> dict[str, Any]:
+    if base["spec"] != head["spec"]:
+        raise ValueError(f"Reports have different specs: {base['spec']} vs {head['spec']}")
+
+    phases: dict[str, Any] = {}
+    regressions: list[str] = []
+    for phase_name, base_phase in base["phases"].items():
+        head_phase = head["phases"].get(phase_name)
+        if head_phase is None:
+            continue
+        metrics = {}
+        for metric, higher_is_better in METRICS.items():
+            before, after = _metric(base_phase, metric), _metric(head_phase, metric)
+            if before is None or after is None:
+                continue
+            change = round((after - before) / before * 100, 1) if before else None
+            metrics[metric] = {"base": before, "head": after, "change_pct": change}
+            if change is not None and (-change if higher_is_better else change) > threshold:
+                regressions.append(f"{phase_name} {metric} {change:+}%")
+        phases[phase_name] = metrics
+
+    return {
+        "base": base["meta"].get("commit"),
+        "head": head["meta"].get("commit"),
+        "threshold_pct": threshold,
+        "phases": phases,
+        "regressions": regressions,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base", type=Path)
+    parser.add_argument("head", type=Path)
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with 1 on any regression")
+    args = parser.parse_args()
+
+    result = compare(
+        json.loads(args.base.read_text(encoding="utf-8")),
+        json.loads(args.head.read_text(encoding="utf-8")),
+        threshold=args.threshold,
+    )
+    print(json.dumps(result, indent=2))
+    if args.fail_on_regression and result["regressions"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Query plans of the per-well hot queries without and with the well_id/measured_depth indexes.
+
+Seeds a synthetic dataset into a separate schema (--schema, dropped afterwards
+unless --keep) with the app's tables, then runs EXPLAIN for every query twice,
+each time in a transaction that is rolled back:
+- "before": the WORKLOAD_INDEXES dropped, i.e. the initial migration's schema
+- "after": the WORKLOAD_INDEXES present, as created by migration 8d2b4f6a1c07
+and prints the planner's total cost and the scan nodes per query as JSON.
+
+--analyze adds actual execution times (EXPLAIN ANALYZE, statements run in a
+rolled-back savepoint). On the full dataset the "before" deletes and the
+interpolation query scan whole tables per row and take very long with it.
+
+Usage (settings/env as for the API; DDL locks only the benchmark schema):
+    python -m benchmarks.query_plans --curve-rows 10000000 --wells 1000
+"""
+import argparse
+import asyncio
+import json
+from typing import Any
+
+from sqlalchemy import Float, Integer, bindparam, delete, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlalchemy.schema import CreateIndex, DropIndex
+
+from app.core.config import settings
+from app.core.service import curve_interpolator
+from app.db.base import Base
+from app.models import Curve, EffectiveFormationThickness, FormationThickness, InterpolatedCurve, WellTrack
+
+WORKLOAD_INDEXES = [
+    index
+    for model in (Curve, WellTrack, InterpolatedCurve, FormationThickness, EffectiveFormationThickness)
+    for index in model.__table__.indexes
+    if index.name.endswith(("_well_id", "_well_id_measured_depth", "_curve_point_id"))
+]
+
+
+def workload_queries(well_id: int) -> dict[str, Any]:
+    """
+    The statements behind crud / curve_interpolator for one well.
+    """
+    return {
+        "curves.get_by_well_id": select(Curve).where(Curve.well_id == well_id).order_by(Curve.id),
+        "welltracks.get_by_well_id": (
+            select(WellTrack).where(WellTrack.well_id == well_id).order_by(WellTrack.id)
+        ),
+        "curves.delete_for_well": delete(Curve).where(Curve.well_id == well_id),
+        "welltracks.delete_for_well": delete(WellTrack).where(WellTrack.well_id == well_id),
+        "interpolated_curves.delete_for_well": delete(InterpolatedCurve).where(
+            InterpolatedCurve.curve_point_id.in_(select(Curve.id).where(Curve.well_id == well_id))
+        ),
+        "interpolator.sql_engine": curve_interpolator.query.bindparams(well_id=well_id),
+        "interpolator.numpy_track_load": (
+            select(WellTrack.measured_depth, WellTrack.lat, WellTrack.lon, WellTrack.absolute_depth)
+            .where(WellTrack.well_id == well_id, WellTrack.measured_depth.is_not(None))
+            .order_by(WellTrack.measured_depth)
+        ),
+        "interpolated_curves.join": (
+            select(
+                Curve.id,
+                Curve.type,
+                Curve.measured_depth,
+                InterpolatedCurve.lat,
+                InterpolatedCurve.lon,
+                InterpolatedCurve.absolute_depth,
+            )
+            .join(InterpolatedCurve, InterpolatedCurve.curve_point_id == Curve.id)
+            .where(Curve.well_id == well_id)
+        ),
+    }
+
+
+async def seed(conn: AsyncConnection, *, wells: int, curve_rows: int, track_rows: int) -> None:
+    """
+    Rows are written well by well, as the converter's COPY does.
+    """
+    params = {
+        "wells": wells,
+        "per_well": curve_rows // wells,
+        "track_rows": track_rows,
+        "step": (curve_rows // wells) * 0.1 / max(track_rows - 1, 1),
+    }
+    statements = [
+        "INSERT INTO well (id, name) SELECT g, 'WELL_' || g FROM generate_series(1, :wells) g",
+        """
+        INSERT INTO curve (well_id, measured_depth, type)
+        SELECT 1 + g / :per_well, 1000 + (g % :per_well) * 0.1, ((g / 500) % 2)::text
+        FROM generate_series(0, :per_well * :wells - 1) g
+        """,
+        """
+        INSERT INTO welltrack (well_id, lat, lon, absolute_depth, measured_depth)
+        SELECT 1 + g / :track_rows,
+               55 + (g / :track_rows) * 0.001 + (g % :track_rows) * 0.00001,
+               37 + (g % :track_rows) * 0.00001,
+               -1000 - (g % :track_rows) * :step,
+               1000 + (g % :track_rows) * :step
+        FROM generate_series(0, :track_rows * :wells - 1) g
+        """,
+        """
+        INSERT INTO interpolated_curve (curve_point_id, lat, lon, absolute_depth)
+        SELECT id, 55.0, 37.0, -measured_depth FROM curve
+        """,
+    ]
+    for sql in statements:
+        # typed binds are sent with casts, asyncpg cannot infer bare parameters in arithmetic
+        used = {key: value for key, value in params.items() if f":{key}" in sql}
+        stmt = text(sql).bindparams(
+            *(bindparam(key, type_=Float if key == "step" else Integer) for key in used)
+        )
+        await conn.execute(stmt, used)
+
+
+def plan_summary(plan: dict[str, Any]) -> dict[str, Any]:
+    nodes: list[str] = []
+
+    def walk(node: dict[str, Any]) -> None:
+        if "Relation Name" in node:
+            label = f"{node['Node Type']} on {node['Relation Name']}"
+            if "Index Name" in node:
+                label += f" using {node['Index Name']}"
+            nodes.append(label)
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan["Plan"])
+    summary = {"total_cost": plan["Plan"]["Total Cost"], "scans": nodes}
+    if "Execution Time" in plan:
+        summary["execution_ms"] = round(plan["Execution Time"], 3)
+        # FK cascades (curve -> interpolated_curve) only show up as trigger time
+        summary["trigger_ms"] = round(sum(t["Time"] for t in plan.get("Triggers", [])), 3)
+    return summary
+
+
+async def explain_all(
+    conn: AsyncConnection, queries: dict[str, Any], *, with_indexes: bool, analyze: bool
+) -> dict[str, Any]:
+    results = {}
+    async with conn.begin() as transaction:
+        for index in WORKLOAD_INDEXES:
+            ddl = CreateIndex(index, if_not_exists=True) if with_indexes else DropIndex(index, if_exists=True)
+            await conn.execute(ddl)
+        await conn.execute(text("ANALYZE"))
+
+        options = "FORMAT JSON, ANALYZE, BUFFERS" if analyze else "FORMAT JSON"
+        for name, stmt in queries.items():
+            sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+            async with conn.begin_nested() as savepoint:
+                raw = await conn.scalar(text(f"EXPLAIN ({options}) {sql}"))
+                await savepoint.rollback()
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+            results[name] = plan_summary(plan)
+        await transaction.rollback()
+    return results
+
+
+async def run(args: argparse.Namespace) -> dict:
+    engine = create_async_engine(
+        settings.DATABASE_URL,
+        poolclass=NullPool,
+        connect_args={"server_settings": {"search_path": args.schema}},
+    )
+    try:
+        async with engine.connect() as conn:
+            async with conn.begin():
+                await conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {args.schema}"))
+                await conn.run_sync(Base.metadata.create_all)
+                seeded = not await conn.scalar(select(Curve.id).limit(1))
+                if seeded:
+                    await seed(conn, wells=args.wells, curve_rows=args.curve_rows, track_rows=args.track_rows)
+            if seeded:
+                # sets the visibility map, index-only scans are not possible before
+                async with engine.connect() as vacuum_conn:
+                    await vacuum_conn.execution_options(isolation_level="AUTOCOMMIT")
+                    await vacuum_conn.execute(text("VACUUM"))
+
+            queries = workload_queries(well_id=max(1, args.wells // 2))
+            before = await explain_all(conn, queries, with_indexes=False, analyze=args.analyze)
+            after = await explain_all(conn, queries, with_indexes=True, analyze=args.analyze)
+
+            if not args.keep:
+                async with conn.begin():
+                    await conn.execute(text(f"DROP SCHEMA {args.schema} CASCADE"))
+    finally:
+        await engine.dispose()
+
+    return {
+        "wells": args.wells,
+        "curve_rows": args.curve_rows,
+        "track_rows_per_well": args.track_rows,
+        "queries": {name: {"before": before[name], "after": after[name]} for name in queries},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--curve-rows", type=int, default=10_000_000)
+    parser.add_argument("--wells", type=int, default=1_000)
+    parser.add_argument("--track-rows", type=int, default=200, help="welltrack rows per well")
+    parser.add_argument("--schema", default="query_plans_bench")
+    parser.add_argument("--analyze", action="store_true", help="also execute the statements (EXPLAIN ANALYZE)")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded schema for the next run")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Measurements shared by the benchmarks and the JSON they are reported in:
+latency percentiles, throughput, peak RSS, and run metadata (commit, machine)
+so reports of different commits can be compared with benchmarks.compare.
+
+Peak RSS is the kernel's high-water mark (VmHWM): reset_peak_rss() resets it
+through /proc/<pid>/clear_refs, so every phase reports its own peak. Parser
+pool workers are separate processes and reported separately. Where /proc is
+missing (macOS) the whole-run getrusage maximum is reported instead.
+"""
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+REPORT_VERSION = 1
+
+
+def percentiles(latencies: Sequence[float]) -> dict[str, float]:
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def _status_kb(pid: int | str, field: str) -> int | None:
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def reset_peak_rss() -> None:
+    for pid in ["self", *(child.pid for child in multiprocessing.active_children())]:
+        try:
+            with open(f"/proc/{pid}/clear_refs", "w", encoding="ascii") as f:
+                f.write("5")
+        except OSError:
+            pass
+
+
+def peak_rss_mb() -> float:
+    kb = _status_kb("self", "VmHWM")
+    if kb is None:
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # bytes on macOS, KiB elsewhere
+        kb = maxrss // 1024 if sys.platform == "darwin" else maxrss
+    return round(kb / 1024, 1)
+
+
+def workers_peak_rss_mb() -> float:
+    """
+    Sum of the peaks of the live child processes (the parser pool).
+    """
+    peaks = (_status_kb(child.pid, "VmHWM") for child in multiprocessing.active_children())
+    return round(sum(kb for kb in peaks if kb) / 1024, 1)
+
+
+async def measure(run: Callable[[], Awaitable[dict[str, Any]]], *, rows: str | None = None) -> dict[str, Any]:
+    """
+    Run one phase and add seconds, peak RSS and, when the result has a `rows`
+    count, rows_per_second.
+    """
+    reset_peak_rss()
+    started = time.perf_counter()
+    result = await run()
+    seconds = time.perf_counter() - started
+    measured = {**result, "seconds": round(seconds, 3)}
+    if rows is not None and seconds > 0:
+        measured["rows_per_second"] = round(result[rows] / seconds)
+    measured["peak_rss_mb"] = peak_rss_mb()
+    measured["workers_peak_rss_mb"] = workers_peak_rss_mb()
+    return measured
+
+
+def _git(*args: str) -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", *args], capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def metadata() -> dict[str, Any]:
+    return {
+        "report_version": REPORT_VERSION,
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write(report: dict[str, Any], path: Path | None) -> None:
+    text = json.dumps(report, indent=2)
+    if path is None:
+        print(text)
+    else:
+        path.write_text(text + "\n", encoding="utf-8")
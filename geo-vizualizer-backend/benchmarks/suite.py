@@ -0,0 +1,212 @@
+"""
+End-to-end benchmark: ingest, interpolation and the main read endpoints on a
+synthetic field (see benchmarks.synthetic), reported as one JSON document.
+
+The API runs in this process (httpx ASGITransport, startup/shutdown included)
+against the configured Postgres, so a phase's peak RSS is the server's.
+Phases, in order:
+- generate: writing the synthetic files (not API work, for reference)
+- ingest_las: POST /files/convert for every LAS file, --concurrency at a time
+- ingest_welltrack, ingest_formation_thickness, ingest_effective_formation_thickness:
+  one POST of the whole file each
+- interpolate: POST /interpolation/interpolate; the benchmark wells were just
+  ingested, so all of them are interpolated (with any other out-of-date well)
+- read.<name>: --requests GETs per endpoint in READS, rotating over the
+  benchmark wells; the first request of each meets cold caches
+Every phase reports seconds, peak RSS and throughput (rows or requests per
+second), plus latency percentiles where it makes several requests.
+
+The benchmark wells (ids from --well-id-offset) are deleted before and after
+the run, unless --keep.
+
+Usage (settings/env as for the API, requires httpx):
+    python -m benchmarks.suite --wells 200 --samples 20000 --out report.json
+    python -m benchmarks.compare base.json report.json
+"""
+import argparse
+import asyncio
+import math
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+import httpx
+from sqlalchemy import delete
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.main import app
+from app.models import Well
+from benchmarks import report, synthetic
+from benchmarks.synthetic import FieldSpec
+
+PACKED = {"Accept": "application/vnd.geo-viz.columns"}
+TILE_ZOOM = 14
+
+
+def _tile(lat: float, lon: float, z: int) -> tuple[int, int]:
+    n = 1 << z
+    y = (1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n
+    return int((lon + 180) / 360 * n), int(y)
+
+
+def reads(spec: FieldSpec) -> dict[str, Callable[[int], tuple[str, dict[str, str]]]]:
+    """
+    name -> request i -> (path with query, headers).
+    """
+    well_ids = list(spec.well_ids)
+    min_lat, max_lat, min_lon, max_lon = spec.bbox
+    field = f"min_lat={min_lat}&max_lat={max_lat}&min_lon={min_lon}&max_lon={max_lon}"
+
+    def well(i: int) -> int:
+        return well_ids[i % len(well_ids)]
+
+    def head(i: int) -> tuple[float, float]:
+        return synthetic.well_head(spec, well(i))
+
+    return {
+        "wells": lambda i: ("/entities/wells", {}),
+        "well_welltrack": lambda i: (f"/entities/wells/{well(i)}/welltrack", {}),
+        "well_curve": lambda i: (f"/entities/wells/{well(i)}/curve", {}),
+        "well_curve_packed": lambda i: (f"/entities/wells/{well(i)}/curve", PACKED),
+        "well_curve_lod": lambda i: (f"/entities/wells/{well(i)}/curve?max_points=500", {}),
+        "interpolated_well": lambda i: (f"/interpolation/interpolate/wells?well_ids={well(i)}", {}),
+        "interpolated_field_lod": lambda i: (f"/interpolation/interpolate/wells?{field}&max_points=200", {}),
+        "spatial_radius": lambda i: (
+            f"/spatial/welltracks?lat={head(i)[0]}&lon={head(i)[1]}&radius=300",
+            {},
+        ),
+        "surface": lambda i: (f"/interpolation/surface/formation-thickness?{field}", {}),
+        "tiles": lambda i: ("/tiles/{}/{}/{}".format(TILE_ZOOM, *_tile(*head(i), TILE_ZOOM)), {}),
+    }
+
+
+async def delete_wells(spec: FieldSpec) -> None:
+    async with AsyncSessionLocal() as db:
+        # curves, tracks, thickness and interpolated rows go with ON DELETE CASCADE
+        await db.execute(delete(Well).where(Well.id.between(spec.well_ids[0], spec.well_ids[-1])))
+        await db.commit()
+
+
+async def post_file(client: httpx.AsyncClient, path: str, file: Path) -> dict[str, Any]:
+    with open(file, "rb") as f:
+        response = await client.post(path, files={"file": (file.name, f)})
+    response.raise_for_status()
+    return response.json()
+
+
+async def ingest_las(client: httpx.AsyncClient, files: list[Path], concurrency: int) -> dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one(file: Path) -> int:
+        async with semaphore:
+            started = time.perf_counter()
+            result = await post_file(client, "/files/convert", file)
+            latencies.append(time.perf_counter() - started)
+            return result["curves_saved"]
+
+    rows = await asyncio.gather(*(one(file) for file in files))
+    return {"files": len(files), "rows": sum(rows), "latency": report.percentiles(latencies)}
+
+
+async def interpolate(client: httpx.AsyncClient, engine: str) -> dict[str, Any]:
+    response = await client.post("/interpolation/interpolate", params={"engine": engine})
+    response.raise_for_status()
+    result = response.json()
+    return {
+        "wells": result["wells_succeeded"],
+        "wells_failed": result["wells_failed"],
+        "rows": result["rows_saved"],
+        "per_well": report.percentiles([well["seconds"] for well in result["wells"]]),
+    }
+
+
+async def read(
+    client: httpx.AsyncClient, request: Callable[[int], tuple[str, dict[str, str]]], count: int
+) -> dict[str, Any]:
+    latencies: list[float] = []
+    size = 0
+    for i in range(count):
+        path, headers = request(i)
+        started = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        latencies.append(time.perf_counter() - started)
+        response.raise_for_status()
+        size += len(response.content)
+    return {
+        "requests": count,
+        "first_ms": round(latencies[0] * 1000, 2),
+        "latency": report.percentiles(latencies),
+        "mean_bytes": round(size / count),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    spec = synthetic.spec_from_arguments(args)
+    phases: dict[str, Any] = {}
+
+    with tempfile.TemporaryDirectory(prefix="geo-viz-bench-") as tmp:
+        started = time.perf_counter()
+        files = synthetic.generate(Path(tmp), spec)
+        phases["generate"] = {"seconds": round(time.perf_counter() - started, 3)}
+
+        transport = httpx.ASGITransport(app=app)
+        async with app.router.lifespan_context(app), httpx.AsyncClient(
+            transport=transport, base_url=f"http://benchmark{settings.API_V1_STR}", timeout=None
+        ) as client:
+            await delete_wells(spec)
+
+            phases["ingest_las"] = await report.measure(
+                lambda: ingest_las(client, files.las, args.concurrency), rows="rows"
+            )
+            for name, path, file in (
+                ("ingest_welltrack", "/files/convert/welltrack", files.welltrack),
+                ("ingest_formation_thickness", "/files/convert/formation-thickness", files.formation_thickness),
+                (
+                    "ingest_effective_formation_thickness",
+                    "/files/convert/effective-formation-thickness",
+                    files.effective_formation_thickness,
+                ),
+            ):
+                phases[name] = await report.measure(
+                    lambda: _rows_saved(post_file(client, path, file)), rows="rows"
+                )
+            phases["interpolate"] = await report.measure(lambda: interpolate(client, args.engine), rows="rows")
+
+            for name, request in reads(spec).items():
+                if args.reads and name not in args.reads:
+                    continue
+                result = await report.measure(lambda: read(client, request, args.requests))
+                result["requests_per_second"] = round(result["requests"] / result["seconds"], 1)
+                phases[f"read.{name}"] = result
+
+            if not args.keep:
+                await delete_wells(spec)
+
+    return {"meta": report.metadata(), "spec": asdict(spec), "phases": phases}
+
+
+async def _rows_saved(post) -> dict[str, Any]:
+    return {"rows": (await post)["rows_saved"]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    synthetic.add_spec_arguments(parser)
+    parser.add_argument("--concurrency", type=int, default=4, help="LAS uploads at once")
+    parser.add_argument("--engine", choices=["numpy", "sql"], default="numpy")
+    parser.add_argument("--requests", type=int, default=50, help="GETs per read endpoint")
+    parser.add_argument("--reads", nargs="+", help="only these read endpoints (names as in the report)")
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark wells in the database")
+    parser.add_argument("--out", type=Path, help="write the report here instead of stdout")
+    args = parser.parse_args()
+
+    report.write(asyncio.run(run(args)), args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Reproducible synthetic field: LAS, welltrack and thickness files at a given scale.
+
+Wells get ids well_id_offset .. well_id_offset + wells - 1 and names WELL_<id>
+(the converter takes the id from the trailing digits), with well heads on a
+square grid WELL_SPACING degrees apart from BASE_LAT / BASE_LON. Per well:
+- LAS: `samples` DEPT/TYPE rows SAMPLE_STEP m apart from TOP_DEPTH,
+  TYPE switching between 0 and 1 in runs of 50..1000 samples
+- welltrack: `track_points` stations over the same measured depth range,
+  building up to 60 degrees inclination along a random azimuth
+- thickness: `thickness_points` points around the head, thickness a smooth
+  function of position plus noise, effective thickness a fraction of it
+
+Every well draws from its own generator seeded with (seed, well_id), so the
+same FieldSpec always gives byte-identical files and adding wells does not
+change the existing ones.
+
+Usage:
+    python -m benchmarks.synthetic --wells 100 --samples 20000 --out /tmp/field
+"""
+import argparse
+import json
+import math
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+
+BASE_LAT = 55.0
+BASE_LON = 37.0
+WELL_SPACING = 0.005
+TOP_DEPTH = 1000.0
+SAMPLE_STEP = 0.1
+METRES_PER_DEGREE = 111_320.0
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    wells: int = 100
+    samples: int = 10_000  # LAS rows per well
+    track_points: int = 200  # welltrack stations per well
+    thickness_points: int = 1  # per well, in each thickness file
+    well_id_offset: int = 900_000
+    seed: int = 42
+
+    @property
+    def well_ids(self) -> range:
+        return range(self.well_id_offset, self.well_id_offset + self.wells)
+
+    @property
+    def bbox(self) -> tuple[float, float, float, float]:
+        """
+        min_lat, max_lat, min_lon, max_lon around all well heads and tracks.
+        """
+        side = math.ceil(math.sqrt(self.wells))
+        reach = self.samples * SAMPLE_STEP / METRES_PER_DEGREE / math.cos(math.radians(BASE_LAT))
+        return (
+            BASE_LAT - reach,
+            BASE_LAT + (side - 1) * WELL_SPACING + reach,
+            BASE_LON - reach,
+            BASE_LON + (side - 1) * WELL_SPACING + reach,
+        )
+
+
+@dataclass(frozen=True)
+class FieldFiles:
+    las: list[Path]
+    welltrack: Path
+    formation_thickness: Path
+    effective_formation_thickness: Path
+
+
+def _rng(spec: FieldSpec, well_id: int, stream: int) -> np.random.Generator:
+    return np.random.default_rng([spec.seed, well_id, stream])
+
+
+def well_head(spec: FieldSpec, well_id: int) -> tuple[float, float]:
+    index = well_id - spec.well_id_offset
+    side = math.ceil(math.sqrt(spec.wells))
+    return BASE_LAT + (index // side) * WELL_SPACING, BASE_LON + (index % side) * WELL_SPACING
+
+
+def curve_types(spec: FieldSpec, well_id: int) -> np.ndarray:
+    rng = _rng(spec, well_id, 0)
+    runs = rng.integers(50, 1001, size=spec.samples // 50 + 1)
+    run_types = (np.arange(len(runs)) + rng.integers(0, 2)) % 2
+    return np.repeat(run_types, runs)[: spec.samples]
+
+
+def track(spec: FieldSpec, well_id: int) -> np.ndarray:
+    """
+    (track_points, 4) stations: lat, lon, absolute_depth, measured_depth.
+    """
+    rng = _rng(spec, well_id, 1)
+    lat0, lon0 = well_head(spec, well_id)
+    azimuth = rng.uniform(0, 2 * math.pi)
+    measured_depth = np.linspace(TOP_DEPTH, TOP_DEPTH + (spec.samples - 1) * SAMPLE_STEP, spec.track_points)
+    inclination = np.radians(np.linspace(0, rng.uniform(0, 60), spec.track_points))
+    step = np.diff(measured_depth, prepend=TOP_DEPTH)
+    horizontal = np.cumsum(step * np.sin(inclination))
+    vertical = TOP_DEPTH + np.cumsum(step * np.cos(inclination))
+    lat = lat0 + horizontal * math.cos(azimuth) / METRES_PER_DEGREE
+    lon = lon0 + horizontal * math.sin(azimuth) / (METRES_PER_DEGREE * math.cos(math.radians(lat0)))
+    return np.column_stack([lat, lon, -vertical, measured_depth])
+
+
+def thickness(spec: FieldSpec, well_id: int) -> np.ndarray:
+    """
+    (thickness_points, 4): lat, lon, absolute_depth, thickness; the first point at the head.
+    """
+    rng = _rng(spec, well_id, 2)
+    lat0, lon0 = well_head(spec, well_id)
+    offsets = rng.normal(0, WELL_SPACING / 4, size=(spec.thickness_points, 2))
+    offsets[0] = 0
+    lat, lon = lat0 + offsets[:, 0], lon0 + offsets[:, 1]
+    value = 10 + 5 * np.sin(lat * 300) * np.cos(lon * 300) + rng.normal(0, 0.5, spec.thickness_points)
+    depth = -TOP_DEPTH - 50 * np.sin(lon * 100) - rng.uniform(0, 5, spec.thickness_points)
+    return np.column_stack([lat, lon, depth, np.maximum(value, 0.1)])
+
+
+def las_lines(spec: FieldSpec, well_id: int) -> Iterator[str]:
+    stop = TOP_DEPTH + (spec.samples - 1) * SAMPLE_STEP
+    yield (
+        "~Version\nVERS. 2.0 :\n~Well\n"
+        f"STRT.M {TOP_DEPTH:.1f} :\nSTOP.M {stop:.1f} :\nWELL. WELL_{well_id} :\n"
+        "~Curve\nDEPT.M :\nTYPE. :\n~Ascii\n"
+    )
+    for i, curve_type in enumerate(curve_types(spec, well_id).tolist()):
+        yield f"{TOP_DEPTH + i * SAMPLE_STEP:.1f} {curve_type}\n"
+
+
+def write_las(path: Path, spec: FieldSpec, well_id: int) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(las_lines(spec, well_id))
+
+
+def write_welltrack(path: Path, spec: FieldSpec) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for well_id in spec.well_ids:
+            f.write(f"welltrack 'WELL_{well_id}'\n")
+            f.writelines(
+                f"{lat:.8f} {lon:.8f} {depth:.2f} {md:.2f}\n" for lat, lon, depth, md in track(spec, well_id).tolist()
+            )
+
+
+def write_thickness(path: Path, spec: FieldSpec, *, effective: bool = False) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("string WELL\nfloat THICKNESS\n")
+        for well_id in spec.well_ids:
+            rows = thickness(spec, well_id)
+            if effective:
+                rows[:, 3] *= _rng(spec, well_id, 3).uniform(0.4, 0.9, len(rows))
+            f.writelines(
+                f"{lat:.8f} {lon:.8f} {depth:.2f} WELL_{well_id} {value:.3f}\n"
+                for lat, lon, depth, value in rows.tolist()
+            )
+
+
+def generate(directory: Path, spec: FieldSpec) -> FieldFiles:
+    directory.mkdir(parents=True, exist_ok=True)
+    files = FieldFiles(
+        las=[directory / f"WELL_{well_id}.las" for well_id in spec.well_ids],
+        welltrack=directory / "welltrack.txt",
+        formation_thickness=directory / "formation_thickness.txt",
+        effective_formation_thickness=directory / "effective_formation_thickness.txt",
+    )
+    for path, well_id in zip(files.las, spec.well_ids):
+        write_las(path, spec, well_id)
+    write_welltrack(files.welltrack, spec)
+    write_thickness(files.formation_thickness, spec)
+    write_thickness(files.effective_formation_thickness, spec, effective=True)
+    return files
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = FieldSpec()
+    parser.add_argument("--wells", type=int, default=defaults.wells)
+    parser.add_argument("--samples", type=int, default=defaults.samples, help="LAS rows per well")
+    parser.add_argument("--track-points", type=int, default=defaults.track_points, help="per well")
+    parser.add_argument("--thickness-points", type=int, default=defaults.thickness_points, help="per well")
+    parser.add_argument("--well-id-offset", type=int, default=defaults.well_id_offset)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def spec_from_arguments(args: argparse.Namespace) -> FieldSpec:
+    return FieldSpec(
+        wells=args.wells,
+        samples=args.samples,
+        track_points=args.track_points,
+        thickness_points=args.thickness_points,
+        well_id_offset=args.well_id_offset,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_spec_arguments(parser)
+    parser.add_argument("--out", type=Path, required=True, help="directory for the files")
+    args = parser.parse_args()
+
+    spec = spec_from_arguments(args)
+    generate(args.out, spec)
+    print(json.dumps({"spec": asdict(spec), "directory": str(args.out)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
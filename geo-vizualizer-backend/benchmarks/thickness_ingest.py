@@ -0,0 +1,132 @@
+"""
+Rows per second of formation thickness ingest, per-line writes vs batched writes.
+
+Generates a synthetic formation_thickness file and ingests it into the
+configured database:
+- "per_line": one well upsert and one single-row add_many flush per line,
+  the way the converter wrote rows before batching; it is timed on the
+  first --per-line-rows lines only, since its cost per line is constant
+- "batched_orm": Converter(bulk=False, stream=False), one flush per file
+- "batched_copy": Converter() defaults, COPY per INGEST_CHUNK_BYTES block
+
+Rows are written for well ids starting at --well-id-offset and removed afterwards.
+
+Usage (settings/env as for the API):
+    python -m benchmarks.thickness_ingest --lines 1000000 --wells 10000
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import delete
+
+from app import crud
+from app.core import parsers
+from app.core.converter import Converter
+from app.db.session import AsyncSessionLocal
+from app.models import FormationThickness, Well
+from benchmarks import synthetic
+from benchmarks.synthetic import FieldSpec
+
+
+async def cleanup(well_id_offset: int, wells: int) -> None:
+    async with AsyncSessionLocal() as db:
+        last_id = well_id_offset + wells - 1
+        await db.execute(
+            delete(FormationThickness).where(FormationThickness.well_id.between(well_id_offset, last_id))
+        )
+        await db.execute(delete(Well).where(Well.id.between(well_id_offset, last_id)))
+        await db.commit()
+
+
+async def ingest_per_line(path: str, *, max_lines: int) -> int:
+    with open(path, encoding="utf-8") as fh:
+        head = "".join(line for _, line in zip(range(max_lines), fh))
+    rows = parsers.parse_thickness_chunk(head)
+
+    async with AsyncSessionLocal() as db:
+        for well_id, well_token, lat, lon, absolute_depth, thickness in rows:
+            await crud.wells.upsert(
+                db,
+                well_id=well_id,
+                name=well_token,
+                start_measured_depth=None,
+                end_measured_depth=None,
+            )
+            await crud.formation_thickness.add_many(
+                db,
+                records=[
+                    {
+                        "well_id": well_id,
+                        "lat": lat,
+                        "lon": lon,
+                        "absolute_depth": absolute_depth,
+                        "thickness": thickness,
+                    }
+                ],
+            )
+        await db.commit()
+    return len(rows)
+
+
+async def ingest_converter(path: str, converter: Converter) -> int:
+    async with AsyncSessionLocal() as db:
+        result = await converter.convert_formation_thickness(db, file_path=path)
+    return result["rows_saved"]
+
+
+async def timed(name: str, coro) -> dict:
+    started = time.perf_counter()
+    rows = await coro
+    seconds = time.perf_counter() - started
+    return {"mode": name, "rows": rows, "seconds": round(seconds, 3), "rows_per_second": round(rows / seconds)}
+
+
+async def run(args: argparse.Namespace) -> dict:
+    results = []
+    with tempfile.NamedTemporaryFile(suffix=".txt") as tmp:
+        spec = FieldSpec(
+            wells=args.wells,
+            thickness_points=max(1, args.lines // args.wells),
+            well_id_offset=args.well_id_offset,
+            seed=args.seed,
+        )
+        synthetic.write_thickness(Path(tmp.name), spec)
+        runs = [
+            ("per_line", lambda: ingest_per_line(tmp.name, max_lines=args.per_line_rows)),
+            ("batched_orm", lambda: ingest_converter(tmp.name, Converter(bulk=False, stream=False))),
+            ("batched_copy", lambda: ingest_converter(tmp.name, Converter())),
+        ]
+        for name, make in runs:
+            if name not in args.modes:
+                continue
+            await cleanup(args.well_id_offset, args.wells)
+            results.append(await timed(name, make()))
+        await cleanup(args.well_id_offset, args.wells)
+
+    return {"lines": args.lines, "wells": args.wells, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--wells", type=int, default=10_000)
+    parser.add_argument("--per-line-rows", type=int, default=20_000)
+    parser.add_argument("--well-id-offset", type=int, default=900_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        default=["per_line", "batched_orm", "batched_copy"],
+        choices=["per_line", "batched_orm", "batched_copy"],
+    )
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Latency of a read endpoint while a large LAS file is being ingested.
+
+Measures GET /entities/wells on an idle API first, then again while
+POST /files/convert uploads a synthetic LAS file, and prints percentiles as JSON.
+With parsing on the loop the "during_upload" p99 grows with file size,
+with PARSER_WORKERS > 0 it should stay close to the idle numbers.
+
+Usage (API and DB already running, requires httpx):
+    python -m benchmarks.upload_latency --base-url http://localhost:8000/api/v1 --rows 2000000
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks import synthetic
+from benchmarks.report import percentiles
+from benchmarks.synthetic import FieldSpec
+
+
+async def probe(client: httpx.AsyncClient, url: str, stop: asyncio.Event, interval: float) -> list[float]:
+    latencies: list[float] = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get(url)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def run(args: argparse.Namespace) -> dict:
+    probe_url = f"{args.base_url}{args.probe_path}"
+    upload_url = f"{args.base_url}/files/convert"
+
+    with tempfile.NamedTemporaryFile(suffix=".las") as tmp:
+        spec = FieldSpec(wells=1, samples=args.rows, well_id_offset=args.well_id)
+        synthetic.write_las(Path(tmp.name), spec, args.well_id)
+
+        async with httpx.AsyncClient(timeout=None) as client:
+            stop = asyncio.Event()
+            idle_task = asyncio.create_task(probe(client, probe_url, stop, args.interval))
+            await asyncio.sleep(args.idle_seconds)
+            stop.set()
+            idle = await idle_task
+
+            stop = asyncio.Event()
+            busy_task = asyncio.create_task(probe(client, probe_url, stop, args.interval))
+            started = time.perf_counter()
+            with open(tmp.name, "rb") as f:
+                response = await client.post(upload_url, files={"file": ("bench.las", f)})
+            upload_seconds = time.perf_counter() - started
+            stop.set()
+            busy = await busy_task
+            response.raise_for_status()
+
+    return {
+        "rows": args.rows,
+        "upload_seconds": round(upload_seconds, 3),
+        "upload_result": response.json(),
+        "idle": percentiles(idle),
+        "during_upload": percentiles(busy),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--probe-path", default="/entities/wells")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--well-id", type=int, default=990_001)
+    parser.add_argument("--interval", type=float, default=0.01, help="pause between probe requests, s")
+    parser.add_argument("--idle-seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Accept header negotiation of the columnar responses.
+"""
+import pytest
+from fastapi import HTTPException
+
+from app.api import columnar
+
+PACKED = columnar.PACKED_MEDIA_TYPE
+ARROW = columnar.ARROW_MEDIA_TYPE
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        (None, None),
+        ("", None),
+        ("*/*", None),
+        ("application/json", None),
+        ("text/html", None),
+        (PACKED, PACKED),
+        (f"{PACKED}, application/json", PACKED),
+        (f"application/json, {PACKED}", None),
+        (f"application/json;q=1, {PACKED};q=0.1", None),
+        (f"application/json;q=0.5, {PACKED}", PACKED),
+        (f"{PACKED};q=0, */*", None),
+        (f"application/*;q=0.2, {PACKED};q=0.9", PACKED),
+        (f"{PACKED};q=0.9, application/json;q=0.9", PACKED),
+        (f"{PACKED};q=oops, application/json;q=0.5", PACKED),
+        (f"*/*;q=0.1, {PACKED}", PACKED),
+    ],
+)
+def test_negotiate(accept: str | None, expected: str | None) -> None:
+    assert columnar.negotiate(accept) == expected
+
+
+def test_negotiate_arrow(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(columnar, "pa", object())
+    assert columnar.negotiate(f"{ARROW}, {PACKED}") == ARROW
+    assert columnar.negotiate(f"{ARROW};q=0.5, {PACKED}") == PACKED
+
+    monkeypatch.setattr(columnar, "pa", None)
+    assert columnar.negotiate(f"{ARROW}, {PACKED};q=0.5") == PACKED
+    assert columnar.negotiate(f"{ARROW}, */*;q=0.1") is None
+    with pytest.raises(HTTPException) as exc_info:
+        columnar.negotiate(ARROW)
+    assert exc_info.value.status_code == 406
@@ -0,0 +1,93 @@
+"""
+The numpy interpolation engine against the SQL reference: one seeded well with
+an irregular track is interpolated by both, the stored rows must be equal.
+
+Needs the configured Postgres (settings as for the API); skipped when the
+settings or the database are not available.
+"""
+import asyncio
+
+import pytest
+
+try:
+    from app.db.session import AsyncSessionLocal, engine
+except OSError as exc:
+    pytest.skip(f"no settings: {exc}", allow_module_level=True)
+
+from sqlalchemy import delete, select
+
+from app import crud
+from app.core.service import curve_interpolator
+from app.models import Curve, InterpolatedCurve, Well
+
+WELL_ID = 990_001
+
+# (lat, lon, absolute_depth, measured_depth): uneven steps, written out of
+# depth order, one point without lat and one without measured_depth
+TRACK = [
+    (55.0300, 37.0300, -1180.0, 1210.0),
+    (55.0000, 37.0000, -1000.0, 1000.0),
+    (55.0010, 37.0040, -1004.5, 1005.0),
+    (None, 37.0100, -1060.0, 1062.5),
+    (55.0200, 37.0150, -1120.0, 1140.0),
+    (55.0500, 37.0500, -1300.0, None),
+]
+# measured depths: outside the track on both sides, exactly on track points,
+# between them, and one NULL
+CURVE = [990.0, 1000.0, 1001.0, 1005.0, 1033.3, 1062.5, 1100.0, 1139.9, 1140.0, 1209.0, 1210.0, 1300.0, None]
+
+
+async def _seed() -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Well).where(Well.id == WELL_ID))
+        await crud.wells.upsert_many(db, wells=[{"id": WELL_ID, "name": f"WELL_{WELL_ID}"}])
+        await crud.welltracks.copy_rows(db, well_id=WELL_ID, rows=TRACK)
+        await crud.curves.copy_rows(
+            db, well_id=WELL_ID, rows=((depth, str(i % 2)) for i, depth in enumerate(CURVE))
+        )
+        await db.commit()
+
+
+async def _interpolate(engine_name: str) -> list[tuple]:
+    async with AsyncSessionLocal() as db:
+        await curve_interpolator.interpolate_curve_for_well(db, WELL_ID, engine=engine_name, force=True)
+        result = await db.execute(
+            select(
+                InterpolatedCurve.curve_point_id,
+                InterpolatedCurve.lat,
+                InterpolatedCurve.lon,
+                InterpolatedCurve.absolute_depth,
+            )
+            .join(Curve, Curve.id == InterpolatedCurve.curve_point_id)
+            .where(Curve.well_id == WELL_ID)
+            .order_by(InterpolatedCurve.curve_point_id)
+        )
+        return [tuple(row) for row in result]
+
+
+async def _compare() -> tuple[list[tuple], list[tuple]]:
+    try:
+        await _seed()
+        return await _interpolate("sql"), await _interpolate("numpy")
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Well).where(Well.id == WELL_ID))
+            await db.commit()
+        await engine.dispose()
+
+
+def test_numpy_engine_matches_sql() -> None:
+    try:
+        sql_rows, numpy_rows = asyncio.run(_compare())
+    except OSError as exc:
+        pytest.skip(f"database not reachable: {exc}")
+
+    # 990 and 1300 are outside the track, the NULL depth has no position
+    assert len(sql_rows) == len(CURVE) - 3
+    assert [row[0] for row in numpy_rows] == [row[0] for row in sql_rows]
+    for sql_row, numpy_row in zip(sql_rows, numpy_rows):
+        for sql_value, numpy_value in zip(sql_row[1:], numpy_row[1:]):
+            if sql_value is None:
+                assert numpy_value is None, (sql_row, numpy_row)
+            else:
+                assert numpy_value == pytest.approx(sql_value, rel=1e-12, abs=1e-9), (sql_row, numpy_row)
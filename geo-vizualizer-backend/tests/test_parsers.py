@@ -0,0 +1,107 @@
+"""
+The numpy parser backends against the python reference: both must return the
+same rows for any input, including the odd lines real files contain.
+
+Run from geo-vizualizer-backend (requires pytest):
+    python -m pytest -q tests
+"""
+import random
+
+import numpy as np
+import pytest
+
+from app.core import parsers
+
+# cells and separators the random ~Ascii lines are built from
+ASCII_CELLS = [
+    "1", "0", "2.5", "-3", "1e3", "nan", "inf", "+1", ".5", "1.", "0.0", "1.0", "1_0",
+    "x", "#", "#c", "1#x", ";", "\x00", "\x0b", "\x0c", "\x1c", "\xa0", "　", "\r", "\r\n", "1\r0",
+]
+SEPARATORS = [" ", "  ", "\t", ""]
+
+
+def _random_text(rng: random.Random, cells: list[str], max_cells: int) -> str:
+    lines = [
+        "".join(rng.choice(cells) + rng.choice(SEPARATORS) for _ in range(rng.randint(0, max_cells)))
+        for _ in range(rng.randint(1, 4))
+    ]
+    return "\n".join(lines) + rng.choice(["", "\n"])
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "1000 1\n1001 0\n1002 0.5\n",
+        "1000 1#x\n",
+        "# depth type\n1000 1\n  # indented comment\n1001 0\n",
+        "1000 1\r\n1001 0\r\n",
+        "1000 1\r1001 0",
+        "1000\x0c1\n",
+        "1000\xa01\n",
+        "1000 x\n1001\n",
+        "",
+    ],
+)
+def test_ascii_backends_agree(text: str) -> None:
+    assert repr(parsers.parse_ascii(text, backend="numpy")) == repr(parsers.parse_ascii(text, backend="python"))
+
+
+def test_ascii_backends_agree_on_random_blocks() -> None:
+    rng = random.Random(0)
+    for _ in range(20_000):
+        text = _random_text(rng, ASCII_CELLS, 5)
+        # repr: nan != nan, but both backends must give nan at the same place
+        assert repr(parsers.parse_ascii(text, backend="numpy")) == repr(
+            parsers.parse_ascii(text, backend="python")
+        ), text
+
+
+# rows and headers the random welltrack pieces are built from
+TRACK_CELLS = ["55.1", "37", "-1000", "1000", "1e3", "nan", "+2", "1_0", "x", ";", "1;", ";x", "#", "1#x", "\x0c", "\xa0"]
+TRACK_HEADERS = ["welltrack 'WELL_7'", "WELLTRACK W9", "welltrack 'X'"]
+LINE_ENDS = ["\n", "\n", "\r\n", "\r"]
+
+
+def _track_rows(parsed: tuple) -> tuple:
+    """
+    parse_welltrack output with every row list as plain floats, whichever backend made it.
+    """
+    leading_rows, segments = parsed
+
+    def rows(part) -> str:
+        return repr(np.asarray(part, dtype=np.float64).reshape(-1, 4).tolist())
+
+    return rows(leading_rows), [(well_id, name, rows(part)) for well_id, name, part in segments]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"welltrack 'WELL_1'\n55.1 37.0 -1000 1000\n55.2 37.1 -1010 1010;\n",
+        b"welltrack 'WELL_1'\n55.1 37.0 -1000 1000 ;\n",
+        b"welltrack 'WELL_1'\n55.1 37.0 -1000 1000; x\n55.2 37.1 -1010 1010\n",
+        b"welltrack 'WELL_1'\n55.1 37.0 -1000 1000;;\n",
+        b"welltrack 'WELL_1'\n55.1 37.0 -1000 1000 # note\n",
+        b"welltrack 'WELL_1'\r\n55.1 37.0 -1000 1000\r\n;\r\n",
+        b"55.1 37.0 -1000 1000\rwelltrack 'WELL_2'\r55.2 37.1 -1010 1010\r",
+        b"welltrack 'WELL_1'\n55.1\x0c37.0 -1000 1000\n",
+        b"55.1 37.0 -1000 1000\nwelltrack 'NO_ID'\n55.2 37.1 -1010 1010\n",
+    ],
+)
+def test_welltrack_backends_agree(data: bytes) -> None:
+    assert _track_rows(parsers.parse_welltrack(data, backend="numpy")) == _track_rows(
+        parsers.parse_welltrack(data, backend="python")
+    )
+
+
+def test_welltrack_backends_agree_on_random_pieces() -> None:
+    rng = random.Random(0)
+    for _ in range(20_000):
+        lines = [
+            rng.choice(TRACK_HEADERS) if rng.random() < 0.15 else _random_text(rng, TRACK_CELLS, 6).rstrip("\n")
+            for _ in range(rng.randint(1, 6))
+        ]
+        data = "".join(line + rng.choice(LINE_ENDS) for line in lines).encode("utf-8")
+        assert _track_rows(parsers.parse_welltrack(data, backend="numpy")) == _track_rows(
+            parsers.parse_welltrack(data, backend="python")
+        ), data